@@ -1,8 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.v1.endpoints import collections
+from app.api.v1.endpoints import collections, documents, operations, rag
+from app.core.auth import require_api_key
 
-api_router = APIRouter()
+# Every v1 route requires an API key when API_KEY_AUTH_ENABLED is set
+api_router = APIRouter(dependencies=[Depends(require_api_key)])
 
 # Include collection routes
 api_router.include_router(
@@ -11,9 +13,28 @@ api_router.include_router(
     tags=["Collections"],
 )
 
+# Include document routes
+api_router.include_router(
+    documents.router,
+    prefix="/documents",
+    tags=["Documents"],
+)
+
+# Include long-running operation routes
+api_router.include_router(
+    operations.router,
+    prefix="/operations",
+    tags=["Operations"],
+)
+
+# Include retrieval routes
+api_router.include_router(
+    rag.router,
+    prefix="/rag",
+    tags=["RAG Search"],
+)
+
 # Future endpoint includes will go here:
-# api_router.include_router(documents.router, prefix="/documents", tags=["Documents"])
 # api_router.include_router(chunks.router, prefix="/chunks", tags=["Chunks"])
 # api_router.include_router(api_keys.router, prefix="/api-keys", tags=["API Keys"])
-# api_router.include_router(rag.router, prefix="/rag", tags=["RAG Search"])
 # api_router.include_router(system.router, prefix="/system", tags=["System"])
\ No newline at end of file
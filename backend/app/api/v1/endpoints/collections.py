@@ -1,7 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth import accessible_collections, authorize, check_collection_access
+from app.core.config import settings
 from app.core.database import get_db_session
 from app.core.milvus_client import milvus_manager
 from app.repositories.collection import CollectionRepository
@@ -12,19 +14,56 @@ from app.schemas.collection import (
     CollectionListResponse,
     CollectionStats,
     CollectionHealthCheck,
-    CollectionSyncRequest
+    CollectionSyncRequest,
+    CollectionBulkDeleteRequest,
+    VectorConfig
 )
 from app.schemas.common import MessageResponse, OperationResponse
+from app.models.api_key import APIKey
 from app.models.collection import CollectionStatus
-from app.core.exceptions import CollectionNotFoundError, VectorDatabaseError
+from app.services.operations import operation_manager
+from app.services.maintenance import (
+    run_collection_sync,
+    run_collection_rechunk,
+    run_collection_reconfigure,
+    run_collection_purge
+)
+from app.api.v1.endpoints.operations import to_operation_response
+from app.core.exceptions import CollectionNotFoundError, OperationConflictError
 import structlog
-import uuid
 from datetime import datetime
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
 
 
+async def start_rechunk(collection_id: str, collection_name: str):
+    return await operation_manager.start(
+        "collection_rechunk",
+        f"Re-chunking collection '{collection_name}'",
+        lambda context: run_collection_rechunk(context, collection_id),
+        resource_id=collection_id
+    )
+
+
+async def start_reconfigure(collection_id: str, collection_name: str):
+    return await operation_manager.start(
+        "collection_rechunk",
+        f"Re-chunking and rebuilding collection '{collection_name}'",
+        lambda context: run_collection_reconfigure(context, collection_id),
+        resource_id=collection_id
+    )
+
+
+async def start_sync(collection_id: str, collection_name: str, force: bool):
+    return await operation_manager.start(
+        "collection_sync",
+        f"Synchronizing collection '{collection_name}'",
+        lambda context: run_collection_sync(context, collection_id, force),
+        resource_id=collection_id
+    )
+
+
 @router.get("/", response_model=CollectionListResponse)
 async def list_collections(
     skip: int = Query(0, ge=0, description="Number of items to skip"),
@@ -34,10 +73,12 @@ async def list_collections(
     tags: Optional[List[str]] = Query(None, description="Filter by tags"),
     sort_by: str = Query("created_at", description="Sort field"),
     sort_order: str = Query("desc", regex="^(asc|desc)$", description="Sort order"),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_db_session),
+    api_key: Optional[APIKey] = Depends(authorize("collections:list"))
 ):
     """
     Retrieve a paginated list of collections with optional filtering and sorting.
+    Keys limited to some collections only see those.
     """
     try:
         repo = CollectionRepository(db)
@@ -48,7 +89,8 @@ async def list_collections(
             status=status,
             tags=tags,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            collection_ids=accessible_collections(api_key)
         )
 
         # Calculate pagination info
@@ -73,7 +115,12 @@ async def list_collections(
         )
 
 
-@router.post("/", response_model=CollectionResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=CollectionResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(authorize("collections:create"))]
+)
 async def create_collection(
     collection_data: CollectionCreate,
     db: AsyncSession = Depends(get_db_session)
@@ -88,7 +135,10 @@ async def create_collection(
         collection = await repo.create(collection_data)
 
         # Create corresponding Milvus collection
-        milvus_success = await milvus_manager.create_collection(collection.milvus_collection_name)
+        milvus_success = await milvus_manager.create_collection(
+            collection.milvus_collection_name,
+            **VectorConfig.for_collection(collection).milvus_options()
+        )
 
         if milvus_success:
             await repo.mark_sync_status(collection.id, synced=True)
@@ -119,7 +169,40 @@ async def create_collection(
         )
 
 
-@router.get("/{collection_id}", response_model=CollectionResponse)
+@router.post("/bulk-delete", response_model=OperationResponse, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_delete_collections(
+    request: CollectionBulkDeleteRequest,
+    api_key: Optional[APIKey] = Depends(authorize("collections:delete"))
+):
+    """
+    Purge several collections in the background: their Milvus collections,
+    chunks, documents and stored files are removed, then the collections.
+    """
+    check_collection_access(api_key, request.collection_ids)
+    try:
+        record = await operation_manager.start(
+            "collection_purge",
+            f"Purging {len(request.collection_ids)} collections",
+            lambda context: run_collection_purge(context, request.collection_ids),
+            resource_ids=request.collection_ids
+        )
+        return to_operation_response(record)
+
+    except OperationConflictError:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to start collection purge: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to initiate collection purge"
+        )
+
+
+@router.get(
+    "/{collection_id}",
+    response_model=CollectionResponse,
+    dependencies=[Depends(authorize("collections:read"))]
+)
 async def get_collection(
     collection_id: str,
     db: AsyncSession = Depends(get_db_session)
@@ -146,22 +229,63 @@ async def get_collection(
         )
 
 
-@router.put("/{collection_id}", response_model=CollectionResponse)
+@router.put(
+    "/{collection_id}",
+    response_model=CollectionResponse,
+    dependencies=[Depends(authorize("collections:update"))]
+)
 async def update_collection(
     collection_id: str,
     collection_data: CollectionUpdate,
+    response: Response,
     db: AsyncSession = Depends(get_db_session)
 ):
     """
     Update collection information and settings.
+
+    Changing chunk_size or chunk_overlap re-chunks the collection's documents
+    in the background (see the Operation-Location header); chunks whose
+    content is unchanged keep their existing embeddings. Changing the vector
+    options rebuilds the Milvus collection in the background, and searches
+    keep using the current one until the rebuilt one is swapped in.
     """
     try:
         repo = CollectionRepository(db)
+        current = await repo.get_by_id(collection_id)
+        if not current:
+            raise CollectionNotFoundError(collection_id)
+        previous_chunking = (current.chunk_size, current.chunk_overlap)
+        previous_vector = VectorConfig.for_collection(current)
+
+        # Changes that start an operation are refused before anything is written
+        # while another operation runs on the collection
+        requested_chunking = (
+            current.chunk_size if collection_data.chunk_size is None else collection_data.chunk_size,
+            current.chunk_overlap if collection_data.chunk_overlap is None else collection_data.chunk_overlap
+        )
+        requested_vector = previous_vector if collection_data.vector is None else VectorConfig(
+            **collection_data.vector.dict(exclude_unset=True, exclude_none=True)
+        )
+        if requested_chunking != previous_chunking or requested_vector != previous_vector:
+            await operation_manager.ensure_idle(collection_id)
+
         collection = await repo.update(collection_id, collection_data)
 
+        rechunk = (collection.chunk_size, collection.chunk_overlap) != previous_chunking
+        rebuild = VectorConfig.for_collection(collection) != previous_vector
+        record = None
+        if rechunk and rebuild:
+            record = await start_reconfigure(collection.id, collection.name)
+        elif rechunk:
+            record = await start_rechunk(collection.id, collection.name)
+        elif rebuild:
+            record = await start_sync(collection.id, collection.name, force=True)
+        if record:
+            response.headers["Operation-Location"] = f"{settings.API_V1_STR}/operations/{record['operation_id']}"
+
         return CollectionResponse.from_orm(collection)
 
-    except CollectionNotFoundError:
+    except (CollectionNotFoundError, OperationConflictError):
         raise
     except Exception as e:
         logger.error(f"Failed to update collection {collection_id}: {e}")
@@ -176,7 +300,11 @@ async def update_collection(
         )
 
 
-@router.delete("/{collection_id}", response_model=MessageResponse)
+@router.delete(
+    "/{collection_id}",
+    response_model=MessageResponse,
+    dependencies=[Depends(authorize("collections:delete"))]
+)
 async def delete_collection(
     collection_id: str,
     db: AsyncSession = Depends(get_db_session)
@@ -190,6 +318,7 @@ async def delete_collection(
 
         if not collection:
             raise CollectionNotFoundError(collection_id)
+        await operation_manager.ensure_idle(collection_id)
 
         # Delete Milvus collection first
         if collection.milvus_collection_name:
@@ -207,7 +336,7 @@ async def delete_collection(
             success=True
         )
 
-    except CollectionNotFoundError:
+    except (CollectionNotFoundError, OperationConflictError):
         raise
     except Exception as e:
         logger.error(f"Failed to delete collection {collection_id}: {e}")
@@ -217,7 +346,11 @@ async def delete_collection(
         )
 
 
-@router.get("/{collection_id}/stats", response_model=CollectionStats)
+@router.get(
+    "/{collection_id}/stats",
+    response_model=CollectionStats,
+    dependencies=[Depends(authorize("collections:read"))]
+)
 async def get_collection_stats(
     collection_id: str,
     db: AsyncSession = Depends(get_db_session)
@@ -266,7 +399,11 @@ async def get_collection_stats(
         )
 
 
-@router.get("/{collection_id}/health", response_model=CollectionHealthCheck)
+@router.get(
+    "/{collection_id}/health",
+    response_model=CollectionHealthCheck,
+    dependencies=[Depends(authorize("collections:read"))]
+)
 async def check_collection_health(
     collection_id: str,
     db: AsyncSession = Depends(get_db_session)
@@ -324,7 +461,12 @@ async def check_collection_health(
         )
 
 
-@router.post("/{collection_id}/sync", response_model=OperationResponse)
+@router.post(
+    "/{collection_id}/sync",
+    response_model=OperationResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(authorize("collections:update"))]
+)
 async def sync_collection(
     collection_id: str,
     sync_request: CollectionSyncRequest = CollectionSyncRequest(),
@@ -332,6 +474,13 @@ async def sync_collection(
 ):
     """
     Manually trigger synchronization between database and Milvus for a collection.
+
+    The collection's chunks are reconciled against its Milvus vectors in the
+    background: missing vectors are re-inserted, orphan vectors deleted and
+    sync flags repaired. With force=true the vectors are rebuilt into a new
+    Milvus collection that replaces the live one atomically once loaded, so
+    searches keep working throughout. Poll GET /operations/{operation_id} for
+    progress.
     """
     try:
         repo = CollectionRepository(db)
@@ -340,63 +489,52 @@ async def sync_collection(
         if not collection:
             raise CollectionNotFoundError(collection_id)
 
-        # Set collection to syncing status
-        await repo.mark_sync_status(collection.id, synced=False)
-        collection.status = CollectionStatus.SYNCING
-        await repo.update(collection.id, CollectionUpdate(status=CollectionStatus.SYNCING))
-
-        operation_id = str(uuid.uuid4())
-
-        try:
-            # Create or recreate Milvus collection if needed
-            if sync_request.force or not collection.milvus_collection_name:
-                if collection.milvus_collection_name:
-                    await milvus_manager.delete_collection(collection.milvus_collection_name)
+        await operation_manager.ensure_idle(collection.id)
 
-                success = await milvus_manager.create_collection(collection.milvus_collection_name)
-                if not success:
-                    raise VectorDatabaseError("create_collection", "Failed to create Milvus collection")
+        # The operation marks the collection syncing once it holds the claim
+        record = await start_sync(collection.id, collection.name, sync_request.force)
+        return to_operation_response(record)
 
-            # Mark as successfully synced
-            await repo.mark_sync_status(collection.id, synced=True)
+    except (CollectionNotFoundError, OperationConflictError):
+        raise
+    except Exception as e:
+        logger.error(f"Failed to sync collection {collection_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to initiate collection sync"
+        )
 
-            logger.info(f"Successfully synced collection {collection.name}")
 
-            return OperationResponse(
-                operation_id=operation_id,
-                status="completed",
-                message=f"Collection '{collection.name}' synchronized successfully",
-                started_at=datetime.utcnow(),
-                completed_at=datetime.utcnow(),
-                progress=100,
-                result={"synced": True, "collection_id": collection.id}
-            )
+@router.post(
+    "/{collection_id}/reindex",
+    response_model=OperationResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(authorize("collections:update"))]
+)
+async def reindex_collection(
+    collection_id: str,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Re-chunk and re-index every document of a collection in the background.
 
-        except Exception as sync_error:
-            # Mark sync as failed
-            await repo.mark_sync_status(
-                collection.id,
-                synced=False,
-                error_message=str(sync_error)
-            )
+    Chunks whose content is unchanged keep their existing embeddings.
+    """
+    try:
+        repo = CollectionRepository(db)
+        collection = await repo.get_by_id(collection_id)
 
-            logger.error(f"Failed to sync collection {collection.name}: {sync_error}")
+        if not collection:
+            raise CollectionNotFoundError(collection_id)
 
-            return OperationResponse(
-                operation_id=operation_id,
-                status="failed",
-                message=f"Failed to sync collection '{collection.name}': {str(sync_error)}",
-                started_at=datetime.utcnow(),
-                completed_at=datetime.utcnow(),
-                progress=0,
-                result={"synced": False, "error": str(sync_error)}
-            )
+        record = await start_rechunk(collection.id, collection.name)
+        return to_operation_response(record)
 
-    except CollectionNotFoundError:
+    except (CollectionNotFoundError, OperationConflictError):
         raise
     except Exception as e:
-        logger.error(f"Failed to sync collection {collection_id}: {e}")
+        logger.error(f"Failed to reindex collection {collection_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to initiate collection sync"
-        )
\ No newline at end of file
+            detail="Failed to initiate collection reindex"
+        )
@@ -0,0 +1,306 @@
+from typing import List, Optional
+from pathlib import Path
+import shutil
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import authorize, check_collection_access
+from app.core.config import settings
+from app.core.database import get_db_session
+from app.core.security import generate_secure_filename
+from app.core.milvus_client import milvus_manager
+from app.repositories.collection import CollectionRepository
+from app.repositories.document import DocumentRepository
+from app.repositories.chunk import ChunkRepository
+from app.schemas.document import DocumentResponse, DocumentListResponse, DocumentUploadResponse
+from app.schemas.common import MessageResponse, OperationResponse
+from app.models.api_key import APIKey
+from app.models.document import DocumentStatus
+from app.services.ingestion import IngestionService
+from app.services.operations import operation_manager
+from app.services.maintenance import run_bulk_ingest
+from app.api.v1.endpoints.operations import to_operation_response
+from app.core.exceptions import RAGException, CollectionNotFoundError, DocumentNotFoundError, OperationConflictError
+import structlog
+
+logger = structlog.get_logger(__name__)
+router = APIRouter()
+
+
+def to_document_response(document) -> DocumentResponse:
+    return DocumentResponse(**document.to_dict())
+
+
+def parse_tags(tags: Optional[str]) -> List[str]:
+    return [tag for tag in (tags or "").split(",") if tag.strip()]
+
+
+@router.post("/", response_model=DocumentUploadResponse, status_code=status.HTTP_201_CREATED)
+async def upload_document(
+    collection_id: str = Form(..., description="Target collection ID"),
+    file: UploadFile = File(..., description="Document file (pdf, docx, txt, md)"),
+    tags: Optional[str] = Form(None, description="Comma-separated document tags, usable as search filters"),
+    db: AsyncSession = Depends(get_db_session),
+    api_key: Optional[APIKey] = Depends(authorize("documents:write"))
+):
+    """
+    Upload a document into a collection, chunk it and index its embeddings.
+
+    Files already present in the collection (same SHA-256) are not re-processed,
+    and chunks whose content was embedded before reuse the stored vectors.
+    """
+    check_collection_access(api_key, [collection_id])
+    try:
+        await operation_manager.ensure_idle(collection_id)
+        data = await file.read()
+        service = IngestionService(db)
+        result = await service.ingest_upload(collection_id, file.filename or "", data, tags=parse_tags(tags))
+
+        return DocumentUploadResponse(
+            document=to_document_response(result.document),
+            duplicate=result.duplicate,
+            chunks_created=result.chunks_created,
+            chunks_kept=result.chunks_kept,
+            chunks_deleted=result.chunks_deleted,
+            chunks_queued=result.chunks_queued,
+            embeddings_cached=result.embeddings_cached,
+            embeddings_reused=result.embeddings_reused,
+            embeddings_generated=result.embeddings_generated
+        )
+
+    except RAGException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to upload document to collection {collection_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to upload document"
+        )
+
+
+@router.post("/bulk", response_model=OperationResponse, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_upload_documents(
+    collection_id: str = Form(..., description="Target collection ID"),
+    files: List[UploadFile] = File(..., description="Document files (pdf, docx, txt, md)"),
+    tags: Optional[str] = Form(None, description="Comma-separated tags applied to every document"),
+    db: AsyncSession = Depends(get_db_session),
+    api_key: Optional[APIKey] = Depends(authorize("documents:write"))
+):
+    """
+    Upload several documents at once; they are ingested one by one in the
+    background. Poll GET /operations/{operation_id} for per-file results.
+    """
+    check_collection_access(api_key, [collection_id])
+    try:
+        collection = await CollectionRepository(db).get_by_id(collection_id)
+        if not collection:
+            raise CollectionNotFoundError(collection_id)
+        tag_list = IngestionService.validate_tags(parse_tags(tags))
+        await operation_manager.ensure_idle(collection.id)
+
+        # Stage uploads on disk: the request's file handles close when it returns
+        staging_dir = Path(settings.UPLOAD_DIR) / "staging"
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        staged_files = []
+        for upload in files:
+            staged_path = staging_dir / generate_secure_filename(upload.filename or "upload")
+            with open(staged_path, "wb") as staged:
+                shutil.copyfileobj(upload.file, staged)
+            staged_files.append((upload.filename or "", str(staged_path)))
+
+        try:
+            record = await operation_manager.start(
+                "bulk_ingest",
+                f"Ingesting {len(staged_files)} documents into collection '{collection.name}'",
+                lambda context: run_bulk_ingest(context, collection.id, staged_files, tags=tag_list),
+                resource_id=collection.id
+            )
+        except OperationConflictError:
+            for _, staged_path in staged_files:
+                Path(staged_path).unlink(missing_ok=True)
+            raise
+        return to_operation_response(record)
+
+    except RAGException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to start bulk upload to collection {collection_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to initiate bulk upload"
+        )
+
+
+@router.put(
+    "/{document_id}",
+    response_model=DocumentUploadResponse,
+    dependencies=[Depends(authorize("documents:write"))]
+)
+async def replace_document(
+    document_id: str,
+    file: UploadFile = File(..., description="New version of the document file"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Upload a new version of a document and re-index only what changed.
+
+    Chunks whose content is unchanged keep their rows and vectors; removed
+    chunks are deleted and only new content is embedded.
+    """
+    try:
+        # Deleted documents are not found, so they cannot be brought back by a new version
+        document = await DocumentRepository(db).get_by_id(document_id)
+        if not document:
+            raise DocumentNotFoundError(document_id)
+        await operation_manager.ensure_idle(document.collection_id)
+
+        data = await file.read()
+        service = IngestionService(db)
+        result = await service.reingest_upload(document_id, file.filename or "", data)
+
+        return DocumentUploadResponse(
+            document=to_document_response(result.document),
+            duplicate=result.duplicate,
+            chunks_created=result.chunks_created,
+            chunks_kept=result.chunks_kept,
+            chunks_deleted=result.chunks_deleted,
+            chunks_queued=result.chunks_queued,
+            embeddings_cached=result.embeddings_cached,
+            embeddings_reused=result.embeddings_reused,
+            embeddings_generated=result.embeddings_generated
+        )
+
+    except RAGException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to replace document {document_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to replace document"
+        )
+
+
+@router.get("/", response_model=DocumentListResponse, dependencies=[Depends(authorize("documents:list"))])
+async def list_documents(
+    collection_id: str = Query(..., description="Collection ID"),
+    skip: int = Query(0, ge=0, description="Number of items to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Number of items to return"),
+    search: Optional[str] = Query(None, description="Search query for filename"),
+    status: Optional[DocumentStatus] = Query(None, description="Filter by document status"),
+    sort_by: str = Query("created_at", description="Sort field"),
+    sort_order: str = Query("desc", regex="^(asc|desc)$", description="Sort order"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Retrieve a paginated list of documents in a collection.
+    """
+    try:
+        repo = DocumentRepository(db)
+        documents, total = await repo.get_by_collection(
+            collection_id,
+            skip=skip,
+            limit=limit,
+            status=status,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order
+        )
+
+        return DocumentListResponse(
+            documents=[to_document_response(d) for d in documents],
+            total=total,
+            page=(skip // limit) + 1,
+            size=limit,
+            has_next=(skip + limit) < total,
+            has_previous=skip > 0
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to list documents for collection {collection_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve documents"
+        )
+
+
+@router.get("/{document_id}", response_model=DocumentResponse, dependencies=[Depends(authorize("documents:read"))])
+async def get_document(
+    document_id: str,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Retrieve detailed information about a specific document.
+    """
+    try:
+        repo = DocumentRepository(db)
+        document = await repo.get_by_id(document_id)
+
+        if not document:
+            raise DocumentNotFoundError(document_id)
+
+        return to_document_response(document)
+
+    except DocumentNotFoundError:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get document {document_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve document"
+        )
+
+
+@router.delete("/{document_id}", response_model=MessageResponse, dependencies=[Depends(authorize("documents:delete"))])
+async def delete_document(
+    document_id: str,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """
+    Delete a document, its chunks and their vectors.
+    """
+    try:
+        document_repo = DocumentRepository(db)
+        chunk_repo = ChunkRepository(db)
+        collection_repo = CollectionRepository(db)
+
+        document = await document_repo.get_by_id(document_id)
+        if not document:
+            raise DocumentNotFoundError(document_id)
+
+        collection = await collection_repo.get_by_id(document.collection_id)
+        if not collection:
+            raise CollectionNotFoundError(document.collection_id)
+
+        if collection.milvus_collection_name:
+            if not await milvus_manager.delete_document_vectors(collection.milvus_collection_name, [document_id]):
+                logger.warning(f"Failed to delete vectors for document {document_id}")
+
+        deleted_chunks = await chunk_repo.delete_by_document(document_id)
+        await document_repo.soft_delete(document_id)
+
+        # Ingestion only adds a document to the collection stats once it records counted_size
+        counted_size = (document.doc_metadata or {}).get("counted_size")
+        if counted_size is not None:
+            await collection_repo.update_stats(
+                collection.id,
+                document_count=max(0, collection.document_count - 1),
+                chunk_count=max(0, collection.chunk_count - document.chunk_count),
+                total_size=max(0, collection.total_size_bytes - counted_size)
+            )
+
+        logger.info(f"Deleted document {document.original_filename}")
+
+        return MessageResponse(
+            message=f"Document '{document.original_filename}' has been successfully deleted",
+            success=True,
+            data={"deleted_chunks": deleted_chunks}
+        )
+
+    except (DocumentNotFoundError, CollectionNotFoundError):
+        raise
+    except Exception as e:
+        logger.error(f"Failed to delete document {document_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to delete document"
+        )
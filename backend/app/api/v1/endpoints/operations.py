@@ -0,0 +1,59 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.auth import authorize
+from app.schemas.common import OperationResponse
+from app.services.operations import operation_manager
+from app.core.exceptions import OperationNotFoundError
+import structlog
+
+logger = structlog.get_logger(__name__)
+router = APIRouter()
+
+
+def to_operation_response(record: Dict[str, Any]) -> OperationResponse:
+    return OperationResponse(**record)
+
+
+@router.get("/{operation_id}", response_model=OperationResponse, dependencies=[Depends(authorize("operations:read"))])
+async def get_operation(operation_id: str):
+    """
+    Retrieve the status and progress of a long-running operation.
+    """
+    try:
+        return to_operation_response(await operation_manager.get(operation_id))
+
+    except OperationNotFoundError:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get operation {operation_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to retrieve operation"
+        )
+
+
+@router.post(
+    "/{operation_id}/cancel",
+    response_model=OperationResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(authorize("operations:cancel"))]
+)
+async def cancel_operation(operation_id: str):
+    """
+    Request cancellation of a running operation.
+
+    The operation stops at its next progress checkpoint and then reports
+    status 'cancelled'; finished operations are returned unchanged.
+    """
+    try:
+        return to_operation_response(await operation_manager.cancel(operation_id))
+
+    except OperationNotFoundError:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to cancel operation {operation_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to cancel operation"
+        )
@@ -0,0 +1,164 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import authorize, check_collection_access
+from app.core.database import get_db_session
+from app.models.api_key import APIKey
+from app.repositories.collection import CollectionRepository
+from app.schemas.search import (
+    AnswerRequest,
+    FederatedSearchRequest,
+    FederatedSearchResponse,
+    SearchRequest,
+    SearchResponse,
+    SearchResult
+)
+from app.services.answer import stream_answer_events
+from app.services.search import SearchService
+from app.core.exceptions import RAGException, CollectionNotFoundError
+import structlog
+
+logger = structlog.get_logger(__name__)
+router = APIRouter()
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search(
+    request: SearchRequest,
+    db: AsyncSession = Depends(get_db_session),
+    api_key: Optional[APIKey] = Depends(authorize("rag:search"))
+):
+    """
+    Semantic search over a collection's chunks.
+
+    Optional filters (documents, tags, page range, indexing date, metadata
+    values) are evaluated by Milvus on indexed scalar fields before ranking.
+    With `mmr`, results are picked by maximal marginal relevance so that
+    near-duplicate chunks do not crowd out other relevant ones.
+    """
+    check_collection_access(api_key, [request.collection_id])
+    try:
+        hits = await SearchService(db).search(
+            request.collection_id,
+            request.query,
+            top_k=request.top_k,
+            filters=request.filters,
+            mmr_lambda=request.mmr_lambda if request.mmr else None
+        )
+
+        results = [
+            SearchResult(
+                chunk_id=hit["chunk_id"],
+                document_id=hit["document_id"],
+                collection_id=hit["collection_id"],
+                content=hit["content"],
+                metadata=hit["metadata"] or {},
+                score=hit["score"]
+            )
+            for hit in hits
+        ]
+        return SearchResponse(
+            query=request.query,
+            collection_id=request.collection_id,
+            results=results,
+            total=len(results)
+        )
+
+    except RAGException:
+        raise
+    except Exception as e:
+        logger.error(f"Search failed in collection {request.collection_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search collection"
+        )
+
+
+@router.post("/search/federated", response_model=FederatedSearchResponse)
+async def federated_search(
+    request: FederatedSearchRequest,
+    db: AsyncSession = Depends(get_db_session),
+    api_key: Optional[APIKey] = Depends(authorize("rag:search"))
+):
+    """
+    Semantic search over several collections at once.
+
+    Collections are searched concurrently and their hits merged into one
+    ranking. Collections that miss the deadline (`timeout_ms`) or fail are
+    listed in `timed_out` / `failed` instead of failing the request.
+    """
+    check_collection_access(api_key, request.collection_ids)
+    try:
+        result = await SearchService(db).federated_search(
+            request.collection_ids,
+            request.query,
+            top_k=request.top_k,
+            filters=request.filters,
+            timeout_ms=request.timeout_ms
+        )
+
+        results = [
+            SearchResult(
+                chunk_id=hit["chunk_id"],
+                document_id=hit["document_id"],
+                collection_id=hit["collection_id"],
+                content=hit["content"],
+                metadata=hit["metadata"] or {},
+                score=hit["score"]
+            )
+            for hit in result.hits
+        ]
+        return FederatedSearchResponse(
+            query=request.query,
+            results=results,
+            total=len(results),
+            searched=result.searched,
+            timed_out=result.timed_out,
+            failed=result.failed
+        )
+
+    except RAGException:
+        raise
+    except Exception as e:
+        logger.error(f"Federated search failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search collections"
+        )
+
+
+@router.post("/answer")
+async def answer(
+    request: AnswerRequest,
+    db: AsyncSession = Depends(get_db_session),
+    api_key: Optional[APIKey] = Depends(authorize("rag:answer"))
+):
+    """
+    Answer a question from a collection's documents, streamed as server-sent events.
+
+    Events: `sources` (ranked hits, sent as soon as search returns), `token`
+    (answer text deltas as the model generates them), then `done` (cited
+    passages and stage timings) or `error`.
+    """
+    check_collection_access(api_key, [request.collection_id])
+    try:
+        # Fail fast with a 404 instead of an error event
+        if not await CollectionRepository(db).get_by_id(request.collection_id):
+            raise CollectionNotFoundError(request.collection_id)
+
+        return StreamingResponse(
+            stream_answer_events(request),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    except RAGException:
+        raise
+    except Exception as e:
+        logger.error(f"Answer failed in collection {request.collection_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to answer question"
+        )
@@ -0,0 +1,151 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import datetime
+import time
+import structlog
+
+from app.core.config import settings
+from app.core.redis_client import redis_manager
+from app.models.api_key import APIKey, APIKeyRole, APIKeyStatus
+
+logger = structlog.get_logger(__name__)
+
+INVALIDATION_CHANNEL = "api_key:invalidate"
+
+# Columns authentication needs; usage counters are left out since they change on every request
+SNAPSHOT_FIELDS = (
+    "id", "name", "key_hash", "key_prefix", "status", "role",
+    "allowed_collections", "allowed_operations", "ip_whitelist",
+    "rate_limit_per_minute", "rate_limit_per_hour", "rate_limit_per_day",
+    "expires_at",
+)
+
+
+def snapshot(api_key: APIKey) -> APIKey:
+    # Detached copy, safe to share between requests after the loading session closes
+    return APIKey(**{field: getattr(api_key, field) for field in SNAPSHOT_FIELDS})
+
+
+def serialize_snapshot(api_key: Optional[APIKey]) -> Dict[str, Any]:
+    if api_key is None:
+        return {"missing": True}
+    data = {field: getattr(api_key, field) for field in SNAPSHOT_FIELDS}
+    data["status"] = APIKeyStatus(api_key.status).value
+    data["role"] = APIKeyRole(api_key.role).value
+    data["expires_at"] = api_key.expires_at.isoformat() if api_key.expires_at else None
+    return data
+
+
+def deserialize_snapshot(data: Dict[str, Any]) -> Optional[APIKey]:
+    if data.get("missing"):
+        return None
+    data = {field: data.get(field) for field in SNAPSHOT_FIELDS}
+    data["status"] = APIKeyStatus(data["status"])
+    data["role"] = APIKeyRole(data["role"])
+    if data["expires_at"]:
+        data["expires_at"] = datetime.datetime.fromisoformat(data["expires_at"])
+    return APIKey(**data)
+
+
+class APIKeyCache:
+    """
+    Verified API keys by key_hash: an in-process dict in front of Redis in
+    front of the database, all with a TTL of API_KEY_CACHE_TTL_SECONDS.
+    Unknown hashes are cached too, so random keys cannot hammer the database.
+
+    Changing a key drops it locally, deletes it from Redis and publishes the
+    hash on INVALIDATION_CHANNEL, where every API process listens and drops
+    its own copy. Without Redis, other processes see the change within the TTL.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Tuple[float, Optional[APIKey]]] = {}
+        self.generation = 0  # bumped by every invalidation, so loads racing one are not cached
+        self.listener: Optional[asyncio.Task] = None
+
+    async def get(
+        self,
+        key_hash: str,
+        load: Callable[[str], Awaitable[Optional[APIKey]]]
+    ) -> Optional[APIKey]:
+        entry = self.entries.get(key_hash)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        generation = self.generation
+        data = await redis_manager.get(f"api_key:{key_hash}") if redis_manager.is_available else None
+        if isinstance(data, dict):
+            api_key = deserialize_snapshot(data)
+        else:
+            loaded = await load(key_hash)
+            api_key = snapshot(loaded) if loaded else None
+            if redis_manager.is_available and generation == self.generation:
+                await redis_manager.set(
+                    f"api_key:{key_hash}", serialize_snapshot(api_key), settings.API_KEY_CACHE_TTL_SECONDS
+                )
+
+        if generation == self.generation:
+            self.entries[key_hash] = (time.monotonic() + settings.API_KEY_CACHE_TTL_SECONDS, api_key)
+            if len(self.entries) > settings.API_KEY_CACHE_MAX_ENTRIES:
+                self._evict()
+        return api_key
+
+    def _evict(self):
+        now = time.monotonic()
+        for key_hash in [key_hash for key_hash, (expires, _) in self.entries.items() if expires <= now]:
+            del self.entries[key_hash]
+        while len(self.entries) > settings.API_KEY_CACHE_MAX_ENTRIES:
+            del self.entries[next(iter(self.entries))]
+
+    def discard(self, key_hash: str):
+        self.generation += 1
+        self.entries.pop(key_hash, None)
+
+    async def invalidate(self, key_hash: str):
+        self.discard(key_hash)
+        if not redis_manager.is_available:
+            return
+        await redis_manager.delete(f"api_key:{key_hash}")
+        await redis_manager.publish(INVALIDATION_CHANNEL, key_hash)
+
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = redis_manager.client.pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.discard(message["data"])
+                finally:
+                    await pubsub.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.warning(f"API key invalidation listener failed, retrying: {e}")
+                self.clear()
+                await asyncio.sleep(1)
+
+    async def start(self):
+        if self.listener is None and redis_manager.is_available:
+            self.listener = asyncio.create_task(self._listen())
+            logger.info("API key invalidation listener started")
+
+    async def close(self):
+        if self.listener:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except asyncio.CancelledError:
+                pass
+            self.listener = None
+        self.clear()
+
+
+# Global API key cache instance
+api_key_cache = APIKeyCache()
@@ -0,0 +1,125 @@
+from typing import Callable, Iterable, List, Optional
+from fastapi import Depends, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from app.core.api_key_cache import api_key_cache
+from app.core.config import settings
+from app.core.database import database_manager, get_db_session
+from app.core.exceptions import ForbiddenError, OperationNotFoundError, UnauthorizedError
+from app.core.security import APIKeyValidator, hash_api_key
+from app.models.api_key import APIKey, APIKeyRole
+from app.repositories.api_key import APIKeyRepository
+from app.repositories.document import DocumentRepository
+
+logger = structlog.get_logger(__name__)
+
+
+async def load_api_key(key_hash: str) -> Optional[APIKey]:
+    # Only cache misses open a session
+    api_key = None
+    async for session in database_manager.get_session():
+        api_key = await APIKeyRepository(session).get_by_hash(key_hash)
+    return api_key
+
+
+async def require_api_key(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    x_api_key: Optional[str] = Header(None)
+) -> Optional[APIKey]:
+    """
+    Authenticates the request by its `Authorization: Bearer <key>` or
+    `X-API-Key` header when API_KEY_AUTH_ENABLED is set. The key is checked
+    against a cached snapshot, so the database is only hit on a cache miss.
+    The key is also available to handlers as `request.state.api_key`.
+    """
+    if not settings.API_KEY_AUTH_ENABLED:
+        return None
+
+    raw_key = x_api_key or APIKeyValidator.extract_bearer_token(authorization)
+    if not APIKeyValidator.validate_key_format(raw_key):
+        raise UnauthorizedError()
+
+    api_key = await api_key_cache.get(hash_api_key(raw_key), load_api_key)
+    if api_key is None or not api_key.is_active:
+        raise UnauthorizedError()
+
+    client_ip = request.client.host if request.client else ""
+    if not api_key.is_ip_allowed(client_ip):
+        logger.warning(f"API key {api_key.key_prefix} used from address {client_ip} outside its whitelist")
+        raise ForbiddenError("api", "access from this address")
+
+    request.state.api_key = api_key
+    return api_key
+
+
+def check_collection_access(api_key: Optional[APIKey], collection_ids: Iterable[str]):
+    # No key means authentication is disabled
+    if api_key is None:
+        return
+    for collection_id in collection_ids:
+        if not api_key.can_access_collection(collection_id):
+            raise ForbiddenError(f"collection {collection_id}", "access")
+
+
+def accessible_collections(api_key: Optional[APIKey]) -> Optional[List[str]]:
+    # Collection ids the key is limited to, or None for all
+    if api_key is None or api_key.role == APIKeyRole.ADMIN or not api_key.allowed_collections:
+        return None
+    return list(api_key.allowed_collections)
+
+
+async def addressed_collections(request: Request, db: AsyncSession) -> List[str]:
+    """
+    Collections a request addresses through its URL: `collection_id` in the
+    path or query string, the collection of a `document_id` path parameter,
+    or the resources of an `operation_id` path parameter. Unknown documents
+    and operations address nothing, so the handler still answers 404.
+    """
+    from app.services.operations import operation_manager
+
+    collection_id = request.path_params.get("collection_id") or request.query_params.get("collection_id")
+    if collection_id:
+        return [collection_id]
+
+    document_id = request.path_params.get("document_id")
+    if document_id:
+        document = await DocumentRepository(db).get_by_id(document_id)
+        return [document.collection_id] if document else []
+
+    operation_id = request.path_params.get("operation_id")
+    if operation_id:
+        try:
+            record = await operation_manager.get(operation_id)
+        except OperationNotFoundError:
+            return []
+        if record.get("resource_ids") is not None:
+            return record["resource_ids"]
+        return [record["resource_id"]] if record.get("resource_id") else []
+
+    return []
+
+
+def authorize(operation: str) -> Callable:
+    """
+    Route dependency requiring the request's API key to allow `operation`
+    (see APIKey.has_permission) and to reach the collection addressed in the
+    URL. Collection ids sent in a body or form are checked by the handler
+    with check_collection_access. Returns the key, or None when
+    authentication is disabled.
+    """
+    async def dependency(
+        request: Request,
+        api_key: Optional[APIKey] = Depends(require_api_key),
+        db: AsyncSession = Depends(get_db_session)
+    ) -> Optional[APIKey]:
+        if api_key is None:
+            return None
+        if not api_key.has_permission(operation):
+            logger.warning(f"API key {api_key.key_prefix} denied {operation}")
+            raise ForbiddenError("api", operation)
+        check_collection_access(api_key, await addressed_collections(request, db))
+        return api_key
+
+    return dependency
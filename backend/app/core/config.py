@@ -1,4 +1,4 @@
-from typing import Optional, List, Union
+from typing import Optional, List, Dict, Union
 from pydantic_settings import BaseSettings
 from pydantic import validator, Field
 import os
@@ -12,10 +12,23 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     API_V1_STR: str = "/api/v1"
 
+    # Request deadlines: the X-Request-Timeout-Ms header (capped at the max),
+    # else the longest matching path prefix in REQUEST_TIMEOUTS, else the default
+    REQUEST_TIMEOUT_SECONDS: float = 30.0
+    REQUEST_TIMEOUT_MAX_SECONDS: float = 600.0
+    REQUEST_TIMEOUTS: Dict[str, float] = {
+        "/api/v1/rag/search": 10.0,
+        "/api/v1/rag/answer": 180.0,
+        "/api/v1/documents": 600.0,  # uploads embed inline when no workers run
+    }
+
     # Security
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
+    API_KEY_AUTH_ENABLED: bool = False  # require an API key on /api/v1 routes
+    API_KEY_CACHE_TTL_SECONDS: int = 60  # how long a verified key is trusted without rechecking
+    API_KEY_CACHE_MAX_ENTRIES: int = 10000
 
     # Database Configuration
     DATABASE_URL: str = "sqlite+aiosqlite:///./rag_pipeline.db"
@@ -31,11 +44,79 @@ class Settings(BaseSettings):
     MILVUS_USER: Optional[str] = None
     MILVUS_PASSWORD: Optional[str] = None
     MILVUS_DB_NAME: str = "rag_pipeline"
+    # document_id as partition key: document-scoped searches and deletes only
+    # touch the partitions the document hashes to (applies to new collections
+    # and forced rebuilds)
+    MILVUS_PARTITION_KEY_ENABLED: bool = True
+    MILVUS_NUM_PARTITIONS: int = 64
+    # Scalar indexes built with each collection (field -> index type) so
+    # filtered searches avoid brute-force predicate evaluation
+    MILVUS_SCALAR_INDEXES: Dict[str, str] = {
+        "document_id": "INVERTED",
+        "collection_id": "INVERTED",
+        "tags": "INVERTED",
+        "page": "STL_SORT",
+        "created_at": "STL_SORT",
+    }
+    # JSON-path indexes on chunk metadata (key -> cast type, e.g. {"section": "VARCHAR"});
+    # requires Milvus 2.5.11+
+    MILVUS_JSON_INDEXES: Dict[str, str] = {}
+    # Keep chunk text in Milvus next to the vector. Off: Milvus holds ids,
+    # filter fields and vectors only, and search hydrates text from SQL
+    MILVUS_STORE_CONTENT: bool = False
 
     # OpenAI Configuration
     OPENAI_API_KEY: str
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
     OPENAI_EMBEDDING_DIMENSIONS: int = 1536
+    OPENAI_API_BASE: str = "https://api.openai.com/v1"
+    OPENAI_REQUEST_TIMEOUT: float = 60.0
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_CACHE_TTL: int = 7 * 24 * 3600  # 1 week
+
+    # Answer generation (any OpenAI-compatible chat completions API)
+    LLM_API_BASE: Optional[str] = None  # defaults to OPENAI_API_BASE
+    LLM_API_KEY: Optional[str] = None  # defaults to OPENAI_API_KEY
+    LLM_MODEL: str = "gpt-4o-mini"
+    LLM_MAX_TOKENS: int = 1024
+    LLM_TEMPERATURE: float = 0.2
+    LLM_REQUEST_TIMEOUT: float = 120.0
+    RAG_ANSWER_TOP_K: int = 5
+    RAG_CONTEXT_NEIGHBORS: int = 1  # chunks on each side of a hit added to its passage
+    RAG_CONTEXT_FOLLOW_LINKS: bool = False  # walk previous/next chunk links instead of chunk_index ranges
+    RAG_MAX_CONTEXT_CHARS: int = 12000
+
+    # Semantic answer cache: answers are reused for questions whose embedding
+    # is at least this similar to an earlier one on the same collection
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95
+    SEMANTIC_CACHE_TTL_SECONDS: int = 3600
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1000  # per collection and answer settings
+    SEMANTIC_CACHE_MAX_INDEXES: int = 256
+
+    # Second-stage reranking of search hits: none, lexical (BM25 blended with
+    # the vector score) or cross_encoder (RERANK_API_BASE, else a local
+    # sentence-transformers model)
+    RERANKER: str = "none"
+    RERANK_CANDIDATES: int = 100  # vector hits fetched for the reranker to reorder
+    RERANK_TIMEOUT_MS: int = 300  # past this budget hits keep their vector order
+    RERANK_LEXICAL_WEIGHT: float = 0.3
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_API_BASE: Optional[str] = None
+    RERANK_API_KEY: Optional[str] = None
+    RERANK_BATCH_SIZE: int = 32
+
+    # MMR diversity selection picks top_k out of this many times more candidates
+    MMR_CANDIDATE_FACTOR: int = 4
+
+    # Search results cached in Redis per collection version, query, top_k and filters
+    RETRIEVAL_CACHE_ENABLED: bool = True
+    RETRIEVAL_CACHE_TTL: int = 3600
+
+    # Federated search over several collections: collections still searching
+    # at the deadline are left out of the merged results
+    FEDERATED_SEARCH_MAX_COLLECTIONS: int = 50
+    FEDERATED_SEARCH_TIMEOUT_MS: int = 2000
 
     # File Upload Configuration
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
@@ -46,6 +127,13 @@ class Settings(BaseSettings):
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     MAX_CHUNKS_PER_DOCUMENT: int = 1000
+    CHUNK_TOKENIZER: str = "approximate"  # "approximate" or "tiktoken"
+
+    # Document Parsing Configuration
+    PARSER_MAX_WORKERS: Optional[int] = None  # None = os.cpu_count()
+    PARSER_PAGES_PER_TASK: int = 16
+    PARSER_TIMEOUT_SECONDS: float = 300.0
+    PARSER_MEMORY_LIMIT_MB: int = 1024
 
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 100
@@ -56,6 +144,20 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
 
+    # Embedding workers
+    EMBEDDING_WORKER_MODE: str = "auto"  # "inline", "asyncio", "celery" or "auto"
+    EMBEDDING_WORKER_CONCURRENCY: int = 2  # asyncio workers inside the API process
+    EMBEDDING_WORKER_BATCH_SIZE: int = 100
+    EMBEDDING_WORKER_POLL_INTERVAL: float = 5.0
+    EMBEDDING_WORKER_LEASE_SECONDS: int = 300  # claimed batches are reclaimable after this
+    EMBEDDING_WORKER_SWEEP_INTERVAL: float = 60.0  # celery beat safety net for missed notifications
+
+    # SQL/Milvus reconciliation
+    RECONCILE_BATCH_SIZE: int = 1000
+
+    # Long-running operations
+    OPERATION_TTL_SECONDS: int = 24 * 3600  # how long finished operations stay queryable
+
     # CORS Configuration
     BACKEND_CORS_ORIGINS: Union[str, List[str]] = Field(
         default="http://localhost:3000,http://localhost:3001,http://localhost:8000,https://localhost:3000,https://localhost:3001,https://localhost:8000"
@@ -1,10 +1,14 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase
 import structlog
 
 from app.core.config import settings
+from app.core.deadline import bounded, remaining
 
 logger = structlog.get_logger(__name__)
 
@@ -13,6 +17,44 @@ class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
+# Columns added to tables that existing databases already have; create_all only creates missing tables
+ADDED_COLUMNS: List[Tuple[str, str]] = [
+    ("chunks", "lease_owner"),
+    ("chunks", "lease_expires_at"),
+    ("collections", "version"),
+]
+
+
+def upgrade_schema(connection):
+    """
+    Brings a database created by an earlier version up to the models: adds
+    the ADDED_COLUMNS it lacks, then any index declared on the models that
+    does not exist yet. Safe to run on every startup.
+    """
+    inspector = inspect(connection)
+    tables = Base.metadata.tables
+    for table_name, column_name in ADDED_COLUMNS:
+        if column_name in {column["name"] for column in inspector.get_columns(table_name)}:
+            continue
+        column_ddl = CreateColumn(tables[table_name].c[column_name]).compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_ddl}"))
+        logger.info(f"Added column {table_name}.{column_name}")
+
+    inspector = inspect(connection)
+    for table in tables.values():
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                with connection.begin_nested():
+                    index.create(connection)
+                logger.info(f"Created index {index.name}")
+            except IntegrityError as e:
+                # Unique index over rows that already violate it; the app keeps working without it
+                logger.error(f"Could not create index {index.name}, existing rows conflict: {e}")
+
+
 class DatabaseManager:
     def __init__(self):
         self.engine = None
@@ -39,9 +81,10 @@ class DatabaseManager:
                 autocommit=False,
             )
 
-            # Create tables if they don't exist
+            # Create tables if they don't exist, and add what older databases are missing
             async with self.engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(upgrade_schema)
 
             self._initialized = True
             logger.info("Database initialized successfully")
@@ -53,6 +96,7 @@ class DatabaseManager:
     async def close(self):
         if self.engine:
             await self.engine.dispose()
+            self._initialized = False
             logger.info("Database connection closed")
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -61,6 +105,9 @@ class DatabaseManager:
 
         async with self.async_session_factory() as session:
             try:
+                if remaining() is not None:
+                    # Within a request, wait for a pooled connection only as long as the deadline allows
+                    await bounded("database connection", session.connection())
                 yield session
             except Exception as e:
                 await session.rollback()
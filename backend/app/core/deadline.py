@@ -0,0 +1,180 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+from contextvars import ContextVar, Token
+import asyncio
+import json
+import time
+import structlog
+
+from app.core.config import settings
+from app.core.exceptions import DeadlineExceededError
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+TIMEOUT_HEADER = b"x-request-timeout-ms"
+CLIENT_CLOSED_REQUEST = 499  # nginx's status for requests abandoned by the client
+
+# Monotonic time by which the current request must finish; None outside requests
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def set_deadline(timeout: Optional[float]) -> Token:
+    return _deadline.set(time.monotonic() + timeout if timeout is not None else None)
+
+
+def reset_deadline(token: Token):
+    _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    # Seconds left for the current request, or None without a deadline
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline(operation: str):
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(operation)
+
+
+def budget(default: Optional[float] = None) -> Optional[float]:
+    # Timeout for one backend call: its own limit, shortened to what the request has left
+    left = remaining()
+    if left is None:
+        return default
+    left = max(left, 0.0)
+    return left if default is None else min(default, left)
+
+
+async def bounded(operation: str, awaitable: Awaitable[T]) -> T:
+    """
+    Await a backend call within the request deadline; DeadlineExceededError
+    if it runs out first.
+    """
+    timeout = remaining()
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(timeout, 0.0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceededError(operation)
+
+
+def request_timeout(path: str, headers: Dict[bytes, bytes]) -> float:
+    requested = headers.get(TIMEOUT_HEADER)
+    if requested:
+        try:
+            return min(max(int(requested) / 1000, 0.001), settings.REQUEST_TIMEOUT_MAX_SECONDS)
+        except ValueError:
+            pass
+
+    matches = [prefix for prefix in settings.REQUEST_TIMEOUTS if path.startswith(prefix)]
+    if matches:
+        return settings.REQUEST_TIMEOUTS[max(matches, key=len)]
+    return settings.REQUEST_TIMEOUT_SECONDS
+
+
+class RequestDeadlineMiddleware:
+    """
+    Gives each HTTP request a deadline that backend clients read through
+    remaining()/budget(), and cancels the handler once the deadline passes
+    or the client disconnects. Cancellation unwinds the handler, so its
+    database session is closed and in-flight Redis/Milvus/provider calls are
+    abandoned instead of holding connections for a client that is gone.
+
+    The middleware owns the connection's receive channel: the handler gets
+    the request body as usual, and once it has been read the middleware keeps
+    listening for the disconnect.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        timeout = request_timeout(scope["path"], headers)
+        has_body = headers.get(b"content-length", b"0") != b"0" or b"transfer-encoding" in headers
+
+        body_read = asyncio.Event()
+        disconnected = asyncio.Event()
+        response_started = False
+        body_sent = False
+
+        async def handler_receive() -> Dict[str, Any]:
+            nonlocal body_sent
+            if has_body and not body_read.is_set():
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                elif not message.get("more_body", False):
+                    body_read.set()
+                return message
+            if not has_body and not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def handler_send(message: Dict[str, Any]):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        async def watch_disconnect():
+            if has_body:
+                await body_read.wait()
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    return
+
+        token = set_deadline(timeout)
+        # Tasks copy the current context, so the handler sees the deadline
+        handler = asyncio.create_task(self.app(scope, handler_receive, handler_send))
+        watcher = asyncio.create_task(watch_disconnect())
+        disconnect = asyncio.create_task(disconnected.wait())
+        try:
+            done, _ = await asyncio.wait({handler, disconnect}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if handler in done:
+                await handler
+                return
+
+            handler.cancel()
+            try:
+                await handler
+            except asyncio.CancelledError:
+                pass
+
+            if disconnect in done:
+                # Nobody reads it, but the middleware above still gets to log a response
+                logger.info(f"Client disconnected, cancelled {scope['method']} {scope['path']}")
+                status_code, error = CLIENT_CLOSED_REQUEST, "Client closed request"
+            else:
+                logger.warning(f"Request deadline of {timeout:.3f}s exceeded, cancelled {scope['method']} {scope['path']}")
+                status_code, error = 504, "Request deadline exceeded"
+
+            if not response_started:
+                body = json.dumps({
+                    "error": error,
+                    "details": {"timeout_seconds": timeout},
+                    "status_code": status_code
+                }).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": status_code,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+                })
+                await send({"type": "http.response.body", "body": body})
+        finally:
+            handler.cancel()
+            watcher.cancel()
+            disconnect.cancel()
+            reset_deadline(token)
@@ -42,6 +42,15 @@ class DocumentNotFoundError(RAGException):
         )
 
 
+class DocumentAlreadyExistsError(RAGException):
+    def __init__(self, document_id: str):
+        super().__init__(
+            message=f"The same file is already stored in this collection as document '{document_id}'",
+            status_code=status.HTTP_409_CONFLICT,
+            details={"document_id": document_id}
+        )
+
+
 class InvalidFileTypeError(RAGException):
     def __init__(self, file_type: str, allowed_types: list):
         super().__init__(
@@ -60,6 +69,33 @@ class FileSizeExceededError(RAGException):
         )
 
 
+class DocumentParsingError(RAGException):
+    def __init__(self, filename: str, details: str = ""):
+        super().__init__(
+            message=f"Failed to extract text from '{filename}': {details}",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            details={"filename": filename, "error": details}
+        )
+
+
+class OperationNotFoundError(RAGException):
+    def __init__(self, operation_id: str):
+        super().__init__(
+            message=f"Operation with id '{operation_id}' not found",
+            status_code=status.HTTP_404_NOT_FOUND,
+            details={"operation_id": operation_id}
+        )
+
+
+class OperationConflictError(RAGException):
+    def __init__(self, resource_id: str, operation_id: str):
+        super().__init__(
+            message=f"Operation '{operation_id}' is already running on '{resource_id}'",
+            status_code=status.HTTP_409_CONFLICT,
+            details={"resource_id": resource_id, "operation_id": operation_id}
+        )
+
+
 class DatabaseConnectionError(RAGException):
     def __init__(self, details: str = ""):
         super().__init__(
@@ -87,6 +123,24 @@ class EmbeddingGenerationError(RAGException):
         )
 
 
+class AnswerGenerationError(RAGException):
+    def __init__(self, details: str = ""):
+        super().__init__(
+            message=f"Failed to generate answer: {details}",
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            details={"error": details}
+        )
+
+
+class DeadlineExceededError(RAGException):
+    def __init__(self, operation: str):
+        super().__init__(
+            message=f"Request deadline exceeded during {operation}",
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            details={"operation": operation}
+        )
+
+
 class RateLimitExceededError(RAGException):
     def __init__(self, limit_type: str, reset_time: Optional[int] = None):
         message = f"Rate limit exceeded for {limit_type}"
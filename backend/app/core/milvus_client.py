@@ -1,4 +1,7 @@
-from typing import List, Dict, Any, Optional
+from typing import AsyncGenerator, List, Dict, Any, Optional
+import asyncio
+import json
+import time
 import structlog
 from pymilvus import (
     connections,
@@ -9,14 +12,55 @@ from pymilvus import (
     utility
 )
 from app.core.config import settings
+from app.core.deadline import budget, check_deadline
+from app.core.exceptions import DeadlineExceededError
 
 logger = structlog.get_logger(__name__)
 
+NO_PAGE = -1  # page field value for chunks of unpaginated formats
+MAX_TAGS = 20
+MAX_TAG_LENGTH = 50
+
+
+# Vector storage type -> Milvus vector field type
+VECTOR_DATA_TYPES = {
+    "float32": DataType.FLOAT_VECTOR,
+    "float16": DataType.FLOAT16_VECTOR,
+    "bfloat16": DataType.BFLOAT16_VECTOR,
+    "binary": DataType.BINARY_VECTOR,
+}
+
+
+def vector_index_params(vector_type: str, index_type: str) -> Dict[str, Any]:
+    if vector_type == "binary":
+        return {"metric_type": "HAMMING", "index_type": "BIN_IVF_FLAT", "params": {"nlist": 1024}}
+    if index_type == "HNSW":
+        return {"metric_type": "COSINE", "index_type": "HNSW", "params": {"M": 16, "efConstruction": 200}}
+    return {"metric_type": "COSINE", "index_type": index_type, "params": {"nlist": 1024}}
+
+
+def vector_search_params(index_params: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    if index_params.get("index_type") == "HNSW":
+        return {"metric_type": index_params["metric_type"], "params": {"ef": max(64, limit)}}
+    return {"metric_type": index_params["metric_type"], "params": {"nprobe": 10}}
+
+
+def in_expr(field: str, values: List[str]) -> str:
+    # JSON string literals are valid Milvus string literals, so quotes and
+    # backslashes in ids are escaped instead of breaking the expression
+    return f"{field} in {json.dumps(list(values), ensure_ascii=False)}"
+
+
+def and_expr(*exprs: Optional[str]) -> Optional[str]:
+    parts = [f"({expr})" for expr in exprs if expr]
+    return " and ".join(parts) or None
+
 
 class MilvusManager:
     def __init__(self):
         self._initialized = False
         self.collections = {}
+        self.index_params: Dict[str, Dict[str, Any]] = {}  # embedding index per collection name
 
     async def initialize(self):
         if self._initialized:
@@ -46,7 +90,7 @@ class MilvusManager:
         except Exception as e:
             logger.error(f"Error closing Milvus connection: {e}")
 
-    def create_collection_schema(self) -> CollectionSchema:
+    def create_collection_schema(self, vector_type: str = "float32", dim: Optional[int] = None) -> CollectionSchema:
         fields = [
             FieldSchema(
                 name="chunk_id",
@@ -59,6 +103,7 @@ class MilvusManager:
                 name="document_id",
                 dtype=DataType.VARCHAR,
                 max_length=255,
+                is_partition_key=settings.MILVUS_PARTITION_KEY_ENABLED,
                 description="Document identifier"
             ),
             FieldSchema(
@@ -67,21 +112,43 @@ class MilvusManager:
                 max_length=255,
                 description="Collection identifier"
             ),
-            FieldSchema(
+        ]
+        if settings.MILVUS_STORE_CONTENT:
+            fields.append(FieldSchema(
                 name="content",
                 dtype=DataType.VARCHAR,
                 max_length=65535,
                 description="Text content of the chunk"
-            ),
+            ))
+        fields += [
             FieldSchema(
                 name="metadata",
                 dtype=DataType.JSON,
                 description="Additional metadata"
             ),
+            # Filterable metadata promoted to typed fields so it can be indexed
+            FieldSchema(
+                name="page",
+                dtype=DataType.INT64,
+                description="Source page number, -1 if unknown"
+            ),
+            FieldSchema(
+                name="tags",
+                dtype=DataType.ARRAY,
+                element_type=DataType.VARCHAR,
+                max_capacity=MAX_TAGS,
+                max_length=MAX_TAG_LENGTH,
+                description="Document tags"
+            ),
+            FieldSchema(
+                name="created_at",
+                dtype=DataType.INT64,
+                description="Chunk creation time (Unix seconds, UTC)"
+            ),
             FieldSchema(
                 name="embedding",
-                dtype=DataType.FLOAT_VECTOR,
-                dim=settings.OPENAI_EMBEDDING_DIMENSIONS,
+                dtype=VECTOR_DATA_TYPES[vector_type],
+                dim=dim or settings.OPENAI_EMBEDDING_DIMENSIONS,
                 description="Text embedding vector"
             )
         ]
@@ -94,7 +161,34 @@ class MilvusManager:
 
         return schema
 
-    async def create_collection(self, collection_name: str) -> bool:
+    @staticmethod
+    def physical_collection_name(alias: str) -> str:
+        # Versioned name of a physical collection served under a stable alias
+        return f"{alias}__v{int(time.time() * 1000)}"
+
+    async def resolve_alias(self, alias: str) -> Optional[str]:
+        """
+        Return the physical collection an alias currently points at, or None
+        when the alias is unset (including collections created before aliases
+        were used, which are plain collections under the alias name).
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        prefix = f"{alias}__v"
+        for name in utility.list_collections():
+            if name.startswith(prefix) and alias in utility.list_aliases(name):
+                return name
+        return None
+
+    async def create_physical_collection(
+        self,
+        collection_name: str,
+        vector_type: str = "float32",
+        dim: Optional[int] = None,
+        index_type: str = "IVF_FLAT",
+        index_params: Optional[Dict[str, Any]] = None
+    ) -> bool:
         try:
             if not self._initialized:
                 await self.initialize()
@@ -103,21 +197,20 @@ class MilvusManager:
                 logger.info(f"Collection {collection_name} already exists")
                 return True
 
-            schema = self.create_collection_schema()
+            schema = self.create_collection_schema(vector_type, dim)
+            options = {}
+            if settings.MILVUS_PARTITION_KEY_ENABLED:
+                options["num_partitions"] = settings.MILVUS_NUM_PARTITIONS
             collection = Collection(
                 name=collection_name,
                 schema=schema,
-                using='default'
+                using='default',
+                **options
             )
 
             # Create index for vector search
-            index_params = {
-                "metric_type": "COSINE",
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": 1024}
-            }
-
-            collection.create_index("embedding", index_params)
+            collection.create_index("embedding", index_params or vector_index_params(vector_type, index_type))
+            self._create_scalar_indexes(collection)
             self.collections[collection_name] = collection
 
             logger.info(f"Collection {collection_name} created successfully")
@@ -127,24 +220,124 @@ class MilvusManager:
             logger.error(f"Failed to create collection {collection_name}: {e}")
             return False
 
-    async def delete_collection(self, collection_name: str) -> bool:
+    def _create_scalar_indexes(self, collection: Collection):
+        # A missing scalar index only slows filtered search down, so failures
+        # (e.g. JSON-path indexes on an older server) are logged, not raised
+        indexes = [
+            (field, {"index_type": index_type}, f"{field}_idx")
+            for field, index_type in settings.MILVUS_SCALAR_INDEXES.items()
+        ] + [
+            (
+                "metadata",
+                {
+                    "index_type": "INVERTED",
+                    "params": {"json_path": f'metadata[{json.dumps(key)}]', "json_cast_type": cast_type}
+                },
+                f"metadata_{key}_idx"
+            )
+            for key, cast_type in settings.MILVUS_JSON_INDEXES.items()
+        ]
+
+        for field, index_params, index_name in indexes:
+            try:
+                collection.create_index(field, index_params, index_name=index_name)
+            except Exception as e:
+                logger.warning(f"Failed to create index {index_name} on {collection.name}: {e}")
+
+    async def create_collection(self, collection_name: str, **vector_options) -> bool:
+        # collection_name is the alias clients use; the data lives in a versioned
+        # physical collection so it can later be rebuilt and swapped atomically
         try:
             if not self._initialized:
                 await self.initialize()
 
+            # has_collection also resolves aliases
             if utility.has_collection(collection_name):
-                utility.drop_collection(collection_name)
-                if collection_name in self.collections:
-                    del self.collections[collection_name]
-                logger.info(f"Collection {collection_name} deleted successfully")
+                logger.info(f"Collection {collection_name} already exists")
                 return True
 
+            physical_name = self.physical_collection_name(collection_name)
+            if not await self.create_physical_collection(physical_name, **vector_options):
+                return False
+
+            utility.create_alias(physical_name, collection_name)
+            logger.info(f"Alias {collection_name} created for {physical_name}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to create collection {collection_name}: {e}")
+            return False
+
+    async def swap_alias(self, alias: str, collection_name: str) -> Optional[str]:
+        """
+        Point alias at collection_name and return the physical collection it
+        served before, if any, for the caller to drop. alter_alias is atomic:
+        searches go to either the old or the new collection, never to a
+        missing one. A plain collection created before aliases were used is
+        renamed aside and returned instead; the alias cannot share its name,
+        so that first swap leaves a gap of two metadata calls.
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        previous = await self.resolve_alias(alias)
+        if previous:
+            utility.alter_alias(collection_name, alias)
+        elif utility.has_collection(alias):
+            previous = f"{alias}__legacy"
+            logger.warning(f"Replacing plain collection {alias} with an alias; it is kept as {previous}")
+            utility.rename_collection(alias, previous)
+            try:
+                utility.create_alias(collection_name, alias)
+            except Exception:
+                # Put the data back under its name rather than leave nothing there
+                utility.rename_collection(previous, alias)
+                raise
+        else:
+            utility.create_alias(collection_name, alias)
+
+        # Cached handles carry the old schema
+        self.collections.pop(alias, None)
+        self.index_params.pop(alias, None)
+        logger.info(f"Alias {alias} now points at {collection_name}", previous=previous)
+        return previous
+
+    async def delete_collection(self, collection_name: str) -> bool:
+        try:
+            if not self._initialized:
+                await self.initialize()
+
+            physical_name = await self.resolve_alias(collection_name)
+            if physical_name:
+                utility.drop_alias(collection_name)
+                utility.drop_collection(physical_name)
+                self.collections.pop(physical_name, None)
+            elif utility.has_collection(collection_name):
+                utility.drop_collection(collection_name)
+
+            self.collections.pop(collection_name, None)
+            self.index_params.pop(collection_name, None)
+            logger.info(f"Collection {collection_name} deleted successfully")
             return True
 
         except Exception as e:
             logger.error(f"Failed to delete collection {collection_name}: {e}")
             return False
 
+    async def load_collection(self, collection_name: str) -> bool:
+        # Blocks until the collection is searchable
+        try:
+            collection = self.get_collection(collection_name)
+            if not collection:
+                return False
+            await asyncio.to_thread(collection.flush)
+            await asyncio.to_thread(collection.load)
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to load collection {collection_name}: {e}")
+            return False
+
     def get_collection(self, collection_name: str) -> Optional[Collection]:
         try:
             if collection_name not in self.collections:
@@ -159,28 +352,73 @@ class MilvusManager:
             logger.error(f"Failed to get collection {collection_name}: {e}")
             return None
 
-    async def insert_vectors(self, collection_name: str, data: List[Dict[str, Any]]) -> bool:
+    def vector_format(self, collection_name: str) -> Optional[tuple[str, int]]:
+        # (vector type, dimensions) of the embedding field actually stored
+        collection = self.get_collection(collection_name)
+        if not collection:
+            return None
+        for field in collection.schema.fields:
+            if field.name == "embedding":
+                for vector_type, dtype in VECTOR_DATA_TYPES.items():
+                    if field.dtype == dtype:
+                        return vector_type, field.params["dim"]
+        return None
+
+    def _index_params(self, collection_name: str, collection: Collection) -> Dict[str, Any]:
+        if collection_name not in self.index_params:
+            params = {"metric_type": "COSINE", "index_type": "IVF_FLAT"}
+            for index in collection.indexes:
+                if index.field_name == "embedding":
+                    params = index.params
+            self.index_params[collection_name] = params
+        return self.index_params[collection_name]
+
+    @staticmethod
+    def stores_content(collection: Collection) -> bool:
+        # Collections built before MILVUS_STORE_CONTENT was turned off keep their text
+        return any(field.name == "content" for field in collection.schema.fields)
+
+    async def insert_vectors(self, collection_name: str, data: List[Dict[str, Any]], flush: bool = True) -> bool:
         try:
             collection = self.get_collection(collection_name)
             if not collection:
                 logger.error(f"Collection {collection_name} not found")
                 return False
 
-            collection.insert(data)
-            collection.flush()
+            if not self.stores_content(collection):
+                # Would otherwise land in the dynamic field
+                data = [{key: value for key, value in row.items() if key != "content"} for row in data]
+
+            check_deadline("milvus upsert")
+            timeout = budget()
+
+            def upsert():
+                # Upsert on chunk_id so a batch replayed after an expired lease
+                # replaces its vectors instead of duplicating them
+                collection.upsert(data, timeout=timeout)
+                if flush:
+                    collection.flush(timeout=timeout)
+
+            # Writes and flushes block for a while; keep them off the event loop
+            await asyncio.to_thread(upsert)
             logger.info(f"Inserted {len(data)} vectors into {collection_name}")
             return True
 
+        except DeadlineExceededError:
+            raise
         except Exception as e:
+            check_deadline("milvus upsert")
             logger.error(f"Failed to insert vectors into {collection_name}: {e}")
             return False
 
     async def search_vectors(
         self,
         collection_name: str,
-        query_vectors: List[List[float]],
+        query_vectors: List[Any],
         top_k: int = 10,
-        filters: Optional[str] = None
+        filters: Optional[str] = None,
+        document_ids: Optional[List[str]] = None,
+        search_params: Optional[Dict[str, Any]] = None
     ) -> List[List[Dict[str, Any]]]:
         try:
             collection = self.get_collection(collection_name)
@@ -188,18 +426,33 @@ class MilvusManager:
                 logger.error(f"Collection {collection_name} not found")
                 return []
 
-            collection.load()
-
-            search_params = {"metric_type": "COSINE", "params": {"nprobe": 10}}
-
-            results = collection.search(
-                data=query_vectors,
-                anns_field="embedding",
-                param=search_params,
-                limit=top_k,
-                expr=filters,
-                output_fields=["chunk_id", "document_id", "collection_id", "content", "metadata"]
-            )
+            search_params = search_params or vector_search_params(self._index_params(collection_name, collection), top_k)
+            # Hamming distances become a similarity in [0, 1] like cosine scores
+            hamming_bits = self.vector_format(collection_name)[1] if search_params["metric_type"] == "HAMMING" else None
+            output_fields = ["chunk_id", "document_id", "collection_id", "metadata"]
+            if self.stores_content(collection):
+                output_fields.append("content")
+
+            check_deadline("milvus search")
+            # The request's remaining time doubles as the gRPC deadline, so Milvus
+            # stops work for a request that was abandoned or ran out of time
+            timeout = budget()
+
+            def search():
+                collection.load(timeout=timeout)
+                return collection.search(
+                    data=query_vectors,
+                    anns_field="embedding",
+                    param=search_params,
+                    limit=top_k,
+                    # A document_id condition lets Milvus prune to the matching partitions
+                    expr=and_expr(in_expr("document_id", document_ids) if document_ids else None, filters),
+                    output_fields=output_fields,
+                    timeout=timeout
+                )
+
+            # Blocking gRPC calls run off the event loop so concurrent searches overlap
+            results = await asyncio.to_thread(search)
 
             formatted_results = []
             for result in results:
@@ -209,36 +462,139 @@ class MilvusManager:
                         "chunk_id": hit.entity.get("chunk_id"),
                         "document_id": hit.entity.get("document_id"),
                         "collection_id": hit.entity.get("collection_id"),
-                        "content": hit.entity.get("content"),
+                        "content": hit.entity.get("content"),  # None unless stored in Milvus
                         "metadata": hit.entity.get("metadata"),
-                        "score": hit.score
+                        "score": 1 - hit.distance / hamming_bits if hamming_bits else hit.score
                     })
                 formatted_results.append(hits)
 
             return formatted_results
 
+        except DeadlineExceededError:
+            raise
         except Exception as e:
+            check_deadline("milvus search")
             logger.error(f"Failed to search vectors in {collection_name}: {e}")
             return []
 
-    async def delete_vectors(self, collection_name: str, chunk_ids: List[str]) -> bool:
+    async def get_vectors(self, collection_name: str, chunk_ids: List[str]) -> Dict[str, Any]:
+        # Stored representation: float lists, or bytes for float16/bfloat16/binary fields
+        try:
+            collection = self.get_collection(collection_name)
+            if not collection or not chunk_ids:
+                return {}
+
+            check_deadline("milvus query")
+            timeout = budget()
+
+            def query():
+                collection.load(timeout=timeout)
+                return collection.query(
+                    expr=in_expr("chunk_id", chunk_ids),
+                    output_fields=["chunk_id", "embedding"],
+                    timeout=timeout
+                )
+
+            results = await asyncio.to_thread(query)
+
+            vectors = {}
+            for row in results:
+                vector = row["embedding"]
+                if isinstance(vector, list) and vector and isinstance(vector[0], (bytes, bytearray)):
+                    vector = b"".join(vector)
+                vectors[row["chunk_id"]] = vector if isinstance(vector, (bytes, bytearray)) else list(vector)
+            return vectors
+
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            check_deadline("milvus query")
+            logger.error(f"Failed to fetch vectors from {collection_name}: {e}")
+            return {}
+
+    async def iterate_chunk_ids(self, collection_name: str, batch_size: int = 1000) -> AsyncGenerator[List[str], None]:
+        """
+        Stream all primary keys of a collection in ascending order, one batch
+        at a time, without holding the full key set in memory.
+        """
+        collection = self.get_collection(collection_name)
+        if not collection:
+            raise ValueError(f"Collection {collection_name} not found")
+
+        def open_iterator():
+            collection.load(timeout=budget())
+            return collection.query_iterator(
+                batch_size=batch_size,
+                expr='chunk_id != ""',
+                output_fields=["chunk_id"]
+            )
+
+        iterator = await asyncio.to_thread(open_iterator)
+        try:
+            while True:
+                batch = await asyncio.to_thread(iterator.next)
+                if not batch:
+                    break
+                yield [row["chunk_id"] for row in batch]
+        finally:
+            await asyncio.to_thread(iterator.close)
+
+    @staticmethod
+    def _delete_and_flush(collection: Collection, expr: str, timeout: Optional[float]):
+        # Blocking; called through asyncio.to_thread
+        collection.delete(expr, timeout=timeout)
+        collection.flush(timeout=timeout)
+
+    async def delete_vectors(
+        self,
+        collection_name: str,
+        chunk_ids: List[str],
+        document_id: Optional[str] = None
+    ) -> bool:
+        # Passing the owning document restricts the delete to its partition
         try:
             collection = self.get_collection(collection_name)
             if not collection:
                 logger.error(f"Collection {collection_name} not found")
                 return False
 
-            ids_expr = f"chunk_id in {chunk_ids}"
-            collection.delete(ids_expr)
-            collection.flush()
+            ids_expr = and_expr(
+                in_expr("document_id", [document_id]) if document_id else None,
+                in_expr("chunk_id", chunk_ids)
+            )
+            check_deadline("milvus delete")
+            await asyncio.to_thread(self._delete_and_flush, collection, ids_expr, budget())
 
             logger.info(f"Deleted {len(chunk_ids)} vectors from {collection_name}")
             return True
 
+        except DeadlineExceededError:
+            raise
         except Exception as e:
+            check_deadline("milvus delete")
             logger.error(f"Failed to delete vectors from {collection_name}: {e}")
             return False
 
+    async def delete_document_vectors(self, collection_name: str, document_ids: List[str]) -> bool:
+        try:
+            collection = self.get_collection(collection_name)
+            if not collection:
+                logger.error(f"Collection {collection_name} not found")
+                return False
+
+            check_deadline("milvus delete")
+            await asyncio.to_thread(self._delete_and_flush, collection, in_expr("document_id", document_ids), budget())
+
+            logger.info(f"Deleted vectors of {len(document_ids)} documents from {collection_name}")
+            return True
+
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            check_deadline("milvus delete")
+            logger.error(f"Failed to delete document vectors from {collection_name}: {e}")
+            return False
+
     async def get_collection_stats(self, collection_name: str) -> Optional[Dict[str, Any]]:
         try:
             collection = self.get_collection(collection_name)
@@ -1,8 +1,9 @@
 import json
-from typing import Any, Optional, Union
+from typing import Any, List, Optional, Union
 import redis.asyncio as redis
 import structlog
 from app.core.config import settings
+from app.core.deadline import bounded
 
 logger = structlog.get_logger(__name__)
 
@@ -36,9 +37,14 @@ class RedisManager:
             logger.error(f"Failed to initialize Redis: {e}")
             raise
 
+    @property
+    def is_available(self) -> bool:
+        return self._initialized
+
     async def close(self):
         if self.client:
             await self.client.close()
+            self._initialized = False
             logger.info("Redis connection closed")
 
     async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
@@ -49,20 +55,30 @@ class RedisManager:
             if isinstance(value, (dict, list)):
                 value = json.dumps(value)
 
-            result = await self.client.set(key, value)
+            result = await bounded("redis set", self.client.set(key, value))
             if expire:
-                await self.client.expire(key, expire)
+                await bounded("redis expire", self.client.expire(key, expire))
             return result
         except Exception as e:
             logger.error(f"Redis set error: {e}")
             return False
 
+    async def set_if_absent(self, key: str, value: str, expire: int) -> bool:
+        try:
+            if not self._initialized:
+                await self.initialize()
+
+            return bool(await bounded("redis set nx", self.client.set(key, value, nx=True, ex=expire)))
+        except Exception as e:
+            logger.error(f"Redis set nx error: {e}")
+            return False
+
     async def get(self, key: str) -> Optional[Any]:
         try:
             if not self._initialized:
                 await self.initialize()
 
-            value = await self.client.get(key)
+            value = await bounded("redis get", self.client.get(key))
             if value is None:
                 return None
 
@@ -75,12 +91,32 @@ class RedisManager:
             logger.error(f"Redis get error: {e}")
             return None
 
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        try:
+            if not self._initialized:
+                await self.initialize()
+
+            if not keys:
+                return []
+
+            values = await bounded("redis mget", self.client.mget(keys))
+            parsed = []
+            for value in values:
+                try:
+                    parsed.append(json.loads(value) if value is not None else None)
+                except (json.JSONDecodeError, TypeError):
+                    parsed.append(value)
+            return parsed
+        except Exception as e:
+            logger.error(f"Redis mget error: {e}")
+            return [None] * len(keys)
+
     async def delete(self, key: str) -> bool:
         try:
             if not self._initialized:
                 await self.initialize()
 
-            result = await self.client.delete(key)
+            result = await bounded("redis delete", self.client.delete(key))
             return bool(result)
         except Exception as e:
             logger.error(f"Redis delete error: {e}")
@@ -91,7 +127,7 @@ class RedisManager:
             if not self._initialized:
                 await self.initialize()
 
-            result = await self.client.exists(key)
+            result = await bounded("redis exists", self.client.exists(key))
             return bool(result)
         except Exception as e:
             logger.error(f"Redis exists error: {e}")
@@ -102,12 +138,22 @@ class RedisManager:
             if not self._initialized:
                 await self.initialize()
 
-            result = await self.client.incr(key, amount)
+            result = await bounded("redis increment", self.client.incr(key, amount))
             return result
         except Exception as e:
             logger.error(f"Redis increment error: {e}")
             return None
 
+    async def publish(self, channel: str, message: str) -> int:
+        try:
+            if not self._initialized:
+                await self.initialize()
+
+            return await bounded("redis publish", self.client.publish(channel, message))
+        except Exception as e:
+            logger.error(f"Redis publish error: {e}")
+            return 0
+
     async def health_check(self) -> bool:
         try:
             if not self._initialized:
@@ -127,6 +173,15 @@ class RedisManager:
         cache_key = f"embedding:{text_hash}"
         return await self.get(cache_key)
 
+    async def get_cached_embeddings(self, text_hashes: List[str]) -> List[Optional[list]]:
+        return await self.get_many([f"embedding:{text_hash}" for text_hash in text_hashes])
+
+    async def cache_search_results(self, cache_key: str, hits: list, expire: int = 3600):
+        return await self.set(f"retrieval:{cache_key}", hits, expire)
+
+    async def get_cached_search_results(self, cache_key: str) -> Optional[list]:
+        return await self.get(f"retrieval:{cache_key}")
+
 
 # Global Redis manager instance
 redis_manager = RedisManager()
\ No newline at end of file
@@ -73,6 +73,10 @@ def create_text_hash(text: str) -> str:
     return hashlib.md5(text.encode('utf-8')).hexdigest()
 
 
+def create_file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
 class APIKeyValidator:
     @staticmethod
     def validate_key_format(api_key: str) -> bool:
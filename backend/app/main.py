@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import structlog
 import time
@@ -12,6 +13,14 @@ from app.core.database import database_manager
 from app.core.redis_client import redis_manager
 from app.core.milvus_client import milvus_manager
 from app.core.exceptions import RAGException
+from app.core.deadline import RequestDeadlineMiddleware
+from app.core.api_key_cache import api_key_cache
+from app.services.embedding import embedding_service
+from app.services.generation import generation_service
+from app.services.reranking import reranking_service
+from app.services.parsing import document_parser
+from app.workers.manager import worker_manager
+from app.services.operations import operation_manager
 from app.api.v1.api import api_router
 
 # Configure structured logging
@@ -45,6 +54,10 @@ app = FastAPI(
     redoc_url=f"{settings.API_V1_STR}/redoc" if settings.DEBUG else None,
 )
 
+# Request deadlines and cancellation on client disconnect; innermost, so the
+# middleware below log and decorate the 504 it returns
+app.add_middleware(RequestDeadlineMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -115,9 +128,11 @@ async def rag_exception_handler(request: Request, exc: RAGException):
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    # Errors raised by validators carry the exception object in their context
+    errors = jsonable_encoder(exc.errors(), custom_encoder={Exception: str})
     logger.error(
         "Validation error",
-        errors=exc.errors(),
+        errors=errors,
         url=str(request.url)
     )
 
@@ -125,7 +140,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": "Validation failed",
-            "details": exc.errors()
+            "details": errors
         }
     )
 
@@ -191,6 +206,12 @@ async def startup_event():
         except Exception as e:
             logger.warning(f"Milvus initialization failed (will continue without Milvus): {e}")
 
+        # Start embedding workers (in-process unless Celery workers are available)
+        await worker_manager.start()
+
+        # Drop cached API keys changed by other processes (needs Redis)
+        await api_key_cache.start()
+
         logger.info("Service initialization completed")
 
     except Exception as e:
@@ -204,6 +225,11 @@ async def shutdown_event():
     logger.info("Shutting down RAG Pipeline API...")
 
     try:
+        # Stop background operations and in-process embedding workers before their connections go away
+        await operation_manager.close()
+        await worker_manager.stop()
+        await api_key_cache.close()
+
         # Close database connections
         await database_manager.close()
 
@@ -219,6 +245,12 @@ async def shutdown_event():
         except Exception as e:
             logger.warning(f"Error closing Milvus connection: {e}")
 
+        # Close provider clients and parser pool
+        await embedding_service.close()
+        await generation_service.close()
+        await reranking_service.close()
+        document_parser.close()
+
         logger.info("Service shutdown completed")
 
     except Exception as e:
@@ -65,6 +65,10 @@ class Chunk(Base):
     milvus_synced: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     milvus_sync_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, nullable=True)
 
+    # Work queue lease: set while a worker owns the chunk, reclaimable after expiry
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, nullable=True, index=True)
+
     # Context information
     previous_chunk_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     next_chunk_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
@@ -46,6 +46,9 @@ class Collection(Base):
     chunk_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     total_size_bytes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
+    # Bumped whenever searchable content or search settings change; keys cached search results
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
     # Milvus integration
     milvus_collection_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, unique=True)
     milvus_synced: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
@@ -76,6 +79,7 @@ class Collection(Base):
             "document_count": self.document_count,
             "chunk_count": self.chunk_count,
             "total_size_bytes": self.total_size_bytes,
+            "version": self.version,
             "milvus_collection_name": self.milvus_collection_name,
             "milvus_synced": self.milvus_synced,
             "last_sync_at": self.last_sync_at.isoformat() if self.last_sync_at else None,
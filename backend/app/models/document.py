@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, Integer, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Integer, JSON, ForeignKey, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 import datetime
@@ -18,6 +18,17 @@ class DocumentStatus(str, Enum):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # One live copy of a file per collection; concurrent identical uploads lose on insert
+        Index(
+            "uq_documents_collection_file_hash",
+            "collection_id",
+            "file_hash",
+            unique=True,
+            sqlite_where=text("NOT is_deleted"),
+            postgresql_where=text("NOT is_deleted"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(255), primary_key=True)
     collection_id: Mapped[str] = mapped_column(String(255), ForeignKey("collections.id"), nullable=False, index=True)
@@ -80,7 +91,7 @@ class Document(Base):
             "file_size": self.file_size,
             "file_type": self.file_type,
             "file_hash": self.file_hash,
-            "status": self.status.value,
+            "status": DocumentStatus(self.status).value,
             "processing_started_at": self.processing_started_at.isoformat() if self.processing_started_at else None,
             "processing_completed_at": self.processing_completed_at.isoformat() if self.processing_completed_at else None,
             "processing_error": self.processing_error,
@@ -6,6 +6,7 @@ import uuid
 
 from app.models.api_key import APIKey, APIKeyStatus, APIKeyRole
 from app.schemas.api_key import APIKeyCreate, APIKeyUpdate
+from app.core.api_key_cache import api_key_cache
 from app.core.security import generate_api_key, hash_api_key
 from app.core.exceptions import RAGException
 
@@ -130,6 +131,7 @@ class APIKeyRepository:
         api_key.updated_at = datetime.utcnow()
 
         await self.session.commit()
+        await api_key_cache.invalidate(api_key.key_hash)
         await self.session.refresh(api_key)
 
         return api_key
@@ -139,8 +141,10 @@ class APIKeyRepository:
         if not api_key:
             return False
 
+        key_hash = api_key.key_hash
         await self.session.delete(api_key)
         await self.session.commit()
+        await api_key_cache.invalidate(key_hash)
 
         return True
 
@@ -151,6 +155,7 @@ class APIKeyRepository:
 
         api_key.revoke(reason)
         await self.session.commit()
+        await api_key_cache.invalidate(api_key.key_hash)
         await self.session.refresh(api_key)
 
         return api_key
@@ -169,7 +174,8 @@ class APIKeyRepository:
         new_key_hash = hash_api_key(new_api_key)
         new_key_prefix = new_api_key[:8]
 
-        # Update record
+        # Update record; the old key stops working as soon as this commits
+        old_key_hash = api_key_record.key_hash
         api_key_record.key_hash = new_key_hash
         api_key_record.key_prefix = new_key_prefix
         api_key_record.updated_at = datetime.utcnow()
@@ -179,6 +185,7 @@ class APIKeyRepository:
         api_key_record.total_tokens_used = 0
 
         await self.session.commit()
+        await api_key_cache.invalidate(old_key_hash)
         await self.session.refresh(api_key_record)
 
         return api_key_record, new_api_key
@@ -272,6 +279,8 @@ class APIKeyRepository:
 
         if count > 0:
             await self.session.commit()
+            for key in expired_keys:
+                await api_key_cache.invalidate(key.key_hash)
 
         return count
 
@@ -1,10 +1,12 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
-from datetime import datetime
+from sqlalchemy import select, update, delete, func, and_, or_, desc, asc, case, union_all
+from datetime import datetime, timedelta
 import uuid
 
 from app.models.chunk import Chunk, ChunkStatus
+from app.models.collection import Collection
 from app.core.exceptions import RAGException
 
 
@@ -13,21 +15,23 @@ class ChunkRepository:
         self.session = session
 
     async def create_chunks(self, chunks_data: List[Dict[str, Any]]) -> List[Chunk]:
+        # Timestamps are set client-side so the rows need no per-chunk refresh
+        now = datetime.utcnow()
         chunks = []
         for chunk_data in chunks_data:
             chunk = Chunk(
-                id=str(uuid.uuid4()),
-                **chunk_data
+                **{
+                    "id": str(uuid.uuid4()),
+                    "created_at": now,
+                    "updated_at": now,
+                    **chunk_data
+                }
             )
             chunks.append(chunk)
 
         self.session.add_all(chunks)
         await self.session.commit()
 
-        # Refresh all chunks
-        for chunk in chunks:
-            await self.session.refresh(chunk)
-
         return chunks
 
     async def get_by_id(self, chunk_id: str) -> Optional[Chunk]:
@@ -62,6 +66,19 @@ class ChunkRepository:
 
         return list(chunks), total
 
+    async def get_all_by_document(self, document_id: str) -> List[Chunk]:
+        stmt = select(Chunk).where(Chunk.document_id == document_id).order_by(Chunk.chunk_index)
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_by_ids(self, chunk_ids: List[str]) -> List[Chunk]:
+        if not chunk_ids:
+            return []
+
+        stmt = select(Chunk).where(Chunk.id.in_(chunk_ids))
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def get_by_collection(
         self,
         collection_id: str,
@@ -121,55 +138,243 @@ class ChunkRepository:
 
         return chunk
 
-    async def mark_synced(self, chunk_ids: List[str]) -> int:
+    async def mark_embedded(self, chunk_ids: List[str], embedding_model: str) -> int:
         if not chunk_ids:
             return 0
 
-        stmt = select(Chunk).where(Chunk.id.in_(chunk_ids))
+        now = datetime.utcnow()
+        stmt = update(Chunk).where(Chunk.id.in_(chunk_ids)).values(
+            status=ChunkStatus.COMPLETED,
+            embedding_model=embedding_model,
+            embedding_generated_at=now,
+            embedding_error=None,
+            updated_at=now
+        )
         result = await self.session.execute(stmt)
-        chunks = result.scalars().all()
+        await self.session.commit()
+        return result.rowcount
 
-        count = 0
-        for chunk in chunks:
-            chunk.mark_synced()
-            count += 1
+    async def set_status(
+        self,
+        chunk_ids: List[str],
+        status: ChunkStatus,
+        error_message: Optional[str] = None
+    ) -> int:
+        if not chunk_ids:
+            return 0
+
+        values: Dict[str, Any] = {
+            "status": status,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "updated_at": datetime.utcnow()
+        }
+        if status == ChunkStatus.FAILED:
+            values["embedding_error"] = error_message
+        elif status == ChunkStatus.PENDING:
+            values["embedding_error"] = None
+            values["milvus_synced"] = False
 
+        result = await self.session.execute(update(Chunk).where(Chunk.id.in_(chunk_ids)).values(**values))
         await self.session.commit()
-        return count
+        return result.rowcount
+
+    async def get_progress_by_documents(self, document_ids: List[str]) -> Dict[str, tuple[int, int]]:
+        # document_id -> (chunks still waiting for embedding/sync, failed chunks)
+        if not document_ids:
+            return {}
+
+        unfinished = or_(
+            Chunk.status.in_([ChunkStatus.PENDING, ChunkStatus.EMBEDDING]),
+            and_(Chunk.status == ChunkStatus.COMPLETED, Chunk.milvus_synced == False)
+        )
+        stmt = select(
+            Chunk.document_id,
+            func.sum(case((unfinished, 1), else_=0)),
+            func.sum(case((Chunk.status == ChunkStatus.FAILED, 1), else_=0))
+        ).where(Chunk.document_id.in_(document_ids)).group_by(Chunk.document_id)
+
+        result = await self.session.execute(stmt)
+        return {document_id: (int(waiting or 0), int(failed or 0)) for document_id, waiting, failed in result.all()}
+
+    async def mark_synced(self, chunk_ids: List[str]) -> int:
+        if not chunk_ids:
+            return 0
+
+        now = datetime.utcnow()
+        stmt = update(Chunk).where(Chunk.id.in_(chunk_ids)).values(
+            milvus_synced=True,
+            milvus_sync_at=now,
+            lease_owner=None,
+            lease_expires_at=None,
+            updated_at=now
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount
+
+    async def claim_batch(self, owner: str, limit: int, lease_seconds: int) -> List[Chunk]:
+        """
+        Atomically move up to `limit` queued chunks to EMBEDDING under a lease
+        held by `owner`, returning the claimed rows.
+
+        Queued means PENDING, embedded but not yet synced to Milvus, or claimed
+        by a worker whose lease has expired. The claim is one UPDATE ...
+        RETURNING, so concurrent workers never receive the same chunk; on
+        PostgreSQL the candidate rows are selected with SKIP LOCKED so workers
+        do not queue up behind each other's locks.
+        """
+        now = datetime.utcnow()
+        lease_free = or_(Chunk.lease_expires_at.is_(None), Chunk.lease_expires_at < now)
+        claimable = or_(
+            Chunk.status == ChunkStatus.PENDING,
+            and_(Chunk.status == ChunkStatus.COMPLETED, Chunk.milvus_synced == False, lease_free),
+            and_(Chunk.status == ChunkStatus.EMBEDDING, Chunk.lease_expires_at < now)
+        )
+
+        candidates = select(Chunk.id).where(claimable).order_by(Chunk.created_at).limit(limit)
+        if self.session.bind.dialect.name == "postgresql":
+            candidates = candidates.with_for_update(skip_locked=True)
+
+        stmt = update(Chunk).where(
+            and_(Chunk.id.in_(candidates.scalar_subquery()), claimable)
+        ).values(
+            status=ChunkStatus.EMBEDDING,
+            lease_owner=owner,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            updated_at=now
+        ).returning(Chunk)
+
+        result = await self.session.execute(
+            stmt,
+            execution_options={"synchronize_session": False, "populate_existing": True}
+        )
+        chunks = list(result.scalars().all())
+        await self.session.commit()
+        return chunks
 
     async def get_pending_embedding_chunks(self, limit: int = 100) -> List[Chunk]:
         stmt = select(Chunk).where(
             Chunk.status == ChunkStatus.PENDING
-        ).limit(limit)
+        ).order_by(Chunk.created_at).limit(limit)
 
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_completed_by_hashes(
+        self,
+        content_hashes: List[str],
+        embedding_model: str
+    ) -> Dict[str, tuple[str, str]]:
+        # Map content_hash -> (chunk_id, milvus_collection_name) for one already
+        # embedded and synced chunk per hash, across all documents and collections
+        if not content_hashes:
+            return {}
+
+        stmt = select(Chunk.content_hash, Chunk.id, Collection.milvus_collection_name).join(
+            Collection, Collection.id == Chunk.collection_id
+        ).where(
+            and_(
+                Chunk.content_hash.in_(content_hashes),
+                Chunk.status == ChunkStatus.COMPLETED,
+                Chunk.embedding_model == embedding_model,
+                Chunk.milvus_synced == True,
+                Collection.milvus_collection_name.is_not(None)
+            )
+        )
+
+        result = await self.session.execute(stmt)
+        matches: Dict[str, tuple[str, str]] = {}
+        for content_hash, chunk_id, milvus_name in result.all():
+            matches.setdefault(content_hash, (chunk_id, milvus_name))
+
+        return matches
+
     async def get_unsynced_chunks(self, limit: int = 100) -> List[Chunk]:
         stmt = select(Chunk).where(
             and_(
                 Chunk.status == ChunkStatus.COMPLETED,
                 Chunk.milvus_synced == False
             )
-        ).limit(limit)
+        ).order_by(Chunk.updated_at).limit(limit)
 
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
-    async def delete_by_document(self, document_id: str) -> int:
-        stmt = select(Chunk).where(Chunk.document_id == document_id)
+    async def get_sync_state_page(
+        self,
+        collection_id: str,
+        after_id: Optional[str],
+        limit: int
+    ) -> List[tuple[str, str, bool]]:
+        # (id, status, milvus_synced) in binary id order, keyset-paginated so
+        # writes can be committed between pages; "C" collation on PostgreSQL
+        # keeps the order identical to Milvus primary-key order
+        chunk_id = Chunk.id.collate("C") if self.session.bind.dialect.name == "postgresql" else Chunk.id
+        filters = [Chunk.collection_id == collection_id]
+        if after_id is not None:
+            filters.append(chunk_id > after_id)
+
+        stmt = select(Chunk.id, Chunk.status, Chunk.milvus_synced).where(
+            and_(*filters)
+        ).order_by(chunk_id).limit(limit)
+
         result = await self.session.execute(stmt)
-        chunks = result.scalars().all()
+        return [tuple(row) for row in result.all()]
 
-        count = len(chunks)
-        for chunk in chunks:
-            await self.session.delete(chunk)
+    async def get_completed_page(
+        self,
+        collection_id: str,
+        after_id: Optional[str],
+        limit: int
+    ) -> List[Chunk]:
+        # Embedded chunks of a collection in id order, keyset-paginated
+        filters = [Chunk.collection_id == collection_id, Chunk.status == ChunkStatus.COMPLETED]
+        if after_id is not None:
+            filters.append(Chunk.id > after_id)
+
+        result = await self.session.execute(
+            select(Chunk).where(and_(*filters)).order_by(Chunk.id).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_contents(self, chunk_ids: List[str]) -> Dict[str, str]:
+        # Text of search hits in one round trip; absent ids were deleted meanwhile
+        if not chunk_ids:
+            return {}
+
+        result = await self.session.execute(select(Chunk.id, Chunk.content).where(Chunk.id.in_(chunk_ids)))
+        return {chunk_id: content for chunk_id, content in result.all()}
+
+    async def get_existing_ids(self, chunk_ids: List[str]) -> set[str]:
+        if not chunk_ids:
+            return set()
 
+        result = await self.session.execute(select(Chunk.id).where(Chunk.id.in_(chunk_ids)))
+        return set(result.scalars().all())
+
+    async def update_positions(self, rows: List[Dict[str, Any]]) -> int:
+        # Bulk UPDATE by primary key; each row holds "id" plus the columns to change
+        if not rows:
+            return 0
+
+        now = datetime.utcnow()
+        await self.session.execute(update(Chunk), [{**row, "updated_at": now} for row in rows])
         await self.session.commit()
-        return count
+        return len(rows)
 
-    async def delete_by_collection(self, collection_id: str) -> int:
-        stmt = select(Chunk).where(Chunk.collection_id == collection_id)
+    async def delete_by_ids(self, chunk_ids: List[str]) -> int:
+        if not chunk_ids:
+            return 0
+
+        result = await self.session.execute(
+            delete(Chunk).where(Chunk.id.in_(chunk_ids)).execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def delete_by_document(self, document_id: str) -> int:
+        stmt = select(Chunk).where(Chunk.document_id == document_id)
         result = await self.session.execute(stmt)
         chunks = result.scalars().all()
 
@@ -180,6 +385,13 @@ class ChunkRepository:
         await self.session.commit()
         return count
 
+    async def delete_by_collection(self, collection_id: str) -> int:
+        result = await self.session.execute(
+            delete(Chunk).where(Chunk.collection_id == collection_id).execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
     async def get_stats_by_document(self, document_id: str) -> Dict[str, Any]:
         base_filter = Chunk.document_id == document_id
 
@@ -273,34 +485,125 @@ class ChunkRepository:
         if not chunk:
             return {}
 
-        # Get previous chunks
-        prev_stmt = select(Chunk).where(
-            and_(
-                Chunk.document_id == chunk.document_id,
-                Chunk.chunk_index < chunk.chunk_index
-            )
-        ).order_by(desc(Chunk.chunk_index)).limit(context_size)
+        position = (chunk.document_id, chunk.chunk_index)
+        window = (await self.get_context_windows([position], context_size)).get(position, [chunk])
+        return {
+            "current_chunk": chunk,
+            "previous_chunks": [c for c in window if c.chunk_index < chunk.chunk_index],
+            "next_chunks": [c for c in window if c.chunk_index > chunk.chunk_index]
+        }
 
-        prev_result = await self.session.execute(prev_stmt)
-        previous_chunks = list(reversed(prev_result.scalars().all()))
+    async def get_positions(self, chunk_ids: List[str]) -> Dict[str, Tuple[str, int]]:
+        # (document_id, chunk_index) of each chunk; absent ids were deleted meanwhile
+        if not chunk_ids:
+            return {}
 
-        # Get next chunks
-        next_stmt = select(Chunk).where(
-            and_(
-                Chunk.document_id == chunk.document_id,
-                Chunk.chunk_index > chunk.chunk_index
+        stmt = select(Chunk.id, Chunk.document_id, Chunk.chunk_index).where(Chunk.id.in_(chunk_ids))
+        result = await self.session.execute(stmt)
+        return {chunk_id: (document_id, chunk_index) for chunk_id, document_id, chunk_index in result.all()}
+
+    async def get_context_windows(
+        self,
+        positions: List[Tuple[str, int]],
+        context_size: int = 2,
+        follow_links: bool = False
+    ) -> Dict[Tuple[str, int], List[Chunk]]:
+        """
+        The chunks around many (document_id, chunk_index) positions, each
+        window in document order. Neighbours are the context_size nearest
+        rows on each side by chunk_index order, so gaps in the indexes never
+        shrink a window; every side is an indexed LIMIT query and all of them
+        are fetched in a single statement, chunks shared by windows once.
+
+        With follow_links the windows are walked along previous_chunk_id /
+        next_chunk_id instead, one query per step for all positions at once.
+        """
+        if not positions:
+            return {}
+        if follow_links:
+            return await self._linked_windows(positions, context_size)
+
+        sides = []
+        for document_id, chunk_index in sorted(set(positions)):
+            same_document = Chunk.document_id == document_id
+            sides.append(
+                select(Chunk.id).where(same_document, Chunk.chunk_index <= chunk_index)
+                .order_by(Chunk.chunk_index.desc()).limit(context_size + 1).subquery()
             )
-        ).order_by(Chunk.chunk_index).limit(context_size)
+            if context_size:
+                sides.append(
+                    select(Chunk.id).where(same_document, Chunk.chunk_index > chunk_index)
+                    .order_by(Chunk.chunk_index).limit(context_size).subquery()
+                )
 
-        next_result = await self.session.execute(next_stmt)
-        next_chunks = list(next_result.scalars().all())
+        stmt = select(Chunk).where(
+            Chunk.id.in_(union_all(*[select(side.c.id) for side in sides]))
+        ).order_by(Chunk.document_id, Chunk.chunk_index)
+        result = await self.session.execute(stmt)
 
-        return {
-            "current_chunk": chunk,
-            "previous_chunks": previous_chunks,
-            "next_chunks": next_chunks
+        by_document: Dict[str, List[Chunk]] = defaultdict(list)
+        for chunk in result.scalars().all():
+            by_document[chunk.document_id].append(chunk)
+
+        windows: Dict[Tuple[str, int], List[Chunk]] = {}
+        for document_id, chunk_index in positions:
+            chunks = by_document.get(document_id, [])
+            anchor = next((i for i, chunk in enumerate(chunks) if chunk.chunk_index == chunk_index), None)
+            if anchor is not None:
+                windows[(document_id, chunk_index)] = chunks[max(0, anchor - context_size):anchor + context_size + 1]
+        return windows
+
+    async def _linked_windows(
+        self,
+        positions: List[Tuple[str, int]],
+        context_size: int
+    ) -> Dict[Tuple[str, int], List[Chunk]]:
+        indexes: Dict[str, set] = defaultdict(set)
+        for document_id, chunk_index in positions:
+            indexes[document_id].add(chunk_index)
+
+        stmt = select(Chunk).where(
+            or_(*[
+                and_(Chunk.document_id == document_id, Chunk.chunk_index.in_(chunk_indexes))
+                for document_id, chunk_indexes in indexes.items()
+            ])
+        )
+        anchors = {
+            (chunk.document_id, chunk.chunk_index): chunk
+            for chunk in (await self.session.execute(stmt)).scalars().all()
         }
 
+        # Breadth-first along the links; chunks shared by windows are fetched once
+        loaded: Dict[str, Chunk] = {chunk.id: chunk for chunk in anchors.values()}
+        frontier = list(anchors.values())
+        for _ in range(context_size):
+            wanted = {
+                link for chunk in frontier
+                for link in (chunk.previous_chunk_id, chunk.next_chunk_id)
+                if link and link not in loaded
+            }
+            if not wanted:
+                break
+            frontier = await self.get_by_ids(list(wanted))
+            loaded.update((chunk.id, chunk) for chunk in frontier)
+
+        windows: Dict[Tuple[str, int], List[Chunk]] = {}
+        for position, anchor in anchors.items():
+            previous_chunks: List[Chunk] = []
+            link = anchor.previous_chunk_id
+            while link in loaded and len(previous_chunks) < context_size:
+                previous_chunks.append(loaded[link])
+                link = loaded[link].previous_chunk_id
+
+            next_chunks: List[Chunk] = []
+            link = anchor.next_chunk_id
+            while link in loaded and len(next_chunks) < context_size:
+                next_chunks.append(loaded[link])
+                link = loaded[link].next_chunk_id
+
+            windows[position] = list(reversed(previous_chunks)) + [anchor] + next_chunks
+        return windows
+
     async def search_chunks_by_content(
         self,
         collection_id: str,
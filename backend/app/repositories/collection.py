@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import select, update, func, and_, or_, desc, asc
 from sqlalchemy.orm import selectinload
 import uuid
 from datetime import datetime
@@ -23,6 +23,10 @@ class CollectionRepository:
         # Generate Milvus collection name (alphanumeric only)
         milvus_name = f"collection_{uuid.uuid4().hex[:16]}"
 
+        collection_settings = dict(collection_data.settings or {})
+        if collection_data.vector:
+            collection_settings["vector"] = collection_data.vector.dict(exclude_none=True)
+
         # Create new collection
         collection = Collection(
             id=str(uuid.uuid4()),
@@ -31,7 +35,7 @@ class CollectionRepository:
             embedding_model=collection_data.embedding_model,
             chunk_size=collection_data.chunk_size,
             chunk_overlap=collection_data.chunk_overlap,
-            settings=collection_data.settings,
+            settings=collection_settings,
             tags=collection_data.tags,
             milvus_collection_name=milvus_name,
             status=CollectionStatus.ACTIVE
@@ -48,6 +52,14 @@ class CollectionRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_by_ids(self, collection_ids: List[str]) -> List[Collection]:
+        if not collection_ids:
+            return []
+
+        stmt = select(Collection).where(Collection.id.in_(collection_ids))
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def get_by_name(self, name: str) -> Optional[Collection]:
         stmt = select(Collection).where(Collection.name == name)
         result = await self.session.execute(stmt)
@@ -66,7 +78,8 @@ class CollectionRepository:
         status: Optional[CollectionStatus] = None,
         tags: Optional[List[str]] = None,
         sort_by: str = "created_at",
-        sort_order: str = "desc"
+        sort_order: str = "desc",
+        collection_ids: Optional[List[str]] = None
     ) -> tuple[List[Collection], int]:
 
         # Build base query
@@ -92,6 +105,9 @@ class CollectionRepository:
             for tag in tags:
                 filters.append(Collection.tags.contains([tag]))
 
+        if collection_ids is not None:
+            filters.append(Collection.id.in_(collection_ids))
+
         if filters:
             stmt = stmt.where(and_(*filters))
 
@@ -127,12 +143,23 @@ class CollectionRepository:
             if existing:
                 raise CollectionAlreadyExistsError(collection_data.name)
 
-        # Update fields
+        # Update fields; vector options live under settings["vector"]
         update_data = collection_data.dict(exclude_unset=True)
+        vector = update_data.pop("vector", None)
+        current_vector = (collection.settings or {}).get("vector")
         for field, value in update_data.items():
             setattr(collection, field, value)
 
+        if vector is not None or current_vector is not None:
+            collection_settings = dict(collection.settings or {})
+            if vector is not None:
+                collection_settings["vector"] = {key: value for key, value in vector.items() if value is not None}
+            else:
+                collection_settings["vector"] = current_vector
+            collection.settings = collection_settings
+
         collection.updated_at = datetime.utcnow()
+        collection.version = Collection.version + 1
 
         await self.session.commit()
         await self.session.refresh(collection)
@@ -168,12 +195,23 @@ class CollectionRepository:
             collection.total_size_bytes = total_size
 
         collection.updated_at = datetime.utcnow()
+        collection.version = Collection.version + 1
 
         await self.session.commit()
         await self.session.refresh(collection)
 
         return collection
 
+    async def bump_version(self, collection_id: str) -> None:
+        # For changes that do not touch the collection row, e.g. queued chunks becoming searchable
+        await self.session.execute(
+            update(Collection)
+            .where(Collection.id == collection_id)
+            .values(version=Collection.version + 1)
+            .execution_options(synchronize_session="fetch")
+        )
+        await self.session.commit()
+
     async def mark_sync_status(
         self,
         collection_id: str,
@@ -188,6 +226,7 @@ class CollectionRepository:
             collection.mark_sync_success()
         else:
             collection.mark_sync_error(error_message or "Unknown sync error")
+        collection.version = Collection.version + 1
 
         await self.session.commit()
         await self.session.refresh(collection)
@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc
+from sqlalchemy import select, delete, func, and_, or_, desc, asc
 from sqlalchemy.orm import selectinload
 import uuid
 from datetime import datetime, timedelta
@@ -35,7 +35,7 @@ class DocumentRepository:
             file_size=file_size,
             file_type=file_type,
             file_hash=file_hash,
-            metadata=metadata or {},
+            doc_metadata=metadata or {},
             processing_config=processing_config or {},
             status=DocumentStatus.UPLOADING
         )
@@ -58,9 +58,10 @@ class DocumentRepository:
                 Document.collection_id == collection_id,
                 Document.is_deleted == False
             )
-        )
+        ).order_by(Document.created_at)
+        # Oldest copy; databases from before the unique index may hold several
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return result.scalars().first()
 
     async def get_by_collection(
         self,
@@ -163,7 +164,34 @@ class DocumentRepository:
         document.character_count = character_count
         document.word_count = word_count
         if metadata:
-            document.metadata.update(metadata)
+            document.doc_metadata = {**(document.doc_metadata or {}), **metadata}
+        document.updated_at = datetime.utcnow()
+
+        await self.session.commit()
+        await self.session.refresh(document)
+
+        return document
+
+    async def replace_file(
+        self,
+        document_id: str,
+        filename: str,
+        file_path: str,
+        file_size: int,
+        file_hash: str,
+        processing_config: Optional[Dict[str, Any]] = None
+    ) -> Optional[Document]:
+
+        document = await self.get_by_id(document_id)
+        if not document:
+            return None
+
+        document.filename = filename
+        document.file_path = file_path
+        document.file_size = file_size
+        document.file_hash = file_hash
+        if processing_config is not None:
+            document.processing_config = processing_config
         document.updated_at = datetime.utcnow()
 
         await self.session.commit()
@@ -171,6 +199,28 @@ class DocumentRepository:
 
         return document
 
+    async def get_completed_by_collection(self, collection_id: str) -> List[Document]:
+        stmt = select(Document).where(
+            and_(
+                Document.collection_id == collection_id,
+                Document.status == DocumentStatus.COMPLETED,
+                Document.is_deleted == False
+            )
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_file_paths_by_collection(self, collection_id: str) -> List[str]:
+        result = await self.session.execute(select(Document.file_path).where(Document.collection_id == collection_id))
+        return list(result.scalars().all())
+
+    async def delete_by_collection(self, collection_id: str) -> int:
+        result = await self.session.execute(
+            delete(Document).where(Document.collection_id == collection_id).execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
     async def soft_delete(self, document_id: str) -> bool:
         document = await self.get_by_id(document_id)
         if not document:
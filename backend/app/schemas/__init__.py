@@ -8,7 +8,8 @@ from .collection import (
 from .document import (
     DocumentResponse,
     DocumentListResponse,
-    DocumentStats
+    DocumentStats,
+    DocumentUploadResponse
 )
 from .chunk import (
     ChunkResponse,
@@ -20,6 +21,15 @@ from .api_key import (
     APIKeyResponse,
     APIKeyListResponse
 )
+from .search import (
+    SearchFilters,
+    SearchRequest,
+    SearchResult,
+    SearchResponse,
+    AnswerRequest,
+    FederatedSearchRequest,
+    FederatedSearchResponse
+)
 from .common import (
     HealthResponse,
     PaginatedResponse,
@@ -38,6 +48,7 @@ __all__ = [
     "DocumentResponse",
     "DocumentListResponse",
     "DocumentStats",
+    "DocumentUploadResponse",
 
     # Chunk schemas
     "ChunkResponse",
@@ -49,6 +60,15 @@ __all__ = [
     "APIKeyResponse",
     "APIKeyListResponse",
 
+    # Search schemas
+    "SearchFilters",
+    "SearchRequest",
+    "SearchResult",
+    "SearchResponse",
+    "AnswerRequest",
+    "FederatedSearchRequest",
+    "FederatedSearchResponse",
+
     # Common schemas
     "HealthResponse",
     "PaginatedResponse",
@@ -3,7 +3,74 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
-from app.models.collection import CollectionStatus
+from app.core.config import settings as app_settings
+from app.models.collection import Collection, CollectionStatus
+
+
+class VectorType(str, Enum):
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
+    BFLOAT16 = "bfloat16"
+    BINARY = "binary"
+
+
+class VectorIndexType(str, Enum):
+    IVF_FLAT = "IVF_FLAT"
+    IVF_SQ8 = "IVF_SQ8"
+    HNSW = "HNSW"
+
+
+class VectorConfig(BaseModel):
+    vector_type: VectorType = Field(default=VectorType.FLOAT32, description="Stored vector precision")
+    dimensions: Optional[int] = Field(
+        None,
+        ge=64,
+        description="Keep only the first N embedding dimensions (Matryoshka truncation)"
+    )
+    index_type: VectorIndexType = Field(
+        default=VectorIndexType.IVF_FLAT,
+        description="Vector index; binary vectors always use BIN_IVF_FLAT"
+    )
+    rerank: Optional[bool] = Field(
+        None,
+        description="Re-score a larger shortlist at full precision (default: on for binary and IVF_SQ8)"
+    )
+    rerank_factor: int = Field(default=4, ge=1, le=20, description="Shortlist size as a multiple of top_k")
+
+    @validator("dimensions")
+    def validate_dimensions(cls, v, values):
+        if v is not None:
+            if v > app_settings.OPENAI_EMBEDDING_DIMENSIONS:
+                raise ValueError(f"Dimensions cannot exceed {app_settings.OPENAI_EMBEDDING_DIMENSIONS}")
+            if values.get("vector_type") == VectorType.BINARY and v % 8:
+                raise ValueError("Binary vectors need a multiple of 8 dimensions")
+        return v
+
+    @property
+    def effective_dimensions(self) -> int:
+        return self.dimensions or app_settings.OPENAI_EMBEDDING_DIMENSIONS
+
+    @property
+    def effective_rerank(self) -> bool:
+        if self.rerank is not None:
+            return self.rerank
+        return self.vector_type == VectorType.BINARY or self.index_type == VectorIndexType.IVF_SQ8
+
+    @property
+    def vector_format(self) -> tuple[str, int]:
+        return self.vector_type.value, self.effective_dimensions
+
+    def milvus_options(self) -> Dict[str, Any]:
+        return {
+            "vector_type": self.vector_type.value,
+            "dim": self.effective_dimensions,
+            "index_type": self.index_type.value
+        }
+
+    @classmethod
+    def for_collection(cls, collection: Collection) -> "VectorConfig":
+        # Stored under settings["vector"]; collections without it use full-precision floats
+        return cls(**(collection.settings or {}).get("vector", {}))
 
 
 class CollectionCreate(BaseModel):
@@ -14,6 +81,7 @@ class CollectionCreate(BaseModel):
     chunk_overlap: int = Field(default=200, ge=0, le=1000, description="Chunk overlap in characters")
     settings: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional settings")
     tags: Optional[List[str]] = Field(default_factory=list, description="Collection tags")
+    vector: Optional[VectorConfig] = Field(None, description="Vector storage options")
 
     @validator("name")
     def validate_name(cls, v):
@@ -50,6 +118,7 @@ class CollectionUpdate(BaseModel):
     chunk_overlap: Optional[int] = Field(None, ge=0, le=1000)
     settings: Optional[Dict[str, Any]] = None
     tags: Optional[List[str]] = None
+    vector: Optional[VectorConfig] = Field(None, description="Changing it rebuilds the Milvus collection")
 
     @validator("name")
     def validate_name(cls, v):
@@ -86,6 +155,7 @@ class CollectionResponse(BaseModel):
     document_count: int
     chunk_count: int
     total_size_bytes: int
+    version: int
     milvus_collection_name: Optional[str]
     milvus_synced: bool
     last_sync_at: Optional[datetime]
@@ -140,7 +210,7 @@ class CollectionListResponse(BaseModel):
 
 # Request models for specific operations
 class CollectionSyncRequest(BaseModel):
-    force: bool = Field(default=False, description="Force resync even if already synced")
+    force: bool = Field(default=False, description="Rebuild the Milvus collection and swap it in atomically")
 
 
 class CollectionBulkDeleteRequest(BaseModel):
@@ -55,6 +55,8 @@ class MessageResponse(BaseModel):
 
 class OperationResponse(BaseModel):
     operation_id: str = Field(description="Unique operation identifier")
+    operation_type: Optional[str] = Field(default=None, description="Kind of operation (e.g. collection_sync)")
+    resource_id: Optional[str] = Field(default=None, description="Resource the operation acts on")
     status: str = Field(description="Operation status")
     message: str = Field(description="Operation message")
     started_at: datetime = Field(description="Operation start time")
@@ -55,4 +55,16 @@ class DocumentStats(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class DocumentUploadResponse(BaseModel):
+    document: DocumentResponse
+    duplicate: bool = Field(default=False, description="File was already ingested into this collection")
+    chunks_created: int = Field(default=0, description="Number of chunks created")
+    chunks_kept: int = Field(default=0, description="Existing chunks kept because their content is unchanged")
+    chunks_deleted: int = Field(default=0, description="Existing chunks removed because their content is gone")
+    chunks_queued: int = Field(default=0, description="Chunks handed to the embedding workers")
+    embeddings_cached: int = Field(default=0, description="Embeddings served from the embedding cache")
+    embeddings_reused: int = Field(default=0, description="Embeddings reused from identical existing chunks")
+    embeddings_generated: int = Field(default=0, description="Embeddings requested from the provider")
@@ -0,0 +1,119 @@
+from pydantic import BaseModel, Field, StrictBool, validator
+from typing import Optional, List, Dict, Any, Union
+from datetime import datetime
+import re
+
+from app.core.config import settings as app_settings
+
+METADATA_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+
+
+class SearchFilters(BaseModel):
+    document_ids: Optional[List[str]] = Field(None, max_items=100, description="Only chunks of these documents")
+    tags_any: Optional[List[str]] = Field(None, max_items=20, description="Chunks whose document has any of these tags")
+    tags_all: Optional[List[str]] = Field(None, max_items=20, description="Chunks whose document has all of these tags")
+    page_from: Optional[int] = Field(None, ge=0, description="First page (inclusive)")
+    page_to: Optional[int] = Field(None, ge=0, description="Last page (inclusive)")
+    created_after: Optional[datetime] = Field(None, description="Chunks indexed at or after this time (UTC if naive)")
+    created_before: Optional[datetime] = Field(None, description="Chunks indexed before this time (UTC if naive)")
+    metadata: Optional[Dict[str, Union[StrictBool, int, float, str]]] = Field(
+        None,
+        description="Exact matches on chunk metadata keys"
+    )
+
+    @validator("page_to")
+    def validate_page_range(cls, v, values):
+        if v is not None and values.get("page_from") is not None and v < values["page_from"]:
+            raise ValueError("page_to must not be less than page_from")
+        return v
+
+    @validator("metadata")
+    def validate_metadata_keys(cls, v):
+        # Keys are spliced into the expression as JSON paths, so keep them plain
+        for key in v or {}:
+            if not METADATA_KEY_PATTERN.match(key):
+                raise ValueError(f"Invalid metadata key '{key}'")
+        return v
+
+
+class SearchRequest(BaseModel):
+    collection_id: str = Field(..., description="Collection to search")
+    query: str = Field(..., min_length=1, max_length=4000, description="Search text")
+    top_k: int = Field(default=10, ge=1, le=100, description="Number of chunks to return")
+    filters: Optional[SearchFilters] = None
+    mmr: StrictBool = Field(default=False, description="Diversify results with maximal marginal relevance")
+    mmr_lambda: float = Field(
+        default=0.5,
+        ge=0,
+        le=1,
+        description="MMR trade-off: 1 ranks by relevance only, 0 by novelty only"
+    )
+
+    @validator("query")
+    def validate_query(cls, v):
+        if not v.strip():
+            raise ValueError("Query cannot be empty")
+        return v.strip()
+
+
+class AnswerRequest(SearchRequest):
+    top_k: Optional[int] = Field(default=None, ge=1, le=20, description="Chunks retrieved as context")
+    context_window: Optional[int] = Field(
+        default=None,
+        ge=0,
+        le=5,
+        description="Neighbouring chunks added on each side of a hit"
+    )
+    max_tokens: Optional[int] = Field(default=None, ge=16, le=4096, description="Answer length limit")
+    temperature: Optional[float] = Field(default=None, ge=0, le=2)
+
+
+class FederatedSearchRequest(BaseModel):
+    collection_ids: List[str] = Field(..., min_items=1, description="Collections to search together")
+    query: str = Field(..., min_length=1, max_length=4000, description="Search text")
+    top_k: int = Field(default=10, ge=1, le=100, description="Number of chunks to return over all collections")
+    filters: Optional[SearchFilters] = None
+    timeout_ms: Optional[int] = Field(
+        default=None,
+        ge=50,
+        le=30000,
+        description="Deadline for the whole search; slower collections are left out"
+    )
+
+    @validator("collection_ids")
+    def validate_collection_ids(cls, v):
+        v = list(dict.fromkeys(v))
+        if len(v) > app_settings.FEDERATED_SEARCH_MAX_COLLECTIONS:
+            raise ValueError(f"At most {app_settings.FEDERATED_SEARCH_MAX_COLLECTIONS} collections can be searched at once")
+        return v
+
+    @validator("query")
+    def validate_query(cls, v):
+        if not v.strip():
+            raise ValueError("Query cannot be empty")
+        return v.strip()
+
+
+class SearchResult(BaseModel):
+    chunk_id: str
+    document_id: str
+    collection_id: str
+    content: str
+    metadata: Dict[str, Any]
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    collection_id: str
+    results: List[SearchResult]
+    total: int
+
+
+class FederatedSearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+    total: int
+    searched: List[str] = Field(description="Collections whose hits were merged")
+    timed_out: List[str] = Field(default_factory=list, description="Collections that missed the deadline")
+    failed: List[str] = Field(default_factory=list, description="Collections whose search raised an error")
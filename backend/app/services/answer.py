@@ -0,0 +1,208 @@
+from typing import Any, AsyncIterator, Dict, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import json
+import time
+import structlog
+
+from app.core.config import settings
+from app.core.database import database_manager
+from app.core.exceptions import RAGException, CollectionNotFoundError
+from app.repositories.chunk import ChunkRepository
+from app.repositories.collection import CollectionRepository
+from app.schemas.search import AnswerRequest
+from app.services.answer_cache import CachedAnswer, answer_variant, semantic_answer_cache
+from app.services.generation import generation_service
+from app.services.search import SearchService
+
+logger = structlog.get_logger(__name__)
+
+SYSTEM_PROMPT = (
+    "You answer questions using only the numbered context passages provided. "
+    "Cite the passages you use as [n]. If the passages do not contain the answer, say that you "
+    "could not find it in the documents instead of guessing. Answer in the language of the question."
+)
+
+NO_CONTEXT_ANSWER = "No relevant content was found in this collection for the question."
+
+# (chunk_id, content) in document order
+Window = List[Tuple[str, str]]
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def source(hit: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "chunk_id": hit["chunk_id"],
+        "document_id": hit["document_id"],
+        "score": hit["score"],
+        "metadata": hit.get("metadata") or {},
+    }
+
+
+def build_context(
+    hits: List[Dict[str, Any]],
+    windows: Dict[str, Window],
+    max_chars: int
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Numbered passages in rank order, each a hit with its neighbouring chunks.
+    Chunks already quoted by a higher-ranked passage are not repeated, and
+    passages stop once max_chars is reached.
+    """
+    seen = set()
+    passages: List[str] = []
+    sources: List[Dict[str, Any]] = []
+    total = 0
+    for hit in hits:
+        if hit["chunk_id"] in seen:
+            continue
+        window = windows.get(hit["chunk_id"]) or [(hit["chunk_id"], hit["content"])]
+        parts = [(chunk_id, content) for chunk_id, content in window if chunk_id not in seen]
+        text = "\n".join(content for _, content in parts)[:max_chars - total]
+        if not text:
+            break
+
+        seen.update(chunk_id for chunk_id, _ in parts)
+        citation = len(passages) + 1
+        page = (hit.get("metadata") or {}).get("page")
+        passages.append(f"[{citation}]{f' (page {page})' if page is not None else ''}\n{text}")
+        sources.append({**source(hit), "citation": citation})
+        total += len(text)
+
+    return "\n\n".join(passages), sources
+
+
+class AnswerService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.collection_repo = CollectionRepository(session)
+        self.search_service = SearchService(session)
+
+    async def fetch_windows(self, hits: List[Dict[str, Any]], context_size: int) -> Dict[str, Window]:
+        # Own session, so it runs alongside hydration on the request session
+        windows: Dict[str, Window] = {}
+        async for session in database_manager.get_session():
+            chunk_repo = ChunkRepository(session)
+            positions = await chunk_repo.get_positions([hit["chunk_id"] for hit in hits])
+            chunk_windows = await chunk_repo.get_context_windows(
+                list(positions.values()), context_size, follow_links=settings.RAG_CONTEXT_FOLLOW_LINKS
+            )
+            for chunk_id, position in positions.items():
+                if position in chunk_windows:
+                    windows[chunk_id] = [(chunk.id, chunk.content) for chunk in chunk_windows[position]]
+        return windows
+
+    async def assemble_context(
+        self,
+        hits: List[Dict[str, Any]],
+        context_size: int
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        if context_size:
+            hydrated, windows = await asyncio.gather(
+                self.search_service.hydrate(hits),
+                self.fetch_windows(hits, context_size)
+            )
+        else:
+            hydrated, windows = await self.search_service.hydrate(hits), {}
+        return build_context(hydrated, windows, settings.RAG_MAX_CONTEXT_CHARS)
+
+    async def stream(self, request: AnswerRequest) -> AsyncIterator[str]:
+        """
+        Server-sent events for one question: `sources` as soon as the search
+        hits are known, then `token` events as the model streams, then `done`
+        with the cited passages and stage timings. Questions close enough to
+        one answered before on an unchanged collection replay that answer.
+        """
+        started = time.perf_counter()
+
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - started) * 1000, 1)
+
+        collection = await self.collection_repo.get_by_id(request.collection_id)
+        if not collection:
+            raise CollectionNotFoundError(request.collection_id)
+
+        top_k = request.top_k or settings.RAG_ANSWER_TOP_K
+        context_size = settings.RAG_CONTEXT_NEIGHBORS if request.context_window is None else request.context_window
+        mmr_lambda = request.mmr_lambda if request.mmr else None
+        variant = answer_variant(
+            top_k=top_k,
+            context_size=context_size,
+            filters=request.filters.dict(exclude_none=True) if request.filters else None,
+            reranker=settings.RERANKER,
+            mmr_lambda=mmr_lambda,
+            model=settings.LLM_MODEL,
+            max_tokens=request.max_tokens,
+            temperature=request.temperature
+        )
+
+        query_vector = await self.search_service.embed_query(collection, request.query)
+        cached = semantic_answer_cache.lookup(collection.id, variant, collection.version, query_vector)
+        if cached:
+            entry, similarity = cached
+            yield sse_event("sources", {"sources": entry.hits})
+            yield sse_event("token", {"text": entry.answer})
+            yield sse_event("done", {
+                "sources": entry.sources,
+                "timings": {"total_ms": elapsed_ms()},
+                "cached": {"query": entry.query, "similarity": round(similarity, 4)}
+            })
+            return
+
+        hits = await self.search_service.retrieve_ranked(
+            collection, request.query, top_k, request.filters, query_vector=query_vector, mmr_lambda=mmr_lambda
+        )
+        timings = {"retrieval_ms": elapsed_ms()}
+
+        # Context assembly starts before the sources event is flushed to the client
+        context_task = asyncio.create_task(self.assemble_context(hits, context_size))
+        try:
+            yield sse_event("sources", {"sources": [source(hit) for hit in hits]})
+            context, sources = await context_task
+        finally:
+            context_task.cancel()
+        timings["context_ms"] = elapsed_ms()
+
+        if not sources:
+            yield sse_event("token", {"text": NO_CONTEXT_ANSWER})
+            yield sse_event("done", {"sources": [], "timings": timings})
+            return
+
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Context:\n\n{context}\n\nQuestion: {request.query}"},
+        ]
+        answer: List[str] = []
+        async for text in generation_service.stream_chat(messages, max_tokens=request.max_tokens, temperature=request.temperature):
+            if not answer:
+                timings["first_token_ms"] = elapsed_ms()
+            answer.append(text)
+            yield sse_event("token", {"text": text})
+        timings["total_ms"] = elapsed_ms()
+
+        # Only complete answers are cached; a disconnect or error never gets here
+        semantic_answer_cache.store(collection.id, variant, collection.version, query_vector, CachedAnswer(
+            query=request.query,
+            answer="".join(answer),
+            hits=[source(hit) for hit in hits],
+            sources=sources
+        ))
+
+        logger.info("Answered question", collection_id=collection.id, passages=len(sources), chunks=len(answer), **timings)
+        yield sse_event("done", {"sources": sources, "timings": timings})
+
+
+async def stream_answer_events(request: AnswerRequest) -> AsyncIterator[str]:
+    # The response outlives the request's dependencies, so the stream owns its session
+    async for session in database_manager.get_session():
+        try:
+            async for event in AnswerService(session).stream(request):
+                yield event
+        except RAGException as e:
+            yield sse_event("error", {"error": e.message, "status_code": e.status_code})
+        except Exception as e:
+            logger.error(f"Answer stream failed for collection {request.collection_id}: {e}")
+            yield sse_event("error", {"error": "Failed to generate answer", "status_code": 500})
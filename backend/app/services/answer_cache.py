@@ -0,0 +1,160 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import time
+import numpy as np
+
+from app.core.config import settings
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    answer: str
+    hits: List[Dict[str, Any]]  # the `sources` event: ranked hits without text
+    sources: List[Dict[str, Any]]  # cited passages from the `done` event
+
+
+def answer_variant(**options: Any) -> str:
+    # Answers are only interchangeable between requests with the same retrieval/generation options
+    encoded = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class AnswerIndex:
+    """
+    Query embeddings of cached answers as one normalized float32 matrix, so a
+    lookup is a single matrix-vector product. Full indexes reuse the slot of
+    an expired entry, else of the least recently used one.
+    """
+
+    def __init__(self, version: int, dimensions: int, capacity: int):
+        self.version = version
+        self.capacity = capacity
+        self.vectors = np.zeros((min(capacity, 64), dimensions), dtype=np.float32)
+        self.expires = np.zeros(len(self.vectors))
+        self.last_used = np.zeros(len(self.vectors))
+        self.entries: List[CachedAnswer] = []
+
+    def best_match(self, vector: np.ndarray, now: float) -> Tuple[int, float]:
+        size = len(self.entries)
+        if not size:
+            return -1, -1.0
+        scores = self.vectors[:size] @ vector
+        scores[self.expires[:size] <= now] = -np.inf
+        slot = int(np.argmax(scores))
+        return slot, float(scores[slot])
+
+    def lookup(self, vector: np.ndarray, threshold: float, now: float) -> Optional[Tuple[CachedAnswer, float]]:
+        slot, similarity = self.best_match(vector, now)
+        if slot < 0 or similarity < threshold:
+            return None
+        self.last_used[slot] = now
+        return self.entries[slot], similarity
+
+    def add(self, vector: np.ndarray, entry: CachedAnswer, threshold: float, ttl: float, now: float):
+        size = len(self.entries)
+        slot, similarity = self.best_match(vector, now)
+        if slot < 0 or similarity < threshold:
+            # A near-identical question replaces its earlier answer instead of adding a row
+            if size < self.capacity:
+                slot = size
+                self.entries.append(entry)
+                if slot == len(self.vectors):
+                    self._grow()
+            else:
+                expired = np.flatnonzero(self.expires[:size] <= now)
+                slot = int(expired[0]) if len(expired) else int(np.argmin(self.last_used[:size]))
+        if slot < size:
+            self.entries[slot] = entry
+
+        self.vectors[slot] = vector
+        self.expires[slot] = now + ttl
+        self.last_used[slot] = now
+
+    def _grow(self):
+        rows = min(self.capacity, 2 * len(self.vectors))
+        self.vectors = np.resize(self.vectors, (rows, self.vectors.shape[1]))
+        self.expires = np.resize(self.expires, rows)
+        self.last_used = np.resize(self.last_used, rows)
+
+
+class SemanticAnswerCache:
+    """
+    In-process cache of generated answers per (collection, answer options),
+    looked up by cosine similarity of the question embedding.
+
+    Each index remembers the collection version it was built under and is
+    dropped as soon as a request sees a newer one, so any change committed by
+    any process invalidates it.
+    """
+
+    def __init__(self):
+        self.indexes: "OrderedDict[Tuple[str, str], AnswerIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        values = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(values))
+        return values / norm if norm else values
+
+    def _index(self, collection_id: str, variant: str, version: int) -> Optional[AnswerIndex]:
+        key = (collection_id, variant)
+        index = self.indexes.get(key)
+        if index is None:
+            return None
+        if index.version != version:
+            del self.indexes[key]
+            return None
+        self.indexes.move_to_end(key)
+        return index
+
+    def lookup(
+        self,
+        collection_id: str,
+        variant: str,
+        version: int,
+        query_vector: List[float]
+    ) -> Optional[Tuple[CachedAnswer, float]]:
+        if not settings.SEMANTIC_CACHE_ENABLED:
+            return None
+
+        index = self._index(collection_id, variant, version)
+        match = index.lookup(
+            self._normalize(query_vector), settings.SEMANTIC_CACHE_THRESHOLD, time.monotonic()
+        ) if index else None
+
+        if match:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return match
+
+    def store(
+        self,
+        collection_id: str,
+        variant: str,
+        version: int,
+        query_vector: List[float],
+        entry: CachedAnswer
+    ):
+        if not settings.SEMANTIC_CACHE_ENABLED:
+            return
+
+        vector = self._normalize(query_vector)
+        index = self._index(collection_id, variant, version)
+        if index is None:
+            index = AnswerIndex(version, len(vector), settings.SEMANTIC_CACHE_MAX_ENTRIES)
+            self.indexes[(collection_id, variant)] = index
+            while len(self.indexes) > settings.SEMANTIC_CACHE_MAX_INDEXES:
+                self.indexes.popitem(last=False)
+
+        index.add(vector, entry, settings.SEMANTIC_CACHE_THRESHOLD, settings.SEMANTIC_CACHE_TTL_SECONDS, time.monotonic())
+
+
+# Global semantic answer cache instance
+semantic_answer_cache = SemanticAnswerCache()
@@ -0,0 +1,217 @@
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Protocol
+from dataclasses import dataclass
+from bisect import bisect_right
+import re
+import string
+import uuid
+import structlog
+
+from app.core.config import settings
+from app.core.security import create_text_hash
+
+logger = structlog.get_logger(__name__)
+
+# Strong separators: paragraph break, line break, sentence end. The leading
+# character class lets the regex engine skip ahead quickly, so the buffer is
+# classified in one fast pass; word-level fallbacks are found with str.rfind
+# inside the window instead of matching every space.
+BOUNDARY_PATTERN = re.compile(r"[\n.!?。！？](?:(?<=\n)[ \t]*(?:\n\s*)?|(?<=[.!?。！？])[ \t]+)")
+PARAGRAPH, LINE, SENTENCE = 0, 1, 2
+
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation + "。，、！？：；「」『』（）")
+
+# Text that arrives in small pieces (pages) is buffered up to this size before splitting
+STREAM_BUFFER_CHARS = 256 * 1024
+# Characters kept past a candidate cut so a separator at the buffer edge is classified correctly
+LOOKAHEAD_CHARS = 8
+
+
+class Tokenizer(Protocol):
+    name: str
+
+    def count(self, text: str) -> int:
+        ...
+
+
+class ApproximateTokenizer:
+    """Counts words plus punctuation marks; a close, dependency-free proxy for BPE token counts."""
+
+    name = "approximate"
+
+    def count(self, text: str) -> int:
+        return len(text.split()) + len(text) - len(text.translate(PUNCTUATION_TABLE))
+
+
+class TiktokenTokenizer:
+    name = "tiktoken"
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        import tiktoken
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text))
+
+
+def get_tokenizer(name: Optional[str] = None) -> Tokenizer:
+    name = name or settings.CHUNK_TOKENIZER
+    if name == "tiktoken":
+        try:
+            return TiktokenTokenizer()
+        except ImportError:
+            logger.warning("tiktoken is not installed, falling back to approximate token counting")
+    return ApproximateTokenizer()
+
+
+@dataclass
+class ChunkSpan:
+    chunk_index: int
+    start_char: int
+    end_char: int
+    content: str
+
+
+class TextChunker:
+    """
+    Incremental splitter producing chunks of at most `chunk_size` characters
+    that end on the strongest separator available in the second half of the
+    window, with `chunk_overlap` characters carried into the next chunk.
+
+    Text can be fed in pieces (e.g. pages as they are parsed); offsets are
+    always relative to the full concatenated text.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._offset = 0  # absolute offset of the first pending character
+        self._index = 0
+
+    def feed(self, text: str) -> Iterator[ChunkSpan]:
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if self._pending_chars >= max(STREAM_BUFFER_CHARS, 4 * self.chunk_size):
+            yield from self._drain(final=False)
+
+    def flush(self) -> Iterator[ChunkSpan]:
+        yield from self._drain(final=True)
+
+    def split(self, text: str) -> Iterator[ChunkSpan]:
+        yield from self.feed(text)
+        yield from self.flush()
+
+    def _find_cut(self, buffer: str, pos: int, starts: List[List[int]], ends: List[List[int]]) -> tuple[int, int]:
+        # Returns (chunk end, start of the next chunk when there is no overlap)
+        limit = pos + self.chunk_size
+        floor = pos + self.chunk_size // 2
+        for level in (PARAGRAPH, LINE, SENTENCE):
+            level_starts = starts[level]
+            i = bisect_right(level_starts, limit) - 1
+            if i >= 0 and level_starts[i] > floor:
+                return level_starts[i], ends[level][i]
+
+        space = max(buffer.rfind(" ", floor + 1, limit + 1), buffer.rfind("\t", floor + 1, limit + 1))
+        if space != -1:
+            return space, space + 1
+
+        return limit, limit
+
+    @staticmethod
+    def _next_word_start(buffer: str, target: int, end: int) -> int:
+        hits = [i for i in (buffer.find(" ", target, end), buffer.find("\n", target, end)) if i != -1]
+        return min(hits) + 1 if hits else target
+
+    def _drain(self, final: bool) -> Iterator[ChunkSpan]:
+        buffer = "".join(self._pending)
+        size = len(buffer)
+
+        starts: List[List[int]] = [[], [], []]
+        ends: List[List[int]] = [[], [], []]
+        for match in BOUNDARY_PATTERN.finditer(buffer):
+            start, stop = match.span()
+            if buffer[start] == "\n":
+                level = PARAGRAPH if buffer.find("\n", start + 1, stop) != -1 else LINE
+            else:
+                level = SENTENCE
+                start += 1  # keep the punctuation mark in the chunk
+            starts[level].append(start)
+            ends[level].append(stop)
+
+        pos = 0
+        while pos < size:
+            remaining = size - pos
+            if remaining <= self.chunk_size:
+                if not final:
+                    break
+                end, next_pos = size, size
+            elif not final and remaining <= self.chunk_size + LOOKAHEAD_CHARS:
+                break
+            else:
+                end, next_pos = self._find_cut(buffer, pos, starts, ends)
+
+                if self.chunk_overlap:
+                    candidate = self._next_word_start(buffer, end - self.chunk_overlap, end)
+                    if candidate > pos:
+                        next_pos = candidate
+
+            content = buffer[pos:end]
+            if content.strip():
+                yield ChunkSpan(
+                    chunk_index=self._index,
+                    start_char=self._offset + pos,
+                    end_char=self._offset + end,
+                    content=content
+                )
+                self._index += 1
+            pos = next_pos
+
+        leftover = buffer[pos:]
+        self._pending = [leftover] if leftover else []
+        self._pending_chars = len(leftover)
+        self._offset += pos
+
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[ChunkSpan]:
+    return list(TextChunker(chunk_size, chunk_overlap).split(text))
+
+
+def build_chunk_rows(
+    spans: Iterable[ChunkSpan],
+    document_id: str,
+    collection_id: str,
+    tokenizer: Optional[Tokenizer] = None
+) -> List[Dict[str, Any]]:
+    """
+    Turn chunk spans into Chunk column dicts with ids assigned up front, so the
+    previous/next links are filled before a single bulk insert.
+    """
+    tokenizer = tokenizer or get_tokenizer()
+    rows = []
+    for span in spans:
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "document_id": document_id,
+            "collection_id": collection_id,
+            "content": span.content,
+            "content_hash": create_text_hash(span.content),
+            "chunk_index": span.chunk_index,
+            "start_char": span.start_char,
+            "end_char": span.end_char,
+            "character_count": len(span.content),
+            "word_count": len(span.content.split()),
+            "token_count": tokenizer.count(span.content),
+        })
+
+    return link_chunk_rows(rows)
+
+
+def link_chunk_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # (Re)fill previous/next ids from the current row order and ids
+    for index, row in enumerate(rows):
+        row["previous_chunk_id"] = rows[index - 1]["id"] if index > 0 else None
+        row["next_chunk_id"] = rows[index + 1]["id"] if index + 1 < len(rows) else None
+    return rows
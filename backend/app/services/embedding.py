@@ -0,0 +1,149 @@
+from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from collections import defaultdict
+import httpx
+import structlog
+
+from app.core.config import settings
+from app.core.redis_client import redis_manager
+from app.core.milvus_client import milvus_manager
+from app.core.deadline import budget, check_deadline
+from app.core.exceptions import EmbeddingGenerationError
+from app.models.chunk import Chunk
+from app.repositories.chunk import ChunkRepository
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class EmbeddingResult:
+    # Embeddings keyed by content_hash, so identical chunks share one vector
+    embeddings: Dict[str, List[float]] = field(default_factory=dict)
+    cache_hits: int = 0
+    reused: int = 0
+    generated: int = 0
+
+
+class EmbeddingService:
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=settings.OPENAI_API_BASE,
+                headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+                timeout=settings.OPENAI_REQUEST_TIMEOUT,
+            )
+        return self.client
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Embedding client closed")
+
+    async def embed_texts(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        model = model or settings.OPENAI_EMBEDDING_MODEL
+        embeddings: List[List[float]] = []
+
+        for start in range(0, len(texts), settings.EMBEDDING_BATCH_SIZE):
+            batch = texts[start:start + settings.EMBEDDING_BATCH_SIZE]
+            try:
+                response = await self._get_client().post(
+                    "/embeddings",
+                    json={
+                        "model": model,
+                        "input": batch,
+                        "dimensions": settings.OPENAI_EMBEDDING_DIMENSIONS,
+                    },
+                    timeout=budget(settings.OPENAI_REQUEST_TIMEOUT),
+                )
+                response.raise_for_status()
+                data = sorted(response.json()["data"], key=lambda item: item["index"])
+                embeddings.extend(item["embedding"] for item in data)
+            except Exception as e:
+                check_deadline("embedding")
+                logger.error(f"Embedding request failed for batch of {len(batch)} texts: {e}")
+                raise EmbeddingGenerationError(sum(len(t) for t in batch), str(e))
+
+        return embeddings
+
+    async def embed_chunks(
+        self,
+        chunks: List[Chunk],
+        chunk_repo: ChunkRepository,
+        model: Optional[str] = None
+    ) -> EmbeddingResult:
+        """
+        Resolve an embedding for every distinct content_hash in `chunks`, only
+        calling the provider for content that has never been embedded before.
+
+        Lookup order: Redis embedding cache, then any COMPLETED chunk with the
+        same hash and model (vector fetched from its Milvus collection), then
+        the embedding API.
+        """
+        model = model or settings.OPENAI_EMBEDDING_MODEL
+        result = EmbeddingResult()
+
+        texts_by_hash: Dict[str, str] = {}
+        for chunk in chunks:
+            texts_by_hash.setdefault(chunk.content_hash, chunk.content)
+
+        # 1. Redis cache
+        missing = []
+        hashes = list(texts_by_hash)
+        cached_vectors = await redis_manager.get_cached_embeddings([f"{model}:{h}" for h in hashes])
+        for content_hash, cached in zip(hashes, cached_vectors):
+            if cached:
+                result.embeddings[content_hash] = cached
+                result.cache_hits += 1
+            else:
+                missing.append(content_hash)
+
+        # 2. Existing completed chunks in any collection
+        if missing:
+            matches = await chunk_repo.get_completed_by_hashes(missing, model)
+            ids_by_collection: Dict[str, Dict[str, str]] = defaultdict(dict)
+            for content_hash, (chunk_id, milvus_name) in matches.items():
+                ids_by_collection[milvus_name][chunk_id] = content_hash
+
+            for milvus_name, hash_by_id in ids_by_collection.items():
+                # Truncated or reduced-precision vectors cannot be reused elsewhere
+                if milvus_manager.vector_format(milvus_name) != ("float32", settings.OPENAI_EMBEDDING_DIMENSIONS):
+                    continue
+                vectors = await milvus_manager.get_vectors(milvus_name, list(hash_by_id))
+                for chunk_id, vector in vectors.items():
+                    result.embeddings[hash_by_id[chunk_id]] = vector
+                    result.reused += 1
+
+            missing = [h for h in missing if h not in result.embeddings]
+
+        # 3. Embedding provider
+        if missing:
+            vectors = await self.embed_texts([texts_by_hash[h] for h in missing], model)
+            for content_hash, vector in zip(missing, vectors):
+                result.embeddings[content_hash] = vector
+                result.generated += 1
+
+        for content_hash in missing:
+            await redis_manager.cache_embedding(
+                f"{model}:{content_hash}",
+                result.embeddings[content_hash],
+                expire=settings.EMBEDDING_CACHE_TTL
+            )
+
+        logger.info(
+            "Resolved chunk embeddings",
+            chunks=len(chunks),
+            unique=len(texts_by_hash),
+            cache_hits=result.cache_hits,
+            reused=result.reused,
+            generated=result.generated
+        )
+
+        return result
+
+
+# Global embedding service instance
+embedding_service = EmbeddingService()
@@ -0,0 +1,74 @@
+from typing import AsyncIterator, Dict, List, Optional
+import json
+import httpx
+import structlog
+
+from app.core.config import settings
+from app.core.exceptions import AnswerGenerationError
+
+logger = structlog.get_logger(__name__)
+
+
+class GenerationService:
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=settings.LLM_API_BASE or settings.OPENAI_API_BASE,
+                headers={"Authorization": f"Bearer {settings.LLM_API_KEY or settings.OPENAI_API_KEY}"},
+                timeout=settings.LLM_REQUEST_TIMEOUT,
+            )
+        return self.client
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Generation client closed")
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding text deltas as the server sends
+        them (OpenAI SSE format).
+        """
+        payload = {
+            "model": model or settings.LLM_MODEL,
+            "messages": messages,
+            "max_tokens": max_tokens or settings.LLM_MAX_TOKENS,
+            "temperature": settings.LLM_TEMPERATURE if temperature is None else temperature,
+            "stream": True,
+        }
+        try:
+            async with self._get_client().stream("POST", "/chat/completions", json=payload) as response:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    raise AnswerGenerationError(f"HTTP {response.status_code}: {body[:500]}")
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        return
+                    for choice in json.loads(data).get("choices") or []:
+                        text = (choice.get("delta") or {}).get("content")
+                        if text:
+                            yield text
+
+        except AnswerGenerationError:
+            raise
+        except Exception as e:
+            logger.error(f"Chat completion stream failed: {e}")
+            raise AnswerGenerationError(str(e))
+
+
+# Global generation service instance
+generation_service = GenerationService()
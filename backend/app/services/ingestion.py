@@ -0,0 +1,495 @@
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from dataclasses import dataclass
+from pathlib import Path
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from bisect import bisect_right
+from collections import defaultdict, deque
+import calendar
+import structlog
+
+from app.core.config import settings
+from app.core.milvus_client import milvus_manager, NO_PAGE, MAX_TAGS, MAX_TAG_LENGTH
+from app.core.security import create_file_hash, generate_secure_filename
+from app.core.exceptions import (
+    CollectionNotFoundError,
+    DocumentNotFoundError,
+    DocumentAlreadyExistsError,
+    InvalidFileTypeError,
+    FileSizeExceededError,
+    ValidationError,
+    VectorDatabaseError
+)
+from app.models.collection import Collection
+from app.models.document import Document, DocumentStatus
+from app.models.chunk import Chunk, ChunkStatus
+from app.repositories.collection import CollectionRepository
+from app.repositories.document import DocumentRepository
+from app.repositories.chunk import ChunkRepository
+from app.schemas.collection import VectorConfig
+from app.services.chunking import TextChunker, ChunkSpan, build_chunk_rows, link_chunk_rows
+from app.services.embedding import embedding_service
+from app.services.vector_storage import encode as encode_vector
+from app.services.parsing import document_parser
+from app.workers.manager import worker_manager
+
+logger = structlog.get_logger(__name__)
+
+# Columns rewritten on chunks that survive a re-ingest unchanged in content
+POSITION_FIELDS = (
+    "id", "chunk_index", "start_char", "end_char", "chunk_metadata", "previous_chunk_id", "next_chunk_id"
+)
+
+
+@dataclass
+class IngestionResult:
+    document: Optional[Document] = None
+    duplicate: bool = False
+    chunks_created: int = 0
+    chunks_kept: int = 0
+    chunks_deleted: int = 0
+    chunks_queued: int = 0
+    embeddings_cached: int = 0
+    embeddings_reused: int = 0
+    embeddings_generated: int = 0
+
+
+def milvus_row(chunk: Chunk, embedding: List[float]) -> Dict[str, Any]:
+    metadata = chunk.chunk_metadata or {}
+    return {
+        "chunk_id": chunk.id,
+        "document_id": chunk.document_id,
+        "collection_id": chunk.collection_id,
+        "content": chunk.content,
+        "metadata": metadata,
+        "page": metadata.get("page", NO_PAGE),
+        "tags": metadata.get("tags", []),
+        "created_at": calendar.timegm(chunk.created_at.utctimetuple()),
+        "embedding": embedding
+    }
+
+
+class IngestionService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.collection_repo = CollectionRepository(session)
+        self.document_repo = DocumentRepository(session)
+        self.chunk_repo = ChunkRepository(session)
+
+    def _validate_upload(self, original_filename: str, data: bytes) -> str:
+        file_type = original_filename.rsplit(".", 1)[-1].lower() if "." in original_filename else ""
+        if file_type not in settings.ALLOWED_FILE_TYPES:
+            raise InvalidFileTypeError(file_type, settings.ALLOWED_FILE_TYPES)
+
+        if len(data) > settings.MAX_FILE_SIZE:
+            raise FileSizeExceededError(len(data), settings.MAX_FILE_SIZE)
+
+        return file_type
+
+    @staticmethod
+    def validate_tags(tags: Optional[List[str]]) -> List[str]:
+        # Same rules as collection tags; order kept, duplicates and blanks dropped
+        cleaned = list(dict.fromkeys(tag.strip() for tag in tags or [] if tag.strip()))
+        if len(cleaned) > MAX_TAGS:
+            raise ValidationError("tags", f"Maximum {MAX_TAGS} tags allowed")
+        for tag in cleaned:
+            if len(tag) > MAX_TAG_LENGTH:
+                raise ValidationError("tags", f"Tag length cannot exceed {MAX_TAG_LENGTH} characters")
+        return cleaned
+
+    def _store_file(self, original_filename: str, data: bytes) -> tuple[str, str]:
+        filename = generate_secure_filename(original_filename)
+        file_path = Path(settings.UPLOAD_DIR) / filename
+        file_path.write_bytes(data)
+        return filename, str(file_path)
+
+    @staticmethod
+    def _processing_config(collection: Collection) -> Dict[str, Any]:
+        return {
+            "chunk_size": collection.chunk_size,
+            "chunk_overlap": collection.chunk_overlap,
+            "embedding_model": collection.embedding_model
+        }
+
+    async def ingest_upload(
+        self,
+        collection_id: str,
+        original_filename: str,
+        data: bytes,
+        tags: Optional[List[str]] = None
+    ) -> IngestionResult:
+        collection = await self.collection_repo.get_by_id(collection_id)
+        if not collection:
+            raise CollectionNotFoundError(collection_id)
+
+        file_type = self._validate_upload(original_filename, data)
+        tags = self.validate_tags(tags)
+
+        # Identical file already ingested into this collection: nothing to do
+        file_hash = create_file_hash(data)
+        existing = await self.document_repo.get_by_hash(file_hash, collection.id)
+        if existing and existing.status == DocumentStatus.FAILED:
+            # Same bytes failed before (e.g. parser timeout): retry in place
+            return await self.process_document(collection, existing)
+        if existing:
+            logger.info(
+                f"Skipping duplicate upload of {original_filename}",
+                collection_id=collection.id,
+                document_id=existing.id
+            )
+            return IngestionResult(document=existing, duplicate=True)
+
+        filename, file_path = self._store_file(original_filename, data)
+        try:
+            document = await self.document_repo.create(
+                collection_id=collection.id,
+                filename=filename,
+                original_filename=original_filename,
+                file_path=file_path,
+                file_size=len(data),
+                file_type=file_type,
+                file_hash=file_hash,
+                metadata={"tags": tags} if tags else None,
+                processing_config=self._processing_config(collection)
+            )
+        except IntegrityError:
+            # A concurrent upload of the same bytes inserted first
+            await self.session.rollback()
+            Path(file_path).unlink(missing_ok=True)
+            existing = await self.document_repo.get_by_hash(file_hash, collection_id)
+            if not existing:
+                raise
+            logger.info(
+                f"Skipping duplicate upload of {original_filename}",
+                collection_id=collection_id,
+                document_id=existing.id
+            )
+            return IngestionResult(document=existing, duplicate=True)
+
+        return await self.process_document(collection, document)
+
+    async def reingest_upload(self, document_id: str, original_filename: str, data: bytes) -> IngestionResult:
+        """
+        Replace a document's file and re-index only what changed: chunks whose
+        content_hash survives keep their rows and vectors.
+        """
+        document = await self.document_repo.get_by_id(document_id)
+        if not document:
+            raise DocumentNotFoundError(document_id)
+
+        collection_id = document.collection_id
+        collection = await self.collection_repo.get_by_id(collection_id)
+        if not collection:
+            raise CollectionNotFoundError(collection_id)
+
+        file_type = self._validate_upload(original_filename, data)
+        if file_type != document.file_type:
+            raise InvalidFileTypeError(file_type, [document.file_type])
+
+        file_hash = create_file_hash(data)
+        if file_hash == document.file_hash and document.status == DocumentStatus.COMPLETED:
+            return IngestionResult(document=document, duplicate=True)
+
+        # The new version may not duplicate another document of the collection
+        existing = await self.document_repo.get_by_hash(file_hash, collection.id)
+        if existing and existing.id != document.id:
+            raise DocumentAlreadyExistsError(existing.id)
+
+        old_path = document.file_path
+        filename, file_path = self._store_file(original_filename, data)
+        try:
+            document = await self.document_repo.replace_file(
+                document.id,
+                filename=filename,
+                file_path=file_path,
+                file_size=len(data),
+                file_hash=file_hash,
+                processing_config=self._processing_config(collection)
+            )
+        except IntegrityError:
+            # The same bytes were uploaded as another document in the meantime
+            await self.session.rollback()
+            Path(file_path).unlink(missing_ok=True)
+            existing = await self.document_repo.get_by_hash(file_hash, collection_id)
+            if not existing:
+                raise
+            raise DocumentAlreadyExistsError(existing.id)
+
+        result = await self.process_document(collection, document)
+        Path(old_path).unlink(missing_ok=True)
+        return result
+
+    async def rechunk_collection(
+        self,
+        collection: Collection,
+        progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None
+    ) -> IngestionResult:
+        # Re-split every completed document after chunk_size/chunk_overlap changed
+        total = IngestionResult()
+        documents = await self.document_repo.get_completed_by_collection(collection.id)
+        for done, document in enumerate(documents):
+            if progress_callback:
+                await progress_callback(done, len(documents))
+            result = await self.process_document(collection, document)
+            total.chunks_created += result.chunks_created
+            total.chunks_kept += result.chunks_kept
+            total.chunks_deleted += result.chunks_deleted
+            total.chunks_queued += result.chunks_queued
+            total.embeddings_cached += result.embeddings_cached
+            total.embeddings_reused += result.embeddings_reused
+            total.embeddings_generated += result.embeddings_generated
+        return total
+
+    async def chunk_document(self, collection: Collection, document: Document) -> tuple[List[Dict[str, Any]], int, int]:
+        # Pages are chunked as they stream out of the parser; returns (rows, characters, words)
+        chunker = TextChunker(collection.chunk_size, collection.chunk_overlap)
+        spans: List[ChunkSpan] = []
+        page_offsets: List[int] = []
+        page_numbers: List[int] = []
+        characters = 0
+        words = 0
+
+        async for page in document_parser.parse_pages(document.file_path, document.file_type):
+            if page.page_number is not None:
+                page_offsets.append(characters)
+                page_numbers.append(page.page_number)
+            characters += len(page.text)
+            words += len(page.text.split())
+            spans.extend(chunker.feed(page.text))
+        spans.extend(chunker.flush())
+
+        rows = build_chunk_rows(spans, document.id, collection.id)
+        tags = (document.doc_metadata or {}).get("tags")
+        for row in rows:
+            metadata = {}
+            if page_offsets:
+                page_index = max(0, bisect_right(page_offsets, row["start_char"]) - 1)
+                metadata["page"] = page_numbers[page_index]
+            if tags:
+                # Copied onto chunks so search filters never need a document lookup
+                metadata["tags"] = tags
+            if metadata:
+                row["chunk_metadata"] = metadata
+
+        return rows, characters, words
+
+    async def process_document(self, collection: Collection, document: Document) -> IngestionResult:
+        """
+        Chunk the document's current file and reconcile against its existing
+        chunks by content_hash: matching chunks keep their row and vector (only
+        position fields are updated, and the Milvus row is rewritten if the
+        page moved), stale ones are deleted from SQL and Milvus, and only new
+        content is embedded. A first ingest is simply the case with no
+        existing chunks.
+
+        When embedding workers are running, new chunks are left PENDING for
+        them and the document stays PROCESSING until its last chunk is synced.
+        """
+        # Size already counted in the collection stats for this document, if any
+        counted_size = (document.doc_metadata or {}).get("counted_size")
+        counted_chunks = document.chunk_count if counted_size is not None else 0
+        await self.document_repo.update_status(document.id, DocumentStatus.PROCESSING)
+
+        try:
+            rows, character_count, word_count = await self.chunk_document(collection, document)
+            existing = await self.chunk_repo.get_all_by_document(document.id)
+
+            # Match new chunks to existing ones with the same content, in order
+            by_hash: Dict[str, deque] = defaultdict(deque)
+            for chunk in existing:
+                by_hash[chunk.content_hash].append(chunk)
+
+            kept: List[Chunk] = []
+            new_rows: List[Dict[str, Any]] = []
+            for row in rows:
+                bucket = by_hash.get(row["content_hash"])
+                if bucket:
+                    chunk = bucket.popleft()
+                    row["id"] = chunk.id
+                    kept.append(chunk)
+                else:
+                    new_rows.append(row)
+            link_chunk_rows(rows)
+
+            stale_ids = [chunk.id for bucket in by_hash.values() for chunk in bucket]
+            if stale_ids:
+                if not await milvus_manager.delete_vectors(
+                    collection.milvus_collection_name, stale_ids, document_id=document.id
+                ):
+                    raise VectorDatabaseError("delete_vectors", f"Failed to delete {len(stale_ids)} stale vectors")
+                await self.chunk_repo.delete_by_ids(stale_ids)
+
+            kept_rows = {row["id"]: row for row in rows if row["id"] in {chunk.id for chunk in kept}}
+            # Compared before the update, which rewrites these same objects
+            moved = [
+                chunk for chunk in kept
+                if chunk.milvus_synced
+                and (chunk.chunk_metadata or {}) != (kept_rows[chunk.id].get("chunk_metadata") or {})
+            ]
+            await self.chunk_repo.update_positions([
+                {field: row[field] for field in POSITION_FIELDS if field in row}
+                for row in kept_rows.values()
+            ])
+            missing_ids = await self.refresh_vector_fields(collection, moved)
+
+            created = await self.chunk_repo.create_chunks(
+                [{**row, "status": ChunkStatus.PENDING} for row in new_rows]
+            )
+
+            # Kept chunks from an earlier failed attempt may still lack a vector
+            unsynced_ids = [chunk.id for chunk in kept if not chunk.milvus_synced] + missing_ids
+
+            if worker_manager.enabled:
+                await self.chunk_repo.set_status(unsynced_ids, ChunkStatus.PENDING)
+                result = IngestionResult(chunks_queued=len(created) + len(unsynced_ids))
+            else:
+                to_embed = created + await self.chunk_repo.get_by_ids(unsynced_ids)
+                result = await self.embed_and_sync(collection, to_embed)
+
+            result.chunks_created = len(created)
+            result.chunks_kept = len(kept)
+            result.chunks_deleted = len(stale_ids)
+
+            await self.document_repo.update_processing_stats(
+                document.id,
+                chunk_count=len(rows),
+                character_count=character_count,
+                word_count=word_count,
+                metadata={"counted_size": document.file_size}
+            )
+            await self.collection_repo.update_stats(
+                collection.id,
+                document_count=collection.document_count + (0 if counted_size is not None else 1),
+                chunk_count=collection.chunk_count + len(rows) - counted_chunks,
+                total_size=collection.total_size_bytes + document.file_size - (counted_size or 0)
+            )
+
+            if result.chunks_queued:
+                result.document = await self.document_repo.get_by_id(document.id)
+                await worker_manager.notify()
+            else:
+                result.document = await self.document_repo.update_status(document.id, DocumentStatus.COMPLETED)
+
+            logger.info(
+                f"Ingested document {document.original_filename}",
+                document_id=document.id,
+                chunks_created=result.chunks_created,
+                chunks_kept=result.chunks_kept,
+                chunks_deleted=result.chunks_deleted,
+                chunks_queued=result.chunks_queued,
+                embeddings_generated=result.embeddings_generated
+            )
+            return result
+
+        except Exception as e:
+            logger.error(f"Failed to process document {document.id}: {e}")
+            await self.document_repo.update_status(document.id, DocumentStatus.FAILED, error_message=str(e))
+            raise
+
+    async def refresh_vector_fields(self, collection: Collection, chunks: List[Chunk]) -> List[str]:
+        """
+        Rewrites the Milvus rows of kept chunks whose metadata changed, so the
+        page and tags filters see the new values. The stored vectors are
+        written back as they are; chunks whose vector is missing are returned
+        so they can be embedded again.
+        """
+        if not chunks:
+            return []
+
+        vectors = await milvus_manager.get_vectors(collection.milvus_collection_name, [chunk.id for chunk in chunks])
+        rows = [milvus_row(chunk, vectors[chunk.id]) for chunk in chunks if chunk.id in vectors]
+        if rows and not await milvus_manager.insert_vectors(collection.milvus_collection_name, rows):
+            raise VectorDatabaseError("insert_vectors", f"Failed to update {len(rows)} vectors")
+        return [chunk.id for chunk in chunks if chunk.id not in vectors]
+
+    async def embed_and_sync(self, collection: Collection, chunks: List[Chunk]) -> IngestionResult:
+        if not chunks:
+            return IngestionResult()
+
+        embedded = await embedding_service.embed_chunks(chunks, self.chunk_repo, collection.embedding_model)
+
+        # Encode for the live collection's vector field, which may differ from
+        # the configured one while a rebuild is in progress
+        vector_format = (
+            milvus_manager.vector_format(collection.milvus_collection_name)
+            or VectorConfig.for_collection(collection).vector_format
+        )
+        rows = [
+            milvus_row(chunk, encode_vector(embedded.embeddings[chunk.content_hash], vector_format))
+            for chunk in chunks
+        ]
+
+        chunk_ids = [chunk.id for chunk in chunks]
+        await self.chunk_repo.mark_embedded(chunk_ids, collection.embedding_model)
+
+        if not await milvus_manager.insert_vectors(collection.milvus_collection_name, rows):
+            raise VectorDatabaseError("insert_vectors", f"Failed to insert {len(rows)} vectors")
+        await self.chunk_repo.mark_synced(chunk_ids)
+
+        return IngestionResult(
+            embeddings_cached=embedded.cache_hits,
+            embeddings_reused=embedded.reused,
+            embeddings_generated=embedded.generated
+        )
+
+    async def claim_queued_chunks(self, owner: str, limit: int) -> List[Chunk]:
+        return await self.chunk_repo.claim_batch(owner, limit, settings.EMBEDDING_WORKER_LEASE_SECONDS)
+
+    async def process_claimed_chunks(self, chunks: List[Chunk]) -> IngestionResult:
+        # Collected up front: a rollback after a failed group expires the loaded chunks
+        document_ids = list({chunk.document_id for chunk in chunks})
+        by_collection: Dict[str, List[Chunk]] = defaultdict(list)
+        for chunk in chunks:
+            by_collection[chunk.collection_id].append(chunk)
+
+        total = IngestionResult()
+        for collection_id, group in by_collection.items():
+            chunk_ids = [chunk.id for chunk in group]
+            try:
+                collection = await self.collection_repo.get_by_id(collection_id)
+                if not collection:
+                    raise CollectionNotFoundError(collection_id)
+
+                result = await self.embed_and_sync(collection, group)
+                total.embeddings_cached += result.embeddings_cached
+                total.embeddings_reused += result.embeddings_reused
+                total.embeddings_generated += result.embeddings_generated
+
+            except Exception as e:
+                logger.error(f"Failed to embed {len(group)} chunks of collection {collection_id}: {e}")
+                await self.session.rollback()
+                await self.chunk_repo.set_status(chunk_ids, ChunkStatus.FAILED, error_message=str(e))
+
+        await self.finalize_documents(document_ids)
+        return total
+
+    async def process_queued_chunks(self, owner: str, limit: int) -> int:
+        chunks = await self.claim_queued_chunks(owner, limit)
+        if chunks:
+            await self.process_claimed_chunks(chunks)
+        return len(chunks)
+
+    async def finalize_documents(self, document_ids: List[str]) -> None:
+        # Complete (or fail) PROCESSING documents once none of their chunks is still queued
+        progress = await self.chunk_repo.get_progress_by_documents(document_ids)
+        finished_collections = set()
+        for document_id in document_ids:
+            waiting, failed = progress.get(document_id, (0, 0))
+            if waiting:
+                continue
+
+            document = await self.document_repo.get_by_id(document_id)
+            if not document or document.status != DocumentStatus.PROCESSING:
+                continue
+
+            if failed:
+                await self.document_repo.update_status(
+                    document_id, DocumentStatus.FAILED, error_message=f"{failed} chunks failed to embed"
+                )
+            else:
+                await self.document_repo.update_status(document_id, DocumentStatus.COMPLETED)
+            finished_collections.add(document.collection_id)
+
+        # Their chunks became searchable after the collection stats were updated
+        for collection_id in finished_collections:
+            await self.collection_repo.bump_version(collection_id)
@@ -0,0 +1,164 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import asdict
+from pathlib import Path
+import structlog
+
+from app.core.database import database_manager
+from app.core.milvus_client import milvus_manager
+from app.core.exceptions import CollectionNotFoundError, VectorDatabaseError
+from app.models.collection import CollectionStatus
+from app.repositories.collection import CollectionRepository
+from app.repositories.document import DocumentRepository
+from app.repositories.chunk import ChunkRepository
+from app.schemas.collection import CollectionUpdate, VectorConfig
+from app.services.ingestion import IngestionService
+from app.services.operations import OperationContext, OperationCancelled
+from app.services.reconciliation import Reconciler, ReconciliationStats
+from app.services.rebuild import CollectionRebuilder, RebuildStats
+
+logger = structlog.get_logger(__name__)
+
+# Operation bodies run by operation_manager. Each opens its own session since
+# it outlives the request that started it.
+
+
+async def run_collection_sync(context: OperationContext, collection_id: str, force: bool) -> Dict[str, Any]:
+    async for db in database_manager.get_session():
+        repo = CollectionRepository(db)
+        collection = await repo.get_by_id(collection_id)
+        if not collection:
+            raise CollectionNotFoundError(collection_id)
+
+        # Set collection to syncing status
+        await repo.mark_sync_status(collection.id, synced=False)
+        await repo.update(collection.id, CollectionUpdate(status=CollectionStatus.SYNCING))
+
+        async def report_progress(stats: Union[ReconciliationStats, RebuildStats]):
+            await context.update(progress=stats.progress, result=stats.to_dict())
+
+        try:
+            if force and collection.milvus_collection_name:
+                # Rebuild into a new collection and swap the alias; the current
+                # one keeps serving searches until the new one is loaded
+                stats = await CollectionRebuilder(db, progress_callback=report_progress).rebuild_collection(collection)
+            else:
+                # Create the Milvus collection if it is missing
+                success = await milvus_manager.create_collection(
+                    collection.milvus_collection_name,
+                    **VectorConfig.for_collection(collection).milvus_options()
+                )
+                if not success:
+                    raise VectorDatabaseError("create_collection", "Failed to create Milvus collection")
+
+                stats = await Reconciler(db, progress_callback=report_progress).reconcile_collection(collection)
+            await repo.mark_sync_status(collection.id, synced=True)
+
+            logger.info(f"Successfully synced collection {collection.name}")
+            return {"synced": True, "collection_id": collection.id, **stats.to_dict()}
+
+        except OperationCancelled:
+            await repo.mark_sync_status(collection.id, synced=False, error_message="Sync cancelled")
+            raise
+        except Exception as e:
+            await repo.mark_sync_status(collection.id, synced=False, error_message=str(e))
+            raise
+
+
+async def run_collection_rechunk(context: OperationContext, collection_id: str) -> Dict[str, Any]:
+    async for db in database_manager.get_session():
+        collection = await CollectionRepository(db).get_by_id(collection_id)
+        if not collection:
+            raise CollectionNotFoundError(collection_id)
+
+        async def report_progress(done: int, total: int):
+            await context.update(progress=100 * done // max(1, total), message=f"Re-chunked {done} of {total} documents")
+
+        result = asdict(await IngestionService(db).rechunk_collection(collection, progress_callback=report_progress))
+        result.pop("document")
+        return {"collection_id": collection.id, **result}
+
+
+async def run_collection_reconfigure(context: OperationContext, collection_id: str) -> Dict[str, Any]:
+    # Chunking and vector options changed together: re-chunk, then rebuild in the new vector format
+    result = await run_collection_rechunk(context, collection_id)
+    result["rebuild"] = await run_collection_sync(context, collection_id, force=True)
+    return result
+
+
+async def run_collection_purge(context: OperationContext, collection_ids: List[str]) -> Dict[str, Any]:
+    # Drops each collection's vectors, chunks, documents and stored files, then the collection
+    purged: List[str] = []
+    missing: List[str] = []
+    for done, collection_id in enumerate(collection_ids):
+        await context.update(progress=100 * done // len(collection_ids), message=f"Purging collection {collection_id}")
+
+        async for db in database_manager.get_session():
+            collection_repo = CollectionRepository(db)
+            document_repo = DocumentRepository(db)
+            collection = await collection_repo.get_by_id(collection_id)
+            if not collection:
+                missing.append(collection_id)
+                continue
+
+            if collection.milvus_collection_name:
+                if not await milvus_manager.delete_collection(collection.milvus_collection_name):
+                    raise VectorDatabaseError("delete_collection", f"Failed to drop {collection.milvus_collection_name}")
+
+            file_paths = await document_repo.get_file_paths_by_collection(collection_id)
+            await ChunkRepository(db).delete_by_collection(collection_id)
+            await document_repo.delete_by_collection(collection_id)
+            await collection_repo.delete(collection_id)
+
+            for file_path in file_paths:
+                Path(file_path).unlink(missing_ok=True)
+
+            purged.append(collection_id)
+            logger.info(f"Purged collection {collection.name}", documents=len(file_paths))
+
+    return {"purged": purged, "not_found": missing}
+
+
+async def run_bulk_ingest(
+    context: OperationContext,
+    collection_id: str,
+    staged_files: List[Tuple[str, str]],
+    tags: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    # staged_files: (original filename, staging path); staged copies are always removed
+    outcomes: List[Dict[str, Any]] = []
+    try:
+        for done, (original_filename, staged_path) in enumerate(staged_files):
+            await context.update(
+                progress=100 * done // len(staged_files),
+                message=f"Ingesting {original_filename} ({done + 1} of {len(staged_files)})",
+                result={"files": outcomes}
+            )
+
+            outcome: Dict[str, Any] = {"filename": original_filename}
+            try:
+                data = Path(staged_path).read_bytes()
+                async for db in database_manager.get_session():
+                    result = await IngestionService(db).ingest_upload(collection_id, original_filename, data, tags=tags)
+                outcome.update(
+                    document_id=result.document.id if result.document else None,
+                    duplicate=result.duplicate,
+                    chunks_created=result.chunks_created,
+                    chunks_queued=result.chunks_queued
+                )
+            except Exception as e:
+                logger.error(f"Bulk ingest of {original_filename} failed: {e}")
+                outcome["error"] = str(e)
+            finally:
+                Path(staged_path).unlink(missing_ok=True)
+            outcomes.append(outcome)
+
+    finally:
+        for _, staged_path in staged_files:
+            Path(staged_path).unlink(missing_ok=True)
+
+    return {
+        "collection_id": collection_id,
+        "files": outcomes,
+        "succeeded": sum(1 for outcome in outcomes if "error" not in outcome),
+        "failed": sum(1 for outcome in outcomes if "error" in outcome)
+    }
@@ -0,0 +1,278 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import time
+import uuid
+import structlog
+
+from app.core.config import settings
+from app.core.redis_client import redis_manager
+from app.core.deadline import set_deadline
+from app.core.exceptions import OperationConflictError, OperationNotFoundError
+
+logger = structlog.get_logger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class OperationContext:
+    """Handle given to a running operation for progress updates and cancellation checks."""
+
+    def __init__(self, manager: "OperationManager", operation_id: str):
+        self.manager = manager
+        self.operation_id = operation_id
+
+    async def update(
+        self,
+        progress: Optional[int] = None,
+        message: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None
+    ):
+        # Every update is also a cancellation checkpoint
+        await self.raise_if_cancelled()
+        changes: Dict[str, Any] = {}
+        if progress is not None:
+            changes["progress"] = max(0, min(100, int(progress)))
+        if message is not None:
+            changes["message"] = message
+        if result is not None:
+            changes["result"] = result
+        await self.manager._update(self.operation_id, **changes)
+
+    async def raise_if_cancelled(self):
+        if await self.manager.is_cancel_requested(self.operation_id):
+            raise OperationCancelled()
+
+
+OperationFunction = Callable[[OperationContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class OperationManager:
+    """
+    Runs maintenance work (syncs, re-indexes, purges, bulk ingests) as
+    background tasks and records their progress under an operation id.
+
+    Records live in Redis so any API instance can answer GET /operations/{id};
+    without Redis they are kept in this process. Cancellation is cooperative:
+    a cancel request sets a flag that the operation observes at its next
+    progress checkpoint, so work is never interrupted half-written.
+
+    An operation holds its resources (e.g. collection ids) until it finishes;
+    starting another one on a held resource raises OperationConflictError.
+    Claims are also kept in Redis, so they hold across API instances.
+    """
+
+    def __init__(self):
+        self.records: Dict[str, Dict[str, Any]] = {}  # in-memory store and local copy
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.cancel_requests: set[str] = set()
+        self.active: Dict[str, str] = {}  # resource id -> running operation id in this process
+        self._expiry: Dict[str, float] = {}
+
+    @staticmethod
+    def _key(operation_id: str) -> str:
+        return f"operation:{operation_id}"
+
+    @staticmethod
+    def _cancel_key(operation_id: str) -> str:
+        # Kept apart from the record so a concurrent progress write cannot drop it
+        return f"operation:{operation_id}:cancel"
+
+    @staticmethod
+    def _resource_key(resource_id: str) -> str:
+        return f"operation:resource:{resource_id}"
+
+    async def _save(self, record: Dict[str, Any]):
+        operation_id = record["operation_id"]
+        self.records[operation_id] = record
+        if record["status"] in FINISHED_STATUSES:
+            self._expiry[operation_id] = time.monotonic() + settings.OPERATION_TTL_SECONDS
+        if redis_manager.is_available:
+            await redis_manager.set(self._key(operation_id), record, expire=settings.OPERATION_TTL_SECONDS)
+
+    async def _update(self, operation_id: str, **changes):
+        record = await self._load(operation_id)
+        record.update(changes)
+        await self._save(record)
+
+    def _prune(self):
+        now = time.monotonic()
+        for operation_id in [op for op, expires_at in self._expiry.items() if expires_at < now]:
+            self.records.pop(operation_id, None)
+            self.cancel_requests.discard(operation_id)
+            self._expiry.pop(operation_id, None)
+
+    async def _load(self, operation_id: str) -> Dict[str, Any]:
+        record = None
+        if redis_manager.is_available:
+            record = await redis_manager.get(self._key(operation_id))
+        if record is None:
+            record = self.records.get(operation_id)
+        if record is None:
+            raise OperationNotFoundError(operation_id)
+        return dict(record)
+
+    async def get(self, operation_id: str) -> Dict[str, Any]:
+        record = await self._load(operation_id)
+        if record["status"] == "running" and await self.is_cancel_requested(operation_id):
+            record["status"] = "cancelling"
+        return record
+
+    async def is_cancel_requested(self, operation_id: str) -> bool:
+        if operation_id in self.cancel_requests:
+            return True
+        if redis_manager.is_available:
+            return await redis_manager.exists(self._cancel_key(operation_id))
+        return False
+
+    async def _is_running(self, operation_id: str) -> bool:
+        try:
+            record = await self._load(operation_id)
+        except OperationNotFoundError:
+            return False
+        return record["status"] not in FINISHED_STATUSES
+
+    async def active_operation(self, resource_id: str) -> Optional[str]:
+        """Id of the operation running on resource_id in any API process, if there is one."""
+        operation_id = self.active.get(resource_id)
+        if operation_id is None and redis_manager.is_available:
+            operation_id = await redis_manager.get(self._resource_key(resource_id))
+        if operation_id and await self._is_running(operation_id):
+            return operation_id
+        return None
+
+    async def ensure_idle(self, resource_id: str):
+        # Lets endpoints refuse a change before writing anything, not only when starting the operation
+        operation_id = await self.active_operation(resource_id)
+        if operation_id:
+            raise OperationConflictError(resource_id, operation_id)
+
+    async def _claim(self, operation_id: str, resource_ids: List[str]):
+        claimed: List[str] = []
+        try:
+            for resource_id in resource_ids:
+                holder = self.active.get(resource_id)
+                if holder:
+                    raise OperationConflictError(resource_id, holder)
+                self.active[resource_id] = operation_id
+                claimed.append(resource_id)
+
+                key = self._resource_key(resource_id)
+                if redis_manager.is_available and not await redis_manager.set_if_absent(
+                    key, operation_id, settings.OPERATION_TTL_SECONDS
+                ):
+                    holder = await redis_manager.get(key)
+                    if holder and await self._is_running(holder):
+                        raise OperationConflictError(resource_id, holder)
+                    # Left behind by an operation that finished, or died with its process
+                    await redis_manager.set(key, operation_id, expire=settings.OPERATION_TTL_SECONDS)
+        except OperationConflictError:
+            await self._release(operation_id, claimed)
+            raise
+
+    async def _release(self, operation_id: str, resource_ids: List[str]):
+        for resource_id in resource_ids:
+            if self.active.get(resource_id) == operation_id:
+                del self.active[resource_id]
+            if redis_manager.is_available:
+                key = self._resource_key(resource_id)
+                if await redis_manager.get(key) == operation_id:
+                    await redis_manager.delete(key)
+
+    async def start(
+        self,
+        operation_type: str,
+        message: str,
+        fn: OperationFunction,
+        resource_id: Optional[str] = None,
+        resource_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Record and start an operation holding resource_ids (default: just
+        resource_id). Raises OperationConflictError, without starting
+        anything, if another operation holds one of them.
+        """
+        self._prune()
+        if resource_ids is None:
+            resource_ids = [resource_id] if resource_id else []
+        operation_id = str(uuid.uuid4())
+        record = {
+            "operation_id": operation_id,
+            "operation_type": operation_type,
+            "resource_id": resource_id,
+            "resource_ids": resource_ids,
+            "status": "running",
+            "message": message,
+            "started_at": datetime.utcnow().isoformat(),
+            "completed_at": None,
+            "progress": 0,
+            "result": None,
+        }
+        # Saved before claiming, so other processes see the claim's holder as running
+        await self._save(record)
+        try:
+            await self._claim(operation_id, resource_ids)
+        except OperationConflictError:
+            self.records.pop(operation_id, None)
+            if redis_manager.is_available:
+                await redis_manager.delete(self._key(operation_id))
+            raise
+
+        task = asyncio.create_task(self._run(operation_id, fn, resource_ids), name=f"operation-{operation_id}")
+        self.tasks[operation_id] = task
+        task.add_done_callback(lambda _: self.tasks.pop(operation_id, None))
+
+        logger.info(f"Started {operation_type} operation {operation_id}", resource_id=resource_id)
+        return dict(record)
+
+    async def _run(self, operation_id: str, fn: OperationFunction, resource_ids: List[str]):
+        # Operations outlive the request that started them, and its deadline
+        set_deadline(None)
+        context = OperationContext(self, operation_id)
+        try:
+            result = await fn(context)
+            changes = {"status": "completed", "progress": 100}
+            if result is not None:
+                changes["result"] = result
+        except OperationCancelled:
+            changes = {"status": "cancelled", "message": "Operation cancelled"}
+        except asyncio.CancelledError:
+            changes = {"status": "failed", "message": "Operation interrupted by shutdown"}
+        except Exception as e:
+            logger.error(f"Operation {operation_id} failed: {e}")
+            changes = {"status": "failed", "message": str(e)}
+
+        changes["completed_at"] = datetime.utcnow().isoformat()
+        try:
+            await self._update(operation_id, **changes)
+        except Exception as e:
+            logger.error(f"Failed to record outcome of operation {operation_id}: {e}")
+        await self._release(operation_id, resource_ids)
+        logger.info(f"Operation {operation_id} {changes['status']}")
+
+    async def cancel(self, operation_id: str) -> Dict[str, Any]:
+        record = await self._load(operation_id)
+        if record["status"] in FINISHED_STATUSES:
+            return record
+
+        self.cancel_requests.add(operation_id)
+        if redis_manager.is_available:
+            await redis_manager.set(self._cancel_key(operation_id), "1", expire=settings.OPERATION_TTL_SECONDS)
+
+        record["status"] = "cancelling"
+        return record
+
+    async def close(self):
+        # Stop operations still running in this process; they are recorded as failed
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global operation manager instance
+operation_manager = OperationManager()
@@ -0,0 +1,221 @@
+from typing import Any, AsyncGenerator, Callable, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
+import os
+import structlog
+
+from app.core.config import settings
+from app.core.exceptions import DocumentParsingError
+
+logger = structlog.get_logger(__name__)
+
+# Text formats are split into blocks of roughly this size so they stream like pages
+TEXT_BLOCK_CHARS = 64 * 1024
+DOCX_BLOCK_PARAGRAPHS = 50
+
+
+@dataclass
+class ParsedPage:
+    page_number: Optional[int]  # 1-based for paginated formats, None otherwise
+    text: str  # consecutive pages concatenate directly into the document text
+
+
+# Worker-side functions. These run inside the process pool, so they must stay
+# importable at module level and only exchange plain picklable values.
+
+def _init_worker(memory_limit_bytes: int):
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    except (ImportError, ValueError, OSError):
+        # Not available on Windows, or refused by the host: run uncapped
+        pass
+
+
+def _pdf_page_count(file_path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(file_path).pages)
+
+
+def _extract_pdf_pages(file_path: str, start: int, end: int) -> List[Tuple[Optional[int], str]]:
+    from pypdf import PdfReader
+    reader = PdfReader(file_path)
+    return [(index + 1, (reader.pages[index].extract_text() or "") + "\n\n") for index in range(start, end)]
+
+
+def _extract_docx_blocks(file_path: str) -> List[Tuple[Optional[int], str]]:
+    from docx import Document as DocxDocument
+    paragraphs = [p.text for p in DocxDocument(file_path).paragraphs if p.text.strip()]
+    return [
+        (None, "\n".join(paragraphs[i:i + DOCX_BLOCK_PARAGRAPHS]) + "\n")
+        for i in range(0, len(paragraphs), DOCX_BLOCK_PARAGRAPHS)
+    ]
+
+
+def _extract_text_blocks(file_path: str) -> List[Tuple[Optional[int], str]]:
+    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    return [(None, text[i:i + TEXT_BLOCK_CHARS]) for i in range(0, len(text), TEXT_BLOCK_CHARS)]
+
+
+class _WorkerSlots:
+    """Caps parser processes across concurrent parses, granting each at least one."""
+
+    def __init__(self, total: int):
+        self.free = total
+        self.waiters: List[asyncio.Future] = []
+
+    async def acquire(self, wanted: int) -> int:
+        while self.free == 0:
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self.waiters:
+                    self.waiters.remove(waiter)
+        granted = min(wanted, self.free)
+        self.free -= granted
+        return granted
+
+    def release(self, count: int):
+        self.free += count
+        for waiter in self.waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self.waiters.clear()
+
+
+class DocumentParser:
+    def __init__(self):
+        self.max_workers = settings.PARSER_MAX_WORKERS or os.cpu_count() or 1
+        self.slots = _WorkerSlots(self.max_workers)
+        # One single-process executor per slot, kept warm between parses
+        self.idle: List[ProcessPoolExecutor] = []
+        self.executors: Set[ProcessPoolExecutor] = set()
+
+    def _start_executor(self) -> ProcessPoolExecutor:
+        # spawn keeps workers small (no copy of the API process) so the
+        # address-space cap applies to the parser alone
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(settings.PARSER_MEMORY_LIMIT_MB * 1024 * 1024,),
+        )
+        self.executors.add(executor)
+        return executor
+
+    def _stop_executor(self, executor: ProcessPoolExecutor):
+        self.executors.discard(executor)
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _lease(self, wanted: int) -> List[ProcessPoolExecutor]:
+        count = await self.slots.acquire(wanted)
+        return [self.idle.pop() if self.idle else self._start_executor() for _ in range(count)]
+
+    def _give_back(self, executors: List[ProcessPoolExecutor], healthy: bool):
+        # A timed-out or abandoned parse may still be spinning inside its
+        # workers; they ran nothing but this parse, so terminating them
+        # cannot take down other parses.
+        for executor in executors:
+            if healthy:
+                self.idle.append(executor)
+            else:
+                self._stop_executor(executor)
+        self.slots.release(len(executors))
+
+    def close(self):
+        for executor in list(self.executors):
+            self._stop_executor(executor)
+        self.idle.clear()
+        logger.info("Document parser processes stopped")
+
+    async def _run(
+        self, executor: ProcessPoolExecutor, filename: str, deadline: float, fn: Callable[..., Any], *args: Any
+    ) -> Any:
+        """fn(*args) on one of the parse's leased executors, bounded by the parse's deadline."""
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(executor, fn, *args)
+            return await asyncio.wait_for(future, timeout=max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            raise DocumentParsingError(filename, f"timed out after {settings.PARSER_TIMEOUT_SECONDS}s")
+        except Exception as e:
+            # Includes BrokenProcessPool when a worker is killed (e.g. for memory)
+            raise DocumentParsingError(filename, f"{type(e).__name__}: {e}")
+
+    async def parse_pages(self, file_path: str, file_type: str) -> AsyncGenerator[ParsedPage, None]:
+        """
+        Extract text from a stored upload in worker processes, yielding pages
+        in document order as soon as they are available.
+
+        Every parse leases its own worker processes out of PARSER_MAX_WORKERS
+        shared by all parses, so a timeout or crash only ends the parse that
+        caused it. PDFs are split into page ranges that
+        are parsed in parallel, with at most two ranges per worker in flight
+        so memory stays bounded.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.PARSER_TIMEOUT_SECONDS
+        filename = os.path.basename(file_path)
+
+        extract = {"docx": _extract_docx_blocks, "txt": _extract_text_blocks, "md": _extract_text_blocks}
+        if file_type != "pdf" and file_type not in extract:
+            raise DocumentParsingError(filename, f"unsupported file type '{file_type}'")
+
+        executors = await self._lease(self.max_workers if file_type == "pdf" else 1)
+        finished = False
+        try:
+            if file_type != "pdf":
+                blocks = await self._run(executors[0], filename, deadline, extract[file_type], file_path)
+                finished = True
+                for page_number, text in blocks:
+                    yield ParsedPage(page_number=page_number, text=text)
+                return
+
+            page_count = await self._run(executors[0], filename, deadline, _pdf_page_count, file_path)
+            step = settings.PARSER_PAGES_PER_TASK
+            ranges = list(enumerate((start, min(start + step, page_count)) for start in range(0, page_count, step)))
+
+            # Workers beyond the number of ranges go back to other parses straight away
+            surplus = executors[max(1, len(ranges)):]
+            del executors[len(executors) - len(surplus):]
+            self._give_back(surplus, healthy=True)
+
+            remaining = iter(ranges)
+            pending = deque()
+
+            def submit() -> None:
+                index, page_range = next(remaining, (None, None))
+                if page_range:
+                    executor = executors[index % len(executors)]
+                    pending.append(asyncio.ensure_future(
+                        self._run(executor, filename, deadline, _extract_pdf_pages, file_path, *page_range)
+                    ))
+
+            for _ in range(len(executors) * 2):
+                submit()
+
+            try:
+                while pending:
+                    pages = await pending.popleft()
+                    submit()
+                    for page_number, text in pages:
+                        yield ParsedPage(page_number=page_number, text=text)
+                finished = True
+            finally:
+                for task in pending:
+                    if not task.cancel() and not task.cancelled():
+                        task.exception()  # already failed along with the awaited range
+        finally:
+            self._give_back(executors, healthy=finished)
+
+
+# Global document parser instance
+document_parser = DocumentParser()
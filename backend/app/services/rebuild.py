@@ -0,0 +1,156 @@
+from typing import Awaitable, Callable, Dict, Optional, Any
+from dataclasses import dataclass, asdict
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from app.core.config import settings
+from app.core.milvus_client import milvus_manager
+from app.core.exceptions import VectorDatabaseError
+from app.models.collection import Collection
+from app.repositories.chunk import ChunkRepository
+from app.schemas.collection import VectorConfig
+from app.services.embedding import embedding_service
+from app.services.ingestion import milvus_row
+from app.services.vector_storage import VectorFormat, encode as encode_vector
+from app.services.reconciliation import Reconciler, ReconciliationStats
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class RebuildStats:
+    milvus_collection: Optional[str] = None  # physical collection now behind the alias
+    previous_collection: Optional[str] = None
+    expected_total: int = 0
+    backfilled: int = 0
+    vectors_copied: int = 0  # taken from the live collection
+    embeddings_cached: int = 0
+    embeddings_reused: int = 0
+    embeddings_generated: int = 0
+    catch_up: Optional[Dict[str, Any]] = None  # reconciliation run after the swap
+
+    @property
+    def progress(self) -> int:
+        if not self.expected_total:
+            return 90
+        return min(90, int(90 * self.backfilled / self.expected_total))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+ProgressCallback = Callable[[RebuildStats], Awaitable[None]]
+
+
+class CollectionRebuilder:
+    """
+    Rebuilds a collection's vectors without taking search offline.
+
+    The collection's milvus_collection_name is an alias. A new physical
+    collection is created with the current schema, backfilled from SQL in
+    batches, loaded, and only then swapped in with a single alias change;
+    the old collection keeps serving reads until that moment. Vectors are
+    copied from the live collection where they still fit the schema,
+    otherwise resolved through the embedding cache/reuse/API path.
+
+    Writes that land on the old collection during the backfill are picked up
+    by a reconciliation pass against the alias once it points at the new one.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ):
+        self.session = session
+        self.batch_size = batch_size or settings.RECONCILE_BATCH_SIZE
+        self.progress_callback = progress_callback
+        self.chunk_repo = ChunkRepository(session)
+
+    async def rebuild_collection(self, collection: Collection) -> RebuildStats:
+        alias = collection.milvus_collection_name
+        if not alias:
+            raise VectorDatabaseError("rebuild", f"Collection {collection.id} has no Milvus collection")
+
+        stats = RebuildStats(expected_total=collection.chunk_count)
+        config = VectorConfig.for_collection(collection)
+        # Live vectors are copied as-is only when the storage format is unchanged
+        source = alias if milvus_manager.vector_format(alias) == config.vector_format else None
+        shadow = milvus_manager.physical_collection_name(alias)
+
+        if not await milvus_manager.create_physical_collection(shadow, **config.milvus_options()):
+            raise VectorDatabaseError("create_collection", f"Failed to create {shadow}")
+
+        try:
+            await self._backfill(collection, source, shadow, config.vector_format, stats)
+
+            if not await milvus_manager.load_collection(shadow):
+                raise VectorDatabaseError("load_collection", f"Failed to load {shadow}")
+            await self._report(stats)
+
+            stats.previous_collection = await milvus_manager.swap_alias(alias, shadow)
+            stats.milvus_collection = shadow
+
+        except BaseException:
+            # Nothing points at the shadow yet; the live collection is untouched
+            await milvus_manager.delete_collection(shadow)
+            raise
+
+        if stats.previous_collection:
+            await milvus_manager.delete_collection(stats.previous_collection)
+
+        async def report_catch_up(reconciliation: ReconciliationStats):
+            stats.catch_up = reconciliation.to_dict()
+            await self._report(stats)
+
+        reconciliation = await Reconciler(
+            self.session, self.batch_size, progress_callback=report_catch_up
+        ).reconcile_collection(collection)
+        stats.catch_up = reconciliation.to_dict()
+
+        logger.info(f"Rebuilt collection {collection.name}", **stats.to_dict())
+        return stats
+
+    async def _backfill(
+        self,
+        collection: Collection,
+        source: Optional[str],
+        shadow: str,
+        vector_format: VectorFormat,
+        stats: RebuildStats
+    ):
+        after_id = None
+        while True:
+            chunks = await self.chunk_repo.get_completed_page(collection.id, after_id, self.batch_size)
+            if not chunks:
+                return
+
+            vectors: Dict[str, Any] = {}
+            if source:
+                vectors = await milvus_manager.get_vectors(source, [chunk.id for chunk in chunks])
+                stats.vectors_copied += len(vectors)
+
+            missing = [chunk for chunk in chunks if chunk.id not in vectors]
+            if missing:
+                embedded = await embedding_service.embed_chunks(missing, self.chunk_repo, collection.embedding_model)
+                for chunk in missing:
+                    vectors[chunk.id] = encode_vector(embedded.embeddings[chunk.content_hash], vector_format)
+                stats.embeddings_cached += embedded.cache_hits
+                stats.embeddings_reused += embedded.reused
+                stats.embeddings_generated += embedded.generated
+
+            rows = [milvus_row(chunk, vectors[chunk.id]) for chunk in chunks]
+            if not await milvus_manager.insert_vectors(shadow, rows, flush=False):
+                raise VectorDatabaseError("insert_vectors", f"Failed to backfill {len(rows)} vectors into {shadow}")
+
+            stats.backfilled += len(chunks)
+            await self._report(stats)
+
+            if len(chunks) < self.batch_size:
+                return
+            after_id = chunks[-1].id
+
+    async def _report(self, stats: RebuildStats):
+        if self.progress_callback:
+            await self.progress_callback(stats)
@@ -0,0 +1,183 @@
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, asdict
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from app.core.config import settings
+from app.core.milvus_client import milvus_manager
+from app.core.exceptions import VectorDatabaseError
+from app.models.collection import Collection
+from app.models.chunk import ChunkStatus
+from app.repositories.chunk import ChunkRepository
+from app.services.ingestion import IngestionService
+
+logger = structlog.get_logger(__name__)
+
+SyncState = Tuple[str, str, bool]  # (chunk_id, status, milvus_synced)
+
+
+@dataclass
+class ReconciliationStats:
+    sql_chunks: int = 0
+    milvus_vectors: int = 0
+    expected_total: int = 0  # SQL chunk count + Milvus entity count at start, for progress
+    reinserted: int = 0
+    orphans_deleted: int = 0
+    marked_synced: int = 0
+    skipped_in_progress: int = 0
+
+    @property
+    def progress(self) -> int:
+        if not self.expected_total:
+            return 100
+        return min(99, int(100 * (self.sql_chunks + self.milvus_vectors) / self.expected_total))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+ProgressCallback = Callable[[ReconciliationStats], Awaitable[None]]
+
+
+class Reconciler:
+    """
+    Brings a collection's Milvus vectors in line with its SQL chunks.
+
+    Chunk ids from SQL and primary keys from Milvus are both streamed in
+    ascending order and merged like a sorted set difference, so memory stays
+    bounded by the batch size whatever the collection size:
+
+    - SQL only: completed chunks are re-embedded (cache/reuse first) and upserted
+    - Milvus only: orphan vectors are deleted
+    - both: chunks not flagged as synced are marked synced in bulk
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ):
+        self.session = session
+        self.batch_size = batch_size or settings.RECONCILE_BATCH_SIZE
+        self.progress_callback = progress_callback
+        self.chunk_repo = ChunkRepository(session)
+        self.ingestion = IngestionService(session)
+
+    async def _sql_states(self, collection_id: str) -> AsyncIterator[SyncState]:
+        after_id = None
+        while True:
+            page = await self.chunk_repo.get_sync_state_page(collection_id, after_id, self.batch_size)
+            for state in page:
+                yield state
+            if len(page) < self.batch_size:
+                return
+            after_id = page[-1][0]
+
+    async def _milvus_ids(self, collection_name: str) -> AsyncIterator[str]:
+        async for batch in milvus_manager.iterate_chunk_ids(collection_name, self.batch_size):
+            for chunk_id in batch:
+                yield chunk_id
+
+    @staticmethod
+    async def _ordered(source: AsyncIterator[Any], key: Callable[[Any], str], name: str) -> AsyncIterator[Any]:
+        # The merge is only correct on sorted input; stop rather than delete live vectors
+        previous = None
+        async for item in source:
+            current = key(item)
+            if previous is not None and current <= previous:
+                raise VectorDatabaseError("reconcile", f"{name} ids are not in ascending order at '{current}'")
+            previous = current
+            yield item
+
+    async def reconcile_collection(self, collection: Collection) -> ReconciliationStats:
+        if not collection.milvus_collection_name:
+            raise VectorDatabaseError("reconcile", f"Collection {collection.id} has no Milvus collection")
+
+        milvus_stats = await milvus_manager.get_collection_stats(collection.milvus_collection_name)
+        stats = ReconciliationStats(
+            expected_total=collection.chunk_count + ((milvus_stats or {}).get("num_entities") or 0)
+        )
+
+        missing: List[str] = []
+        orphans: List[str] = []
+        unflagged: List[str] = []
+
+        sql = self._ordered(self._sql_states(collection.id), lambda state: state[0], "SQL")
+        milvus = self._ordered(self._milvus_ids(collection.milvus_collection_name), lambda chunk_id: chunk_id, "Milvus")
+        state = await anext(sql, None)
+        vector_id = await anext(milvus, None)
+
+        while state is not None or vector_id is not None:
+            if vector_id is None or (state is not None and state[0] < vector_id):
+                # In SQL only
+                chunk_id, chunk_status, _ = state
+                stats.sql_chunks += 1
+                if chunk_status == ChunkStatus.COMPLETED:
+                    missing.append(chunk_id)
+                else:
+                    # Pending/embedding chunks are the workers' job; failed ones stay failed
+                    stats.skipped_in_progress += 1
+                state = await anext(sql, None)
+            elif state is None or vector_id < state[0]:
+                # In Milvus only
+                stats.milvus_vectors += 1
+                orphans.append(vector_id)
+                vector_id = await anext(milvus, None)
+            else:
+                chunk_id, chunk_status, synced = state
+                stats.sql_chunks += 1
+                stats.milvus_vectors += 1
+                if not synced and chunk_status == ChunkStatus.COMPLETED:
+                    unflagged.append(chunk_id)
+                state = await anext(sql, None)
+                vector_id = await anext(milvus, None)
+
+            if (stats.sql_chunks + stats.milvus_vectors) % self.batch_size == 0:
+                await self._report(stats)
+            if len(missing) >= self.batch_size:
+                await self._reinsert(collection, missing, stats)
+            if len(orphans) >= self.batch_size:
+                await self._delete_orphans(collection, orphans, stats)
+            if len(unflagged) >= self.batch_size:
+                await self._mark_synced(unflagged, stats)
+
+        await self._reinsert(collection, missing, stats)
+        await self._delete_orphans(collection, orphans, stats)
+        await self._mark_synced(unflagged, stats)
+
+        logger.info(f"Reconciled collection {collection.name}", **stats.to_dict())
+        return stats
+
+    async def _report(self, stats: ReconciliationStats):
+        if self.progress_callback:
+            await self.progress_callback(stats)
+
+    async def _reinsert(self, collection: Collection, chunk_ids: List[str], stats: ReconciliationStats):
+        if not chunk_ids:
+            return
+        chunks = await self.chunk_repo.get_by_ids(chunk_ids)
+        if chunks:
+            await self.ingestion.embed_and_sync(collection, chunks)
+        stats.reinserted += len(chunks)
+        chunk_ids.clear()
+        await self._report(stats)
+
+    async def _delete_orphans(self, collection: Collection, chunk_ids: List[str], stats: ReconciliationStats):
+        if not chunk_ids:
+            return
+        # A chunk created after the SQL scan passed its id would look orphaned; keep it
+        live = await self.chunk_repo.get_existing_ids(chunk_ids)
+        orphans = [chunk_id for chunk_id in chunk_ids if chunk_id not in live]
+        if orphans and not await milvus_manager.delete_vectors(collection.milvus_collection_name, orphans):
+            raise VectorDatabaseError("delete_vectors", f"Failed to delete {len(orphans)} orphan vectors")
+        stats.orphans_deleted += len(orphans)
+        chunk_ids.clear()
+        await self._report(stats)
+
+    async def _mark_synced(self, chunk_ids: List[str], stats: ReconciliationStats):
+        if not chunk_ids:
+            return
+        stats.marked_synced += await self.chunk_repo.mark_synced(chunk_ids)
+        chunk_ids.clear()
+        await self._report(stats)
@@ -0,0 +1,247 @@
+from typing import Any, Dict, List, Optional
+from collections import Counter
+import asyncio
+import re
+import threading
+import time
+import httpx
+import numpy as np
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens. Non-ASCII words (Korean, CJK) are split into
+    character bigrams, so a query term still matches a word that carries a
+    particle or is part of a compound.
+    """
+    tokens: List[str] = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if word.isascii() or len(word) < 3:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def bm25_scores(query: str, passages: List[str], k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+    # BM25 with document frequencies taken over the candidate set itself
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not passages:
+        return np.zeros(len(passages), dtype=np.float32)
+
+    column = {term: i for i, term in enumerate(terms)}
+    tf = np.zeros((len(passages), len(terms)), dtype=np.float32)
+    lengths = np.zeros(len(passages), dtype=np.float32)
+    for row, passage in enumerate(passages):
+        tokens = tokenize(passage)
+        lengths[row] = len(tokens)
+        for term, count in Counter(token for token in tokens if token in column).items():
+            tf[row, column[term]] = count
+
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(passages) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / max(float(lengths.mean()), 1.0))
+    return ((tf * (k1 + 1)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+class Reranker:
+    """
+    Scores a batch of candidate hits for a query in one call; higher is
+    better. Hits carry their text in `content` and vector score in `score`.
+    """
+
+    name = "base"
+
+    async def score(self, query: str, hits: List[Dict[str, Any]]) -> List[float]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class LexicalReranker(Reranker):
+    """
+    Blend of the vector score and BM25 over the candidates, scaled to [0, 1]:
+    exact term matches (names, codes, numbers) that embeddings blur move up.
+    """
+
+    name = "lexical"
+
+    def __init__(self, weight: Optional[float] = None):
+        self.weight = settings.RERANK_LEXICAL_WEIGHT if weight is None else weight
+
+    def _score(self, query: str, hits: List[Dict[str, Any]]) -> List[float]:
+        lexical = bm25_scores(query, [hit["content"] or "" for hit in hits])
+        top = float(lexical.max()) if len(lexical) else 0.0
+        if top > 0:
+            lexical = lexical / top
+        vector = np.asarray([hit["score"] for hit in hits], dtype=np.float32)
+        return ((1 - self.weight) * vector + self.weight * lexical).tolist()
+
+    async def score(self, query: str, hits: List[Dict[str, Any]]) -> List[float]:
+        return await asyncio.to_thread(self._score, query, hits)
+
+
+class LocalCrossEncoderReranker(Reranker):
+    """
+    sentence-transformers CrossEncoder on CPU, loaded on first use. Pairs are
+    scored in batches of RERANK_BATCH_SIZE in a worker thread.
+    """
+
+    name = "cross_encoder"
+
+    def __init__(self, model: Optional[str] = None):
+        from sentence_transformers import CrossEncoder  # optional dependency
+
+        self.model_name = model or settings.RERANK_MODEL
+        self._model_class = CrossEncoder
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _score(self, query: str, hits: List[Dict[str, Any]]) -> List[float]:
+        with self._lock:
+            if self._model is None:
+                self._model = self._model_class(self.model_name, device="cpu")
+                logger.info(f"Loaded cross-encoder {self.model_name}")
+        scores = self._model.predict(
+            [(query, hit["content"] or "") for hit in hits],
+            batch_size=settings.RERANK_BATCH_SIZE,
+            show_progress_bar=False
+        )
+        return [float(score) for score in scores]
+
+    async def score(self, query: str, hits: List[Dict[str, Any]]) -> List[float]:
+        return await asyncio.to_thread(self._score, query, hits)
+
+
+class RemoteCrossEncoderReranker(Reranker):
+    """
+    Cross-encoder behind a `/rerank` API (Cohere/Jina request format, as served
+    by vLLM, Infinity and hosted rerank APIs). All candidates go in one request.
+    """
+
+    name = "cross_encoder"
+
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            headers = {"Authorization": f"Bearer {settings.RERANK_API_KEY}"} if settings.RERANK_API_KEY else {}
+            self.client = httpx.AsyncClient(
+                base_url=settings.RERANK_API_BASE,
+                headers=headers,
+                timeout=settings.RERANK_TIMEOUT_MS / 1000,
+            )
+        return self.client
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def score(self, query: str, hits: List[Dict[str, Any]]) -> List[float]:
+        response = await self._get_client().post(
+            "/rerank",
+            json={
+                "model": settings.RERANK_MODEL,
+                "query": query,
+                "documents": [hit["content"] or "" for hit in hits],
+                "top_n": len(hits),
+            },
+        )
+        response.raise_for_status()
+        body = response.json()
+
+        # Results may come back sorted by relevance; place them by index
+        scores = [float("-inf")] * len(hits)
+        for result in body["results"] if isinstance(body, dict) else body:
+            scores[result["index"]] = float(result.get("relevance_score", result.get("score")))
+        return scores
+
+
+class RerankingService:
+    """
+    Optional second stage of search: the top RERANK_CANDIDATES vector hits are
+    re-scored by the configured reranker (RERANKER: none, lexical or
+    cross_encoder) and cut to top_k. A reranker that fails or exceeds
+    RERANK_TIMEOUT_MS leaves the hits in vector order.
+    """
+
+    def __init__(self):
+        self.reranker: Optional[Reranker] = None
+        self._configured: Optional[str] = None
+
+    def _get_reranker(self) -> Optional[Reranker]:
+        if self._configured != settings.RERANKER:
+            self._configured = settings.RERANKER
+            self.reranker = None
+            if settings.RERANKER == "lexical":
+                self.reranker = LexicalReranker()
+            elif settings.RERANKER == "cross_encoder":
+                if settings.RERANK_API_BASE:
+                    self.reranker = RemoteCrossEncoderReranker()
+                else:
+                    try:
+                        self.reranker = LocalCrossEncoderReranker()
+                    except ImportError:
+                        logger.warning("sentence-transformers is not installed, falling back to lexical reranking")
+                        self.reranker = LexicalReranker()
+        return self.reranker
+
+    @property
+    def enabled(self) -> bool:
+        return self._get_reranker() is not None
+
+    def candidate_count(self, top_k: int) -> int:
+        # How many vector hits to fetch so the reranker has something to reorder
+        return max(top_k, settings.RERANK_CANDIDATES) if self.enabled else top_k
+
+    async def close(self):
+        if self.reranker:
+            await self.reranker.close()
+            self.reranker = None
+            self._configured = None
+
+    async def rerank(self, query: str, hits: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Hits (with content) reordered by reranker score and cut to top_k. The
+        reranker score replaces `score`; the original is kept as `vector_score`.
+        """
+        reranker = self._get_reranker()
+        if reranker is None or len(hits) < 2:
+            return hits[:top_k]
+
+        started = time.perf_counter()
+        try:
+            scores = await asyncio.wait_for(reranker.score(query, hits), settings.RERANK_TIMEOUT_MS / 1000)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Reranking exceeded {settings.RERANK_TIMEOUT_MS} ms, keeping vector order",
+                reranker=reranker.name,
+                candidates=len(hits)
+            )
+            return hits[:top_k]
+        except Exception as e:
+            logger.error(f"Reranking with {reranker.name} failed, keeping vector order: {e}")
+            return hits[:top_k]
+
+        order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")[:top_k]
+        logger.info(
+            "Reranked search hits",
+            reranker=reranker.name,
+            candidates=len(hits),
+            duration_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+        return [{**hits[i], "score": float(scores[i]), "vector_score": hits[i]["score"]} for i in order]
+
+
+# Global reranking service instance
+reranking_service = RerankingService()
@@ -0,0 +1,412 @@
+from typing import List, Dict, Any, Optional, Tuple
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import calendar
+import hashlib
+import heapq
+import json
+import numpy as np
+import structlog
+
+from app.core.config import settings
+from app.core.database import database_manager
+from app.core.milvus_client import milvus_manager, in_expr, and_expr
+from app.core.redis_client import redis_manager
+from app.core.deadline import bounded, remaining, reset_deadline, set_deadline
+from app.core.exceptions import (
+    CollectionNotFoundError,
+    DeadlineExceededError,
+    EmbeddingGenerationError,
+    ValidationError
+)
+from app.models.collection import Collection
+from app.repositories.collection import CollectionRepository
+from app.repositories.chunk import ChunkRepository
+from app.schemas.collection import VectorConfig, VectorType
+from app.schemas.search import SearchFilters
+from app.services.vector_storage import decode, encode_query, mmr_select, rerank, shortlist_size
+from app.services.embedding import embedding_service
+from app.services.reranking import reranking_service
+
+logger = structlog.get_logger(__name__)
+
+
+def _timestamp(value: datetime) -> int:
+    # Naive datetimes are UTC, like every timestamp stored by the pipeline
+    return calendar.timegm(value.utctimetuple())
+
+
+def score_scale(collection: Collection) -> Tuple[str, str, int]:
+    """
+    What a collection's search scores measure: (embedding model, metric,
+    dimensions). Reranked collections score by cosine against full-size
+    embeddings, others by their index metric on the stored dimensions.
+    """
+    config = VectorConfig.for_collection(collection)
+    if config.effective_rerank:
+        return collection.embedding_model, "cosine", settings.OPENAI_EMBEDDING_DIMENSIONS
+    metric = "hamming" if config.vector_type == VectorType.BINARY else "cosine"
+    return collection.embedding_model, metric, config.effective_dimensions
+
+
+def build_filter_expression(filters: Optional[SearchFilters]) -> Optional[str]:
+    """
+    Translate typed search filters into a Milvus boolean expression over the
+    indexed scalar fields. Values are rendered as JSON literals, never
+    interpolated raw.
+    """
+    if not filters:
+        return None
+
+    exprs: List[Optional[str]] = []
+    if filters.document_ids:
+        exprs.append(in_expr("document_id", filters.document_ids))
+    if filters.tags_any:
+        exprs.append(f"array_contains_any(tags, {json.dumps(filters.tags_any, ensure_ascii=False)})")
+    if filters.tags_all:
+        exprs.append(f"array_contains_all(tags, {json.dumps(filters.tags_all, ensure_ascii=False)})")
+    if filters.page_from is not None:
+        exprs.append(f"page >= {filters.page_from}")
+    if filters.page_to is not None:
+        exprs.append(f"page <= {filters.page_to}")
+    if filters.created_after is not None:
+        exprs.append(f"created_at >= {_timestamp(filters.created_after)}")
+    if filters.created_before is not None:
+        exprs.append(f"created_at < {_timestamp(filters.created_before)}")
+    for key, value in (filters.metadata or {}).items():
+        exprs.append(f"metadata[{json.dumps(key)}] == {json.dumps(value, ensure_ascii=False)}")
+
+    return and_expr(*exprs)
+
+
+def retrieval_cache_key(
+    collection: Collection,
+    query: str,
+    top_k: int,
+    filters: Optional[SearchFilters]
+) -> str:
+    # Keyed on the collection version: a write bumps it, so older entries are
+    # never read again and simply expire
+    request = json.dumps({
+        "query": query,
+        "top_k": top_k,
+        "filters": filters.dict(exclude_none=True) if filters else None,
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{collection.id}:{collection.version}:{hashlib.sha256(request.encode('utf-8')).hexdigest()}"
+
+
+@dataclass
+class FederatedSearchResult:
+    hits: List[Dict[str, Any]] = field(default_factory=list)
+    searched: List[str] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+
+class SearchService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.collection_repo = CollectionRepository(session)
+        self.chunk_repo = ChunkRepository(session)
+
+    async def hydrate(self, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fill in chunk text for hits from collections that keep it out of
+        Milvus. Hits whose chunk no longer exists in SQL are dropped.
+        """
+        missing = [hit["chunk_id"] for hit in hits if hit.get("content") is None]
+        if not missing:
+            return hits
+
+        contents = await self.chunk_repo.get_contents(missing)
+        hydrated = []
+        for hit in hits:
+            if hit.get("content") is None:
+                if hit["chunk_id"] not in contents:
+                    continue
+                hit = {**hit, "content": contents[hit["chunk_id"]]}
+            hydrated.append(hit)
+        return hydrated
+
+    async def embed_query(self, collection: Collection, query: str) -> List[float]:
+        return (await embedding_service.embed_texts([query], collection.embedding_model))[0]
+
+    async def diversify(
+        self,
+        collection: Collection,
+        hits: List[Dict[str, Any]],
+        top_k: int,
+        mmr_lambda: float
+    ) -> List[Dict[str, Any]]:
+        """
+        MMR selection of top_k out of the candidate hits, on their stored
+        embeddings. Relevance is the hit score scaled to [0, 1] over the
+        candidates, so reranker scores of any range work too.
+        """
+        if len(hits) <= 1:
+            return hits[:top_k]
+
+        config = VectorConfig.for_collection(collection)
+        vector_format = milvus_manager.vector_format(collection.milvus_collection_name) or config.vector_format
+        stored = await milvus_manager.get_vectors(collection.milvus_collection_name, [hit["chunk_id"] for hit in hits])
+        # Hits without a stored vector were deleted meanwhile
+        hits = [hit for hit in hits if hit["chunk_id"] in stored]
+        if not hits:
+            return []
+
+        vectors = np.stack([decode(stored[hit["chunk_id"]], vector_format) for hit in hits])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1)
+
+        scores = np.asarray([hit["score"] for hit in hits], dtype=np.float32)
+        spread = float(scores.max() - scores.min())
+        relevance = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+
+        return [hits[i] for i in mmr_select(relevance, vectors, top_k, mmr_lambda)]
+
+    async def retrieve(
+        self,
+        collection_id: str,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[SearchFilters] = None,
+        mmr_lambda: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked hits straight from Milvus, or through the rerank stage when one
+        is configured. Content is only set for collections that store it in
+        Milvus or when reranking; see hydrate().
+        """
+        collection = await self.collection_repo.get_by_id(collection_id)
+        if not collection:
+            raise CollectionNotFoundError(collection_id)
+
+        return await self.retrieve_ranked(collection, query, top_k, filters, mmr_lambda=mmr_lambda)
+
+    async def retrieve_ranked(
+        self,
+        collection: Collection,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[SearchFilters] = None,
+        query_vector: Optional[List[float]] = None,
+        mmr_lambda: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        top_k hits after the optional stages: reranking of an over-fetched
+        candidate set (hydrated first, as the reranker reads chunk text), then
+        MMR selection out of MMR_CANDIDATE_FACTOR * top_k candidates when
+        mmr_lambda is given.
+        """
+        pool = top_k * settings.MMR_CANDIDATE_FACTOR if mmr_lambda is not None else top_k
+
+        if reranking_service.enabled:
+            candidates = await self.retrieve_cached(
+                collection, query, reranking_service.candidate_count(pool), filters, query_vector
+            )
+            hits = await reranking_service.rerank(query, await self.hydrate(candidates), pool)
+        else:
+            hits = await self.retrieve_cached(collection, query, pool, filters, query_vector)
+
+        if mmr_lambda is not None:
+            hits = await self.diversify(collection, hits, top_k, mmr_lambda)
+        return hits
+
+    async def retrieve_cached(
+        self,
+        collection: Collection,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[SearchFilters] = None,
+        query_vector: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        retrieve_by_vector() behind the Redis result cache, so repeated
+        searches between writes skip both the embedding call and Milvus.
+        Hits are cached without their text; hydrate() fills it in from SQL.
+        """
+        use_cache = settings.RETRIEVAL_CACHE_ENABLED and redis_manager.is_available
+        if use_cache:
+            cache_key = retrieval_cache_key(collection, query, top_k, filters)
+            cached = await redis_manager.get_cached_search_results(cache_key)
+            if cached is not None:
+                logger.info(f"Served search of collection {collection.name} from cache", hits=len(cached))
+                return cached
+
+        if query_vector is None:
+            query_vector = await self.embed_query(collection, query)
+        hits = await self.retrieve_by_vector(collection, query_vector, top_k, filters)
+
+        if use_cache:
+            await redis_manager.cache_search_results(
+                cache_key,
+                [{key: value for key, value in hit.items() if key != "content"} for hit in hits],
+                expire=settings.RETRIEVAL_CACHE_TTL
+            )
+        return hits
+
+    async def retrieve_in_own_session(
+        self,
+        collection: Collection,
+        query: str,
+        top_k: int,
+        filters: Optional[SearchFilters],
+        query_vector: List[float]
+    ) -> List[Dict[str, Any]]:
+        # Own session, so concurrent searches (and their rerank lookups) never share one
+        hits: List[Dict[str, Any]] = []
+        async with aclosing(database_manager.get_session()) as sessions:
+            async for session in sessions:
+                hits = await SearchService(session).retrieve_cached(
+                    collection, query, top_k, filters, query_vector=query_vector
+                )
+        return hits
+
+    async def rerank_vectors(
+        self,
+        collection: Collection,
+        hits: List[Dict[str, Any]],
+        vector_format: tuple
+    ) -> Dict[str, Any]:
+        """
+        Full-precision embeddings of a rerank shortlist by chunk_id, resolved
+        like at ingest: embedding cache, a float32 collection holding the same
+        content, then the embedding API (cached for next time). If the API
+        fails, the decoded stored vectors are used instead; they still reorder
+        the shortlist but cannot recover what quantization dropped.
+        """
+        chunks = await self.chunk_repo.get_by_ids([hit["chunk_id"] for hit in hits])
+        try:
+            embedded = await embedding_service.embed_chunks(chunks, self.chunk_repo, collection.embedding_model)
+            return {chunk.id: embedded.embeddings[chunk.content_hash] for chunk in chunks}
+        except EmbeddingGenerationError as e:
+            logger.warning(f"Reranking collection {collection.name} with stored vectors: {e}")
+
+        stored = await milvus_manager.get_vectors(collection.milvus_collection_name, [chunk.id for chunk in chunks])
+        return {chunk_id: decode(value, vector_format) for chunk_id, value in stored.items()}
+
+    async def retrieve_by_vector(
+        self,
+        collection: Collection,
+        query_vector: List[float],
+        top_k: int = 10,
+        filters: Optional[SearchFilters] = None
+    ) -> List[Dict[str, Any]]:
+        expr = build_filter_expression(filters)
+
+        config = VectorConfig.for_collection(collection)
+        vector_format = milvus_manager.vector_format(collection.milvus_collection_name) or config.vector_format
+        limit = shortlist_size(top_k, config.rerank_factor) if config.effective_rerank else top_k
+
+        results = await milvus_manager.search_vectors(
+            collection.milvus_collection_name,
+            [encode_query(query_vector, vector_format)],
+            top_k=limit,
+            filters=expr
+        )
+        hits = results[0] if results else []
+
+        if config.effective_rerank and hits:
+            vectors = await self.rerank_vectors(collection, hits, vector_format)
+            hits = rerank(query_vector, hits, vectors, top_k)
+
+        logger.info(f"Searched collection {collection.name}", hits=len(hits), filters=expr)
+        return hits
+
+    async def search(
+        self,
+        collection_id: str,
+        query: str,
+        top_k: int = 10,
+        filters: Optional[SearchFilters] = None,
+        mmr_lambda: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        hits = await self.retrieve(collection_id, query, top_k, filters, mmr_lambda)
+        return await self.hydrate(hits)
+
+    async def federated_search(
+        self,
+        collection_ids: List[str],
+        query: str,
+        top_k: int = 10,
+        filters: Optional[SearchFilters] = None,
+        timeout_ms: Optional[int] = None
+    ) -> FederatedSearchResult:
+        """
+        One query over several collections. The per-collection Milvus searches
+        run concurrently, and those still running at the deadline are cancelled
+        and reported as timed out rather than failing the request. The ranked
+        lists are heap-merged into the global top_k, which is only meaningful
+        when every collection's scores measure the same thing (see
+        score_scale()); other combinations are rejected.
+        """
+        timeout = (timeout_ms or settings.FEDERATED_SEARCH_TIMEOUT_MS) / 1000
+
+        collections = {collection.id: collection for collection in await self.collection_repo.get_by_ids(collection_ids)}
+        for collection_id in collection_ids:
+            if collection_id not in collections:
+                raise CollectionNotFoundError(collection_id)
+
+        scales = {score_scale(collection) for collection in collections.values()}
+        if len(scales) > 1:
+            raise ValidationError(
+                "collection_ids",
+                "Collections with different embedding models or score metrics cannot be ranked together; "
+                "search them separately or enable rerank on their vector settings"
+            )
+        model = next(iter(scales))[0]
+
+        # The search deadline bounds the query embedding and the collection searches
+        left = remaining()
+        token = set_deadline(timeout if left is None else min(timeout, left))
+        tasks: Dict[str, asyncio.Task] = {}
+        try:
+            vectors = await bounded("query embedding", embedding_service.embed_texts([query], model))
+
+            limit = reranking_service.candidate_count(top_k)
+            tasks = {
+                collection_id: asyncio.create_task(self.retrieve_in_own_session(
+                    collections[collection_id], query, limit, filters, query_vector=vectors[0]
+                ))
+                for collection_id in collection_ids
+                if collections[collection_id].milvus_collection_name
+            }
+            if tasks:
+                await asyncio.wait(tasks.values(), timeout=max(0.0, remaining()))
+        finally:
+            reset_deadline(token)
+            # Also on client disconnect: nothing outlives the request
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        result = FederatedSearchResult()
+        ranked: List[List[Dict[str, Any]]] = []
+        for collection_id, task in tasks.items():
+            if not task.done() or isinstance(task.exception(), DeadlineExceededError):
+                result.timed_out.append(collection_id)
+            elif task.exception():
+                logger.error(f"Federated search failed in collection {collection_id}: {task.exception()}")
+                result.failed.append(collection_id)
+            else:
+                ranked.append(task.result())
+                result.searched.append(collection_id)
+
+        # Each list is best-first, so the heap only reads as far as the global top
+        hits = list(islice(heapq.merge(*ranked, key=lambda hit: -hit["score"]), limit))
+        if reranking_service.enabled:
+            hits = await reranking_service.rerank(query, await self.hydrate(hits), top_k)
+        result.hits = await self.hydrate(hits[:top_k])
+
+        logger.info(
+            "Federated search",
+            collections=len(collection_ids),
+            timed_out=len(result.timed_out),
+            failed=len(result.failed),
+            hits=len(result.hits)
+        )
+        return result
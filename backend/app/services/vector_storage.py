@@ -0,0 +1,130 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# Encoding of embeddings for the Milvus vector field types a collection can use.
+# Vectors are always produced at full precision and dimension (so the embedding
+# cache and cross-collection reuse stay valid) and reduced here on the way in.
+
+VectorFormat = Tuple[str, int]  # (vector type, dimensions)
+
+BITS_PER_DIMENSION = {"float32": 32, "float16": 16, "bfloat16": 16, "binary": 1}
+
+
+def bytes_per_vector(vector_type: str, dimensions: int, index_type: str = "IVF_FLAT") -> float:
+    # IVF_SQ8 keeps one byte per dimension in query node memory whatever the stored type
+    if index_type == "IVF_SQ8" and vector_type != "binary":
+        return float(dimensions)
+    return BITS_PER_DIMENSION[vector_type] * dimensions / 8
+
+
+def prepare(vector: List[float], dimensions: int) -> np.ndarray:
+    """
+    Matryoshka truncation: text-embedding-3 vectors keep their meaning in the
+    leading dimensions, so the first `dimensions` values re-normalized to unit
+    length equal what the API returns for that `dimensions` argument.
+    """
+    values = np.asarray(vector, dtype=np.float32)[:dimensions]
+    norm = float(np.linalg.norm(values))
+    return values / norm if norm else values
+
+
+def _to_bfloat16_bits(values: np.ndarray) -> np.ndarray:
+    # Round to nearest even on the upper 16 bits of each float32
+    bits = values.astype(np.float32).view(np.uint32)
+    return ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(np.uint16)
+
+
+def encode(vector: List[float], vector_format: VectorFormat) -> Any:
+    # Representation accepted by Milvus inserts for the field type
+    vector_type, dimensions = vector_format
+    values = prepare(vector, dimensions)
+    if vector_type == "float16":
+        return values.astype(np.float16).tobytes()
+    if vector_type == "bfloat16":
+        return _to_bfloat16_bits(values).tobytes()
+    if vector_type == "binary":
+        return np.packbits(values > 0).tobytes()
+    return values.tolist()
+
+
+def encode_query(vector: List[float], vector_format: VectorFormat) -> Any:
+    # Search placeholders are typed by numpy dtype rather than raw bytes
+    vector_type, dimensions = vector_format
+    values = prepare(vector, dimensions)
+    if vector_type == "float16":
+        return values.astype(np.float16)
+    if vector_type == "bfloat16":
+        import ml_dtypes  # only needed to search bfloat16 collections
+        return values.astype(ml_dtypes.bfloat16)
+    if vector_type == "binary":
+        return np.packbits(values > 0).tobytes()
+    return values.tolist()
+
+
+def decode(value: Any, vector_format: VectorFormat) -> np.ndarray:
+    # Stored vector back to float32; binary dimensions become -1/+1
+    vector_type, dimensions = vector_format
+    if isinstance(value, list) and value and isinstance(value[0], (bytes, bytearray)):
+        value = b"".join(value)
+    if vector_type == "float16":
+        return np.frombuffer(bytes(value), dtype=np.float16).astype(np.float32)
+    if vector_type == "bfloat16":
+        bits = np.frombuffer(bytes(value), dtype=np.uint16).astype(np.uint32) << 16
+        return bits.view(np.float32)
+    if vector_type == "binary":
+        unpacked = np.unpackbits(np.frombuffer(bytes(value), dtype=np.uint8))[:dimensions]
+        return unpacked.astype(np.float32) * 2 - 1
+    return np.asarray(value, dtype=np.float32)
+
+
+def rerank(
+    query_vector: List[float],
+    hits: List[Dict[str, Any]],
+    vectors: Dict[str, Any],
+    top_k: int
+) -> List[Dict[str, Any]]:
+    """
+    Re-score a shortlist by cosine similarity between the query and each
+    hit's vector in `vectors` (full-precision chunk embeddings, or decoded
+    stored vectors as a fallback), replacing the approximate
+    (quantized/Hamming) scores. The query is truncated to each vector's
+    dimension. Hits without a vector were deleted meanwhile and drop out.
+    """
+    scored = []
+    for hit in hits:
+        value = vectors.get(hit["chunk_id"])
+        if value is None:
+            continue
+        vector = np.asarray(value, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        score = float(prepare(query_vector, len(vector)) @ vector) / norm if norm else 0.0
+        scored.append({**hit, "score": score})
+
+    scored.sort(key=lambda hit: hit["score"], reverse=True)
+    return scored[:top_k]
+
+
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """
+    Maximal marginal relevance: repeatedly pick the candidate maximizing
+    lambda * relevance - (1 - lambda) * (max similarity to those already
+    picked). Each candidate's max similarity is updated with one
+    matrix-vector product per pick, so selection is O(k * n * d).
+    Rows of `vectors` must be unit length; returns indices in pick order.
+    """
+    k = min(k, len(relevance))
+    max_similarity = np.zeros(len(relevance), dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    selected: List[int] = []
+    for _ in range(k):
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * max_similarity, -np.inf)
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(max_similarity, np.clip(vectors @ vectors[pick], 0, 1), out=max_similarity)
+    return selected
+
+
+def shortlist_size(top_k: int, rerank_factor: Optional[int]) -> int:
+    # Milvus caps topk at 16384
+    return min(16384, top_k * (rerank_factor or 1))
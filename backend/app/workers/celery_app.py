@@ -0,0 +1,27 @@
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "rag_pipeline",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.workers.tasks"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    # A batch is only acknowledged once processed, and each worker process
+    # holds one task at a time so adding workers spreads the queue evenly
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    beat_schedule={
+        "sweep-chunk-queue": {
+            "task": "app.workers.tasks.process_chunk_queue",
+            "schedule": settings.EMBEDDING_WORKER_SWEEP_INTERVAL,
+        }
+    },
+)
@@ -0,0 +1,110 @@
+from typing import List, Optional
+import asyncio
+import os
+import socket
+import structlog
+
+from app.core.config import settings
+from app.core.database import database_manager
+
+logger = structlog.get_logger(__name__)
+
+WORKER_MODES = ("inline", "asyncio", "celery", "auto")
+
+
+class WorkerManager:
+    """
+    Runs the embedding/Milvus sync queue for the API process.
+
+    inline:  ingestion embeds chunks inside the request (no queue)
+    asyncio: EMBEDDING_WORKER_CONCURRENCY tasks in this process drain the queue
+    celery:  ingestion notifies Celery workers; add workers to scale out
+    auto:    celery when a Celery worker answers a ping, asyncio otherwise
+    """
+
+    def __init__(self):
+        self.mode = "inline"
+        self.tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "inline"
+
+    async def start(self):
+        mode = settings.EMBEDDING_WORKER_MODE
+        if mode not in WORKER_MODES:
+            raise ValueError(f"EMBEDDING_WORKER_MODE must be one of {WORKER_MODES}, got '{mode}'")
+        if mode == "auto":
+            mode = "celery" if await self._celery_workers_available() else "asyncio"
+        self.mode = mode
+
+        if mode == "asyncio":
+            self._wakeup = asyncio.Event()
+            self.tasks = [
+                asyncio.create_task(self._run(worker_id), name=f"embedding-worker-{worker_id}")
+                for worker_id in range(settings.EMBEDDING_WORKER_CONCURRENCY)
+            ]
+
+        logger.info(f"Embedding workers started in {mode} mode", workers=len(self.tasks))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.mode = "inline"
+
+    async def notify(self):
+        # Wake the workers after new chunks were queued; pollers and the celery
+        # beat sweep pick up anything a lost notification leaves behind
+        if self.mode == "asyncio" and self._wakeup:
+            self._wakeup.set()
+        elif self.mode == "celery":
+            from app.workers.tasks import process_chunk_queue
+            try:
+                await asyncio.to_thread(process_chunk_queue.delay)
+            except Exception as e:
+                logger.warning(f"Failed to enqueue chunk processing task: {e}")
+
+    async def _celery_workers_available(self) -> bool:
+        try:
+            from app.workers.celery_app import celery_app
+            replies = await asyncio.wait_for(
+                asyncio.to_thread(celery_app.control.ping, timeout=1.0),
+                timeout=3.0
+            )
+            return bool(replies)
+        except Exception as e:
+            logger.info(f"No Celery workers reachable, using in-process workers: {e}")
+            return False
+
+    async def _run(self, worker_id: int):
+        # Imported here because ingestion notifies this manager
+        from app.services.ingestion import IngestionService
+
+        owner = f"{socket.gethostname()}:{os.getpid()}:asyncio-{worker_id}"
+        while True:
+            self._wakeup.clear()
+            processed = 0
+            try:
+                async for session in database_manager.get_session():
+                    processed = await IngestionService(session).process_queued_chunks(
+                        owner, settings.EMBEDDING_WORKER_BATCH_SIZE
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Embedding worker {worker_id} failed: {e}")
+
+            if processed:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.EMBEDDING_WORKER_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global worker manager instance
+worker_manager = WorkerManager()
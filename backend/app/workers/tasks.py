@@ -0,0 +1,52 @@
+from typing import Optional
+import asyncio
+import os
+import socket
+import structlog
+
+from app.core.config import settings
+from app.core.database import database_manager
+from app.core.redis_client import redis_manager
+from app.core.milvus_client import milvus_manager
+from app.services.embedding import embedding_service
+from app.services.ingestion import IngestionService
+from app.workers.celery_app import celery_app
+
+logger = structlog.get_logger(__name__)
+
+
+async def drain_chunk_queue(owner: str, max_batches: Optional[int] = None) -> int:
+    # Each Celery task runs its own event loop, so connections are opened and
+    # closed inside it rather than shared across tasks
+    await database_manager.initialize()
+    await milvus_manager.initialize()
+    try:
+        await redis_manager.initialize()
+    except Exception as e:
+        logger.warning(f"Redis unavailable, embedding cache disabled for this task: {e}")
+
+    processed = 0
+    batches = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            async for session in database_manager.get_session():
+                count = await IngestionService(session).process_queued_chunks(owner, settings.EMBEDDING_WORKER_BATCH_SIZE)
+            if not count:
+                break
+            processed += count
+            batches += 1
+    finally:
+        await embedding_service.close()
+        await redis_manager.close()
+        await database_manager.close()
+
+    return processed
+
+
+@celery_app.task(name="app.workers.tasks.process_chunk_queue", bind=True)
+def process_chunk_queue(self, max_batches: Optional[int] = None) -> int:
+    owner = f"{socket.gethostname()}:{os.getpid()}:celery-{self.request.id}"
+    processed = asyncio.run(drain_chunk_queue(owner, max_batches))
+    if processed:
+        logger.info(f"Processed {processed} queued chunks")
+    return processed
@@ -0,0 +1,11 @@
+import os
+import sys
+from pathlib import Path
+
+# Benchmarks import app modules directly; provide the same development defaults as run.py
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-placeholder-key")
@@ -0,0 +1,407 @@
+"""
+In-process stand-ins for Milvus, Redis and the embedding and LLM providers.
+
+install() patches the global milvus_manager, redis_manager,
+embedding_service and generation_service so the app runs hermetically:
+everything above the connection boundary (repositories, services, endpoints,
+RedisManager's serialization, the providers' request/stream handling) is the
+real code. Each stand-in can add a fixed latency to model the network round
+trip it replaces.
+
+The Milvus stand-in searches by exact cosine similarity in numpy and honours
+document_ids, but ignores other filter expressions.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import time
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=65536)
+def _token_vector(token: str, dimensions: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+    return np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+
+
+def hashed_embedding(text: str, dimensions: int) -> List[float]:
+    # Bag-of-words random projection: texts sharing words get similar vectors
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        vector += _token_vector(token, dimensions)
+    norm = float(np.linalg.norm(vector))
+    return (vector / norm if norm else vector).tolist()
+
+
+def embedding_transport(dimensions: int, latency: float = 0.0) -> httpx.MockTransport:
+    """OpenAI-compatible POST /embeddings answered in process."""
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        body = json.loads(request.content)
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        size = body.get("dimensions") or dimensions
+        return httpx.Response(200, json={
+            "object": "list",
+            "model": body.get("model"),
+            "data": [
+                {"object": "embedding", "index": index, "embedding": hashed_embedding(text, size)}
+                for index, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        })
+
+    return httpx.MockTransport(handle)
+
+
+def generation_transport(first_token_latency: float = 0.0, token_interval: float = 0.0, tokens: int = 64) -> httpx.MockTransport:
+    """OpenAI-compatible streamed POST /chat/completions answered in process."""
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        count = min(tokens, body.get("max_tokens") or tokens)
+
+        async def events():
+            if first_token_latency:
+                await asyncio.sleep(first_token_latency)
+            for index in range(count):
+                if index and token_interval:
+                    await asyncio.sleep(token_interval)
+                delta = {"content": f"token{index} " if index else "Answer [1] "}
+                yield f"data: {json.dumps({'choices': [{'index': 0, 'delta': delta}]})}\n\n".encode()
+            yield b"data: [DONE]\n\n"
+
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events())
+
+    return httpx.MockTransport(handle)
+
+
+class InMemoryPubSub:
+    """redis.asyncio.client.PubSub for channel subscriptions on an InMemoryRedisClient."""
+
+    def __init__(self, client: "InMemoryRedisClient"):
+        self.client = client
+        self.channels: List[str] = []
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self.channels.append(channel)
+            self.client.subscribers.setdefault(channel, []).append(self.messages)
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def close(self):
+        for channel in self.channels:
+            self.client.subscribers[channel].remove(self.messages)
+        self.channels = []
+
+
+class InMemoryRedisClient:
+    """The subset of redis.asyncio.Redis that RedisManager uses, with decode_responses semantics."""
+
+    def __init__(self):
+        self.values: Dict[str, str] = {}
+        self.expiry: Dict[str, float] = {}
+        self.subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def _live(self, key: str) -> bool:
+        if key in self.expiry and self.expiry[key] <= time.monotonic():
+            self.values.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.values
+
+    async def ping(self) -> bool:
+        return True
+
+    async def set(self, key: str, value: Any, nx: bool = False, ex: Optional[int] = None) -> Optional[bool]:
+        if nx and self._live(key):
+            return None
+        self.values[key] = str(value)
+        self.expiry.pop(key, None)
+        if ex:
+            self.expiry[key] = time.monotonic() + ex
+        return True
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not self._live(key):
+            return False
+        self.expiry[key] = time.monotonic() + seconds
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        return self.values[key] if self._live(key) else None
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return [await self.get(key) for key in keys]
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self.values.pop(key, None) is not None for key in keys if self._live(key))
+
+    async def exists(self, *keys: str) -> int:
+        return sum(self._live(key) for key in keys)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        value = int(await self.get(key) or 0) + amount
+        self.values[key] = str(value)
+        return value
+
+    async def publish(self, channel: str, message: str) -> int:
+        queues = self.subscribers.get(channel, [])
+        for queue in queues:
+            queue.put_nowait({"type": "message", "channel": channel, "data": str(message)})
+        return len(queues)
+
+    def pubsub(self) -> InMemoryPubSub:
+        return InMemoryPubSub(self)
+
+    async def close(self):
+        pass
+
+
+class InMemoryMilvus:
+    """Replacement for the MilvusManager methods the app calls, keyed by alias like the real one."""
+
+    def __init__(self, dimensions: int, latency: float = 0.0):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.aliases: Dict[str, str] = {}
+        self.collections: Dict[str, Dict[str, Any]] = {}
+
+    async def _round_trip(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _collection(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.collections.get(self.aliases.get(name, name))
+
+    async def initialize(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def health_check(self) -> bool:
+        return True
+
+    async def create_physical_collection(
+        self,
+        collection_name: str,
+        vector_type: str = "float32",
+        dim: Optional[int] = None,
+        index_type: str = "IVF_FLAT",
+        index_params: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        await self._round_trip()
+        self.collections.setdefault(collection_name, {
+            "format": (vector_type, dim or self.dimensions),
+            "rows": {},
+            "matrix": None,
+        })
+        return True
+
+    async def create_collection(self, collection_name: str, **vector_options) -> bool:
+        if self._collection(collection_name):
+            return True
+        from app.core.milvus_client import MilvusManager
+
+        physical = MilvusManager.physical_collection_name(collection_name)
+        await self.create_physical_collection(physical, **vector_options)
+        self.aliases[collection_name] = physical
+        return True
+
+    async def resolve_alias(self, alias: str) -> Optional[str]:
+        return self.aliases.get(alias)
+
+    async def swap_alias(self, alias: str, collection_name: str) -> Optional[str]:
+        previous = self.aliases.get(alias)
+        if previous is None and alias in self.collections:
+            # Legacy collection named like the alias is renamed aside
+            previous = f"{alias}__legacy"
+            self.collections[previous] = self.collections.pop(alias)
+        self.aliases[alias] = collection_name
+        return previous
+
+    async def delete_collection(self, collection_name: str) -> bool:
+        physical = self.aliases.pop(collection_name, collection_name)
+        self.collections.pop(physical, None)
+        return True
+
+    async def load_collection(self, collection_name: str) -> bool:
+        return self._collection(collection_name) is not None
+
+    def vector_format(self, collection_name: str) -> Optional[tuple[str, int]]:
+        collection = self._collection(collection_name)
+        return collection["format"] if collection else None
+
+    async def insert_vectors(self, collection_name: str, data: List[Dict[str, Any]], flush: bool = True) -> bool:
+        from app.core.config import settings
+
+        await self._round_trip()
+        collection = self._collection(collection_name)
+        if collection is None:
+            return False
+        for row in data:
+            if not settings.MILVUS_STORE_CONTENT:
+                row = {key: value for key, value in row.items() if key != "content"}
+            collection["rows"][row["chunk_id"]] = row
+        collection["matrix"] = None
+        return True
+
+    def _matrix(self, collection: Dict[str, Any]):
+        from app.services.vector_storage import decode
+
+        if collection["matrix"] is None:
+            rows = list(collection["rows"].values())
+            vectors = np.stack([decode(row["embedding"], collection["format"]) for row in rows]) if rows else None
+            if vectors is not None:
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                vectors = vectors / np.where(norms > 0, norms, 1)
+            collection["matrix"] = (rows, vectors)
+        return collection["matrix"]
+
+    async def search_vectors(
+        self,
+        collection_name: str,
+        query_vectors: List[Any],
+        top_k: int = 10,
+        filters: Optional[str] = None,
+        document_ids: Optional[List[str]] = None,
+        search_params: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        from app.services.vector_storage import decode
+
+        await self._round_trip()
+        collection = self._collection(collection_name)
+        if collection is None:
+            return []
+
+        rows, matrix = self._matrix(collection)
+        results = []
+        for query in query_vectors:
+            if matrix is None:
+                results.append([])
+                continue
+            if not isinstance(query, (bytes, bytearray)):
+                query = np.asarray(query, dtype=np.float32)
+            scores = matrix @ decode(query, collection["format"])
+            if document_ids:
+                scores = np.where([row["document_id"] in document_ids for row in rows], scores, -np.inf)
+            best = np.argsort(-scores)[:top_k]
+            results.append([
+                {
+                    "chunk_id": rows[i]["chunk_id"],
+                    "document_id": rows[i]["document_id"],
+                    "collection_id": rows[i]["collection_id"],
+                    "content": rows[i].get("content"),
+                    "metadata": rows[i].get("metadata"),
+                    "score": float(scores[i]),
+                }
+                for i in best if np.isfinite(scores[i])
+            ])
+        return results
+
+    async def get_vectors(self, collection_name: str, chunk_ids: List[str]) -> Dict[str, Any]:
+        await self._round_trip()
+        collection = self._collection(collection_name)
+        if collection is None:
+            return {}
+        rows = collection["rows"]
+        return {chunk_id: rows[chunk_id]["embedding"] for chunk_id in chunk_ids if chunk_id in rows}
+
+    async def iterate_chunk_ids(self, collection_name: str, batch_size: int = 1000) -> AsyncGenerator[List[str], None]:
+        collection = self._collection(collection_name)
+        if collection is None:
+            raise ValueError(f"Collection {collection_name} not found")
+        chunk_ids = sorted(collection["rows"])
+        for start in range(0, len(chunk_ids), batch_size):
+            yield chunk_ids[start:start + batch_size]
+
+    async def delete_vectors(self, collection_name: str, chunk_ids: List[str], document_id: Optional[str] = None) -> bool:
+        await self._round_trip()
+        collection = self._collection(collection_name)
+        if collection is None:
+            return False
+        for chunk_id in chunk_ids:
+            collection["rows"].pop(chunk_id, None)
+        collection["matrix"] = None
+        return True
+
+    async def delete_document_vectors(self, collection_name: str, document_ids: List[str]) -> bool:
+        collection = self._collection(collection_name)
+        if collection is None:
+            return False
+        stale = [chunk_id for chunk_id, row in collection["rows"].items() if row["document_id"] in document_ids]
+        return await self.delete_vectors(collection_name, stale)
+
+    async def get_collection_stats(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        collection = self._collection(collection_name)
+        if collection is None:
+            return None
+        return {"name": collection_name, "num_entities": len(collection["rows"]), "segments": 1}
+
+
+MILVUS_METHODS = [
+    name for name, value in vars(InMemoryMilvus).items()
+    if callable(value) and not name.startswith("_")
+]
+
+
+def install(
+    milvus_latency: float = 0.0,
+    redis_latency: float = 0.0,
+    embedding_latency: float = 0.0,
+    llm_first_token_latency: float = 0.0,
+    llm_token_interval: float = 0.0
+) -> InMemoryMilvus:
+    """
+    Point the app's global clients at the stand-ins. Call after the app
+    settings are configured and before the app starts up.
+    """
+    from app.core.config import settings
+    from app.core.milvus_client import milvus_manager
+    from app.core.redis_client import redis_manager
+    from app.services.embedding import embedding_service
+    from app.services.generation import generation_service
+
+    milvus = InMemoryMilvus(settings.OPENAI_EMBEDDING_DIMENSIONS, milvus_latency)
+    for name in MILVUS_METHODS:
+        setattr(milvus_manager, name, getattr(milvus, name))
+
+    client = InMemoryRedisClient()
+    if redis_latency:
+        for name in ("set", "expire", "get", "mget", "delete", "exists", "incr"):
+            setattr(client, name, _delayed(getattr(client, name), redis_latency))
+
+    async def initialize():
+        redis_manager.client = client
+        redis_manager._initialized = True
+
+    redis_manager.initialize = initialize
+
+    embedding_service.client = httpx.AsyncClient(
+        base_url=settings.OPENAI_API_BASE,
+        transport=embedding_transport(settings.OPENAI_EMBEDDING_DIMENSIONS, embedding_latency),
+    )
+    generation_service.client = httpx.AsyncClient(
+        base_url=settings.LLM_API_BASE or settings.OPENAI_API_BASE,
+        transport=generation_transport(llm_first_token_latency, llm_token_interval),
+    )
+    return milvus
+
+
+def _delayed(method, latency: float):
+    async def call(*args, **kwargs):
+        await asyncio.sleep(latency)
+        return await method(*args, **kwargs)
+    return call
@@ -0,0 +1,47 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Corpus and exact ground truth shared by the vector benchmarks
+
+
+def synthetic_vectors(count: int, dimensions: int, clusters: int, seed: int) -> np.ndarray:
+    # Clustered data whose variance decays along the dimensions
+    rng = np.random.default_rng(seed)
+    scale = 1 / np.sqrt(1 + np.arange(dimensions) / 64)
+    centers = rng.normal(size=(clusters, dimensions)) * scale
+    assignment = rng.integers(0, clusters, size=count)
+    vectors = centers[assignment] + 0.6 * rng.normal(size=(count, dimensions)) * scale
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def load_corpus(
+    path: Optional[str],
+    count: int,
+    dimensions: int,
+    clusters: int,
+    queries: int,
+    seed: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # (queries, documents), unit length; queries are held out of the documents
+    if path:
+        vectors = np.load(path).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    else:
+        vectors = synthetic_vectors(count + queries, dimensions, clusters, seed)
+
+    rng = np.random.default_rng(seed)
+    rng.shuffle(vectors)
+    return vectors[:queries], vectors[queries:]
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # Indices of the k highest scores per row, best first
+    k = min(k, scores.shape[1])
+    partition = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, partition, axis=1), axis=1)
+    return np.take_along_axis(partition, order, axis=1)
+
+
+def recall(results, truth: np.ndarray, k: int) -> float:
+    return float(np.mean([len(set(row) & set(expected)) / k for row, expected in zip(results, truth)]))
@@ -0,0 +1,101 @@
+"""
+Chunker throughput microbenchmark.
+
+    python -m benchmarks.chunker_benchmark --size-mb 50
+    python -m benchmarks.chunker_benchmark --corpus ./docs.txt --chunk-size 800
+
+Reports MB/s for boundary detection alone (split) and for the full row
+pipeline (split + content hash + token count + links), as JSON.
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks import _env  # noqa: F401
+from app.services.chunking import TextChunker, build_chunk_rows, get_tokenizer
+
+VOCABULARY = (
+    "retrieval augmented generation vector index embedding collection document chunk "
+    "query latency throughput recall milvus redis sqlite pipeline context answer model"
+).split()
+
+
+def generate_corpus(size_bytes: int, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    paragraphs = []
+    total = 0
+    while total < size_bytes:
+        sentences = []
+        for _ in range(rng.randint(2, 8)):
+            words = rng.choices(VOCABULARY, k=rng.randint(6, 24))
+            sentences.append(" ".join(words).capitalize() + rng.choice([".", ".", "?", "!"]))
+        paragraph = " ".join(sentences)
+        if rng.random() < 0.3:
+            paragraph = paragraph.replace(". ", ".\n", 1)
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def best_of(repeat: int, fn):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Path to a UTF-8 text corpus (default: synthetic)")
+    parser.add_argument("--size-mb", type=float, default=50.0, help="Synthetic corpus size in MB")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--tokenizer", default=None, help="approximate or tiktoken (default: CHUNK_TOKENIZER)")
+    parser.add_argument("--page-chars", type=int, default=4000, help="Feed size when simulating page streaming")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    else:
+        text = generate_corpus(int(args.size_mb * 1024 * 1024))
+
+    megabytes = len(text.encode("utf-8")) / (1024 * 1024)
+    tokenizer = get_tokenizer(args.tokenizer)
+
+    def split():
+        return list(TextChunker(args.chunk_size, args.chunk_overlap).split(text))
+
+    def split_streaming():
+        chunker = TextChunker(args.chunk_size, args.chunk_overlap)
+        spans = []
+        for start in range(0, len(text), args.page_chars):
+            spans.extend(chunker.feed(text[start:start + args.page_chars]))
+        spans.extend(chunker.flush())
+        return spans
+
+    split_seconds, spans = best_of(args.repeat, split)
+    stream_seconds, _ = best_of(args.repeat, split_streaming)
+    rows_seconds, rows = best_of(args.repeat, lambda: build_chunk_rows(split(), "document", "collection", tokenizer))
+
+    print(json.dumps({
+        "corpus_mb": round(megabytes, 2),
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+        "tokenizer": tokenizer.name,
+        "chunks": len(spans),
+        "split_mb_per_s": round(megabytes / split_seconds, 2),
+        "split_streaming_mb_per_s": round(megabytes / stream_seconds, 2),
+        "rows_mb_per_s": round(megabytes / rows_seconds, 2),
+        "avg_chunk_chars": round(sum(len(s.content) for s in spans) / max(1, len(spans)), 1),
+        "avg_tokens_per_chunk": round(sum(r["token_count"] for r in rows) / max(1, len(rows)), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+HTTP load test of the API under a mixed workload.
+
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --duration 60 --concurrency 64 --mix search=10,list=2,stats=2,ingest=1
+    python -m benchmarks.load_test --rate 200 --milvus-latency-ms 5 --embedding-latency-ms 80
+    python -m benchmarks.load_test --target uvicorn --port 8123
+    python -m benchmarks.load_test --url http://localhost:8000
+
+Targets:
+  asgi     app.main:app driven in process through httpx's ASGI transport
+           (default; measures the app without socket overhead)
+  uvicorn  the same app served by uvicorn on localhost, driven over TCP
+  --url    an already running server; no stand-ins are installed, so it uses
+           that server's real Milvus, Redis and embedding provider
+
+In-process targets run against a temporary SQLite database and upload dir,
+with Milvus, Redis and the embedding and LLM APIs replaced by the in-memory
+stand-ins of benchmarks._standins. The --*-latency-ms options add a fixed
+delay to each stand-in call to model their network round trips; the LLM
+stand-in streams at --llm-tokens-per-second after --llm-ttft-ms.
+
+Setup creates --collections collections with --seed-documents documents each
+and waits for them to be indexed; the measured phase then issues requests
+picked by --mix weights:
+  list    GET  /collections
+  stats   GET  /collections/{id}/stats
+  search  POST /rag/search
+  ingest  POST /documents (a new document, chunked and embedded)
+  answer  POST /rag/answer (read to the end of the event stream)
+
+Without --rate the test is closed-loop: --concurrency clients send requests
+back to back. With --rate requests arrive as a Poisson process at that mean
+rate, at most --concurrency in flight; latency is then measured from the
+scheduled arrival, so queueing behind a saturated server is included rather
+than hidden. Per-route throughput and p50/p95/p99/max latency are printed as
+JSON. Collections created by the test are deleted afterwards.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from benchmarks import _env  # noqa: F401
+
+ROUTES = {
+    "list": ("GET", "/collections/"),
+    "stats": ("GET", "/collections/{collection_id}/stats"),
+    "search": ("POST", "/rag/search"),
+    "ingest": ("POST", "/documents/"),
+    "answer": ("POST", "/rag/answer"),
+}
+
+DEFAULT_MIX = "search=10,list=2,stats=2,ingest=1"
+
+# Vocabulary of the synthetic documents and queries; Zipf-weighted so topics overlap
+VOCABULARY = [
+    f"{stem}{suffix}"
+    for stem in ("vector", "index", "cluster", "query", "shard", "segment", "cache", "token", "model", "latency",
+                 "recall", "batch", "stream", "replica", "schema", "policy", "budget", "report", "invoice", "contract")
+    for suffix in ("", "s", "ing", "ed", "er")
+]
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, prefix: str, seed: int):
+        self.client = client
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        weights = 1 / np.arange(1, len(VOCABULARY) + 1)
+        self.word_weights = (weights / weights.sum()).tolist()
+        self.collection_ids: List[str] = []
+        self.documents = 0
+
+    def words(self, count: int) -> str:
+        return " ".join(self.rng.choices(VOCABULARY, weights=self.word_weights, k=count))
+
+    def document(self, size: int) -> bytes:
+        # A unique sentence number keeps every upload distinct from the last
+        self.documents += 1
+        sentences = [f"Document {self.documents} {self.rng.getrandbits(64):x}."]
+        while sum(len(sentence) for sentence in sentences) < size:
+            sentences.append(self.words(self.rng.randint(8, 20)).capitalize() + ".")
+        return " ".join(sentences).encode("utf-8")
+
+    async def request(self, route: str, document_size: int, top_k: int) -> httpx.Response:
+        collection_id = self.rng.choice(self.collection_ids)
+        if route == "list":
+            return await self.client.get(f"{self.prefix}/collections/", params={"limit": 20})
+        if route == "stats":
+            return await self.client.get(f"{self.prefix}/collections/{collection_id}/stats")
+        if route in ("search", "answer"):
+            return await self.client.post(f"{self.prefix}/rag/{route}", json={
+                "collection_id": collection_id,
+                "query": self.words(self.rng.randint(2, 6)),
+                "top_k": top_k,
+            })
+        return await self.upload(collection_id, document_size)
+
+    async def upload(self, collection_id: str, document_size: int) -> httpx.Response:
+        return await self.client.post(
+            f"{self.prefix}/documents/",
+            data={"collection_id": collection_id},
+            files={"file": (f"load-{self.documents + 1}.txt", self.document(document_size), "text/plain")},
+        )
+
+    async def setup(self, collections: int, documents: int, document_size: int, timeout: float):
+        run_id = f"{self.rng.getrandbits(32):08x}"
+        for number in range(collections):
+            response = await self.client.post(f"{self.prefix}/collections/", json={
+                "name": f"loadtest-{run_id}-{number}",
+                "description": "Created by benchmarks.load_test",
+            })
+            response.raise_for_status()
+            self.collection_ids.append(response.json()["id"])
+
+        for collection_id in self.collection_ids:
+            for _ in range(documents):
+                (await self.upload(collection_id, document_size)).raise_for_status()
+
+        # Queued chunks are embedded in the background; search needs them indexed
+        deadline = time.monotonic() + timeout
+        for collection_id in self.collection_ids:
+            while True:
+                response = await self.client.get(
+                    f"{self.prefix}/documents/",
+                    params={"collection_id": collection_id, "status": "processing", "limit": 1},
+                )
+                response.raise_for_status()
+                if not response.json()["total"]:
+                    break
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Seed documents of {collection_id} not indexed after {timeout}s")
+                await asyncio.sleep(0.2)
+
+    async def teardown(self):
+        for collection_id in self.collection_ids:
+            try:
+                await self.client.delete(f"{self.prefix}/collections/{collection_id}")
+            except httpx.HTTPError:
+                pass
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, latency: float, status_code: Optional[int]):
+        self.latencies[route].append(latency)
+        self.statuses[route][str(status_code or "error")] += 1
+        if status_code is None or status_code >= 400:
+            self.errors[route] += 1
+
+    def summary(self, route: str, elapsed: float) -> Dict[str, Any]:
+        latencies = np.array(self.latencies[route]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors[route],
+            "status_codes": dict(self.statuses[route]),
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "mean_ms": round(float(latencies.mean()), 2) if len(latencies) else None,
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(latencies.max()), 2) if len(latencies) else None,
+        }
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        route, _, weight = part.partition("=")
+        route = route.strip()
+        if route not in ROUTES:
+            raise argparse.ArgumentTypeError(f"Unknown route '{route}', expected one of {sorted(ROUTES)}")
+        weights[route] = float(weight or 1)
+    return weights
+
+
+async def drive(workload: Workload, recorder: Recorder, args) -> float:
+    routes, weights = zip(*args.mix.items())
+    deadline = time.monotonic() + args.duration
+    issued = 0
+
+    def next_route() -> Optional[str]:
+        nonlocal issued
+        if time.monotonic() >= deadline or (args.requests and issued >= args.requests):
+            return None
+        issued += 1
+        return workload.rng.choices(routes, weights=weights)[0]
+
+    async def send(route: str, scheduled: float):
+        status_code = None
+        try:
+            response = await workload.request(route, args.document_size, args.top_k)
+            status_code = response.status_code
+        except Exception:
+            pass
+        recorder.record(route, time.perf_counter() - scheduled, status_code)
+
+    start = time.perf_counter()
+    if args.rate:
+        slots = asyncio.Semaphore(args.concurrency)
+        tasks = set()
+        scheduled = time.perf_counter()
+
+        async def arrive(route: str, at: float):
+            async with slots:
+                await send(route, at)
+
+        while (route := next_route()) is not None:
+            scheduled += workload.rng.expovariate(args.rate)
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            task = asyncio.create_task(arrive(route, scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    else:
+        async def client_loop():
+            while (route := next_route()) is not None:
+                await send(route, time.perf_counter())
+
+        await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+    return time.perf_counter() - start
+
+
+async def run(args) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+    server = server_task = None
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout)
+    else:
+        from benchmarks._standins import install
+
+        install(
+            milvus_latency=args.milvus_latency_ms / 1000,
+            redis_latency=args.redis_latency_ms / 1000,
+            embedding_latency=args.embedding_latency_ms / 1000,
+            llm_first_token_latency=args.llm_ttft_ms / 1000,
+            llm_token_interval=1 / args.llm_tokens_per_second if args.llm_tokens_per_second else 0.0,
+        )
+        from app.main import app
+
+        if args.target == "uvicorn":
+            import uvicorn
+
+            server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+            server_task = asyncio.create_task(server.serve())
+            while not server.started:
+                if server_task.done():
+                    server_task.result()
+                await asyncio.sleep(0.05)
+            client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=timeout)
+        else:
+            lifespan = app.router.lifespan_context(app)
+            await lifespan.__aenter__()
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://localhost", timeout=timeout
+            )
+
+    workload = Workload(client, args.api_prefix, args.seed)
+    recorder = Recorder()
+    try:
+        await workload.setup(args.collections, args.seed_documents, args.document_size, args.setup_timeout)
+        elapsed = await drive(workload, recorder, args)
+    finally:
+        await workload.teardown()
+        await client.aclose()
+        if server:
+            server.should_exit = True
+            await server_task
+        elif not args.url:
+            await lifespan.__aexit__(None, None, None)
+
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+    return {
+        "target": args.url or args.target,
+        "mode": f"open-loop {args.rate} rps" if args.rate else "closed-loop",
+        "concurrency": args.concurrency,
+        "duration_seconds": round(elapsed, 2),
+        "collections": args.collections,
+        "seed_documents": args.seed_documents,
+        "stand_in_latency_ms": None if args.url else {
+            "milvus": args.milvus_latency_ms,
+            "redis": args.redis_latency_ms,
+            "embedding": args.embedding_latency_ms,
+            "llm_first_token": args.llm_ttft_ms,
+        },
+        "requests": total,
+        "errors": sum(recorder.errors.values()),
+        "throughput_rps": round(total / elapsed, 1),
+        "routes": {route: recorder.summary(route, elapsed) for route in args.mix if recorder.latencies[route]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi", help="How to run the app in process")
+    parser.add_argument("--url", help="Load an already running server instead (no stand-ins)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --target uvicorn")
+    parser.add_argument("--api-prefix", default="/api/v1")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Route weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clients (closed loop) or in-flight cap (--rate)")
+    parser.add_argument("--rate", type=float, help="Mean arrival rate in requests/s (open loop)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of measured load")
+    parser.add_argument("--requests", type=int, help="Stop after this many requests")
+    parser.add_argument("--collections", type=int, default=4)
+    parser.add_argument("--seed-documents", type=int, default=10, help="Documents per collection before the run")
+    parser.add_argument("--document-size", type=int, default=4000, help="Characters per uploaded document")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--setup-timeout", type=float, default=120.0)
+    parser.add_argument("--milvus-latency-ms", type=float, default=0.0)
+    parser.add_argument("--redis-latency-ms", type=float, default=0.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-ttft-ms", type=float, default=0.0, help="LLM stand-in delay before the first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0, help="LLM stand-in decode rate (0: no delay)")
+    parser.add_argument("--worker-mode", choices=["inline", "asyncio"], default="asyncio",
+                        help="EMBEDDING_WORKER_MODE for in-process targets")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if not args.url:
+        # Must be set before app.core.config is first imported
+        workdir = tempfile.mkdtemp(prefix="rag-load-test-")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'load_test.db')}"
+        os.environ["UPLOAD_DIR"] = os.path.join(workdir, "uploads")
+        os.environ["EMBEDDING_WORKER_MODE"] = args.worker_mode
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Recall/latency sweep of vector index types and search parameters.
+
+    python -m benchmarks.search_benchmark
+    python -m benchmarks.search_benchmark --concurrency 1 4 16 --top-k 10
+    python -m benchmarks.search_benchmark --backend milvus --vectors embeddings.npy
+    python -m benchmarks.search_benchmark --backend milvus --grid grid.json
+
+Ground truth is exact cosine top-k by brute force in numpy. Every grid entry
+builds one index over the corpus, then replays the held-out queries once per
+search setting and concurrency level, one query per request as the search API
+issues them, and reports recall@k, p50/p95/p99 latency and QPS.
+
+Backends:
+  local   numpy FLAT and IVF_FLAT (spherical k-means coarse quantizer with
+          nlist/nprobe). Needs no services; shows how nlist/nprobe trade
+          recall for scanned vectors on a given corpus.
+  milvus  the Milvus from the app settings, through MilvusManager: a
+          temporary collection per grid entry with the pipeline schema, built
+          with the entry's index params and queried with search_vectors.
+          Latency includes the client round trip. Collections are dropped
+          afterwards.
+
+--grid takes a JSON list of entries like
+  {"index_type": "HNSW", "build": {"M": 16, "efConstruction": 200},
+   "search": [{"ef": 32}, {"ef": 64}, {"ef": 128}]}
+where "build" is the Milvus index params and each "search" item the search
+params. The defaults mirror the collection presets (IVF_FLAT/IVF_SQ8 with
+nlist 1024 and nprobe 10, HNSW with M 16/efConstruction 200) plus the
+settings around them.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks import _env  # noqa: F401
+from benchmarks._vectors import load_corpus, recall, top_k
+
+LOCAL_GRID = [
+    {"index_type": "FLAT", "build": {}, "search": [{}]},
+    {"index_type": "IVF_FLAT", "build": {"nlist": 128}, "search": [{"nprobe": n} for n in (1, 4, 10, 32)]},
+    {"index_type": "IVF_FLAT", "build": {"nlist": 512}, "search": [{"nprobe": n} for n in (4, 10, 32, 64)]},
+]
+
+MILVUS_GRID = [
+    {"index_type": "FLAT", "build": {}, "search": [{}]},
+    {"index_type": "IVF_FLAT", "build": {"nlist": 1024}, "search": [{"nprobe": n} for n in (10, 32, 64, 128)]},
+    {"index_type": "IVF_SQ8", "build": {"nlist": 1024}, "search": [{"nprobe": n} for n in (10, 32, 64)]},
+    {"index_type": "HNSW", "build": {"M": 16, "efConstruction": 200}, "search": [{"ef": n} for n in (32, 64, 128, 256)]},
+]
+
+
+def spherical_kmeans(vectors: np.ndarray, clusters: int, iterations: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), 256 * clusters), replace=False)]
+    centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Empty clusters keep their previous centroid
+        centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+    return centroids
+
+
+class LocalIndex:
+    def __init__(self, documents: np.ndarray, seed: int):
+        self.documents = documents
+        self.seed = seed
+        self.centroids = None
+        self.lists: List[np.ndarray] = []
+
+    async def build(self, index_type: str, build: Dict[str, Any]):
+        if index_type not in ("FLAT", "IVF_FLAT"):
+            raise ValueError(f"Local backend supports FLAT and IVF_FLAT, not {index_type}")
+        if index_type == "IVF_FLAT":
+            self.centroids = spherical_kmeans(self.documents, build["nlist"], 10, self.seed)
+            assignment = np.argmax(self.documents @ self.centroids.T, axis=1)
+            self.lists = [np.flatnonzero(assignment == cluster) for cluster in range(len(self.centroids))]
+
+    def _search(self, query: np.ndarray, k: int, params: Dict[str, Any]) -> List[int]:
+        if self.centroids is None:
+            candidates = None
+            scores = self.documents @ query
+        else:
+            probe = top_k((self.centroids @ query)[None, :], params.get("nprobe", 10))[0]
+            candidates = np.concatenate([self.lists[cluster] for cluster in probe])
+            scores = self.documents[candidates] @ query
+        best = top_k(scores[None, :], k)[0]
+        return (best if candidates is None else candidates[best]).tolist()
+
+    async def search(self, query: np.ndarray, k: int, params: Dict[str, Any]) -> List[int]:
+        # numpy releases the GIL in the matrix products, so threads overlap like server calls
+        return await asyncio.to_thread(self._search, query, k, params)
+
+    async def drop(self):
+        self.centroids = None
+        self.lists = []
+
+
+class MilvusIndex:
+    def __init__(self, documents: np.ndarray, batch_size: int):
+        self.documents = documents
+        self.batch_size = batch_size
+        self.name = None
+
+    async def build(self, index_type: str, build: Dict[str, Any]):
+        from pymilvus import utility
+        from app.core.milvus_client import milvus_manager, NO_PAGE
+
+        self.name = f"benchmark_{index_type.lower()}_{uuid.uuid4().hex[:8]}"
+        index_params = {"metric_type": "COSINE", "index_type": index_type, "params": build}
+        if not await milvus_manager.create_physical_collection(
+            self.name, "float32", self.documents.shape[1], index_type, index_params=index_params
+        ):
+            raise RuntimeError(f"Failed to create {self.name}")
+
+        for start in range(0, len(self.documents), self.batch_size):
+            rows = [
+                {
+                    "chunk_id": str(position),
+                    "document_id": f"benchmark-{position // 50}",
+                    "collection_id": "benchmark",
+                    "content": "",
+                    "metadata": {},
+                    "page": NO_PAGE,
+                    "tags": [],
+                    "created_at": 0,
+                    "embedding": vector.tolist(),
+                }
+                for position, vector in enumerate(self.documents[start:start + self.batch_size], start)
+            ]
+            if not await milvus_manager.insert_vectors(self.name, rows, flush=False):
+                raise RuntimeError(f"Failed to insert into {self.name}")
+
+        # Seal the segments and let the index finish so searches never fall back to brute force
+        collection = milvus_manager.get_collection(self.name)
+        await asyncio.to_thread(collection.flush)
+        await asyncio.to_thread(utility.wait_for_index_building_complete, self.name)
+        if not await milvus_manager.load_collection(self.name):
+            raise RuntimeError(f"Failed to load {self.name}")
+
+    async def search(self, query: np.ndarray, k: int, params: Dict[str, Any]) -> List[int]:
+        from app.core.milvus_client import milvus_manager
+
+        results = await milvus_manager.search_vectors(
+            self.name, [query.tolist()], top_k=k, search_params={"metric_type": "COSINE", "params": params}
+        )
+        if not results:
+            raise RuntimeError(f"Search failed on {self.name}")
+        return [int(hit["chunk_id"]) for hit in results[0]]
+
+    async def drop(self):
+        from app.core.milvus_client import milvus_manager
+
+        if self.name:
+            await milvus_manager.delete_collection(self.name)
+            self.name = None
+
+
+async def replay(index, queries: np.ndarray, k: int, params: Dict[str, Any], concurrency: int):
+    results: List[List[int]] = [[] for _ in queries]
+    latencies: List[float] = []
+    failed = 0
+    positions = itertools.count()
+
+    async def worker():
+        nonlocal failed
+        for position in positions:
+            if position >= len(queries):
+                return
+            start = time.perf_counter()
+            try:
+                results[position] = await index.search(queries[position], k, params)
+            except Exception:
+                failed += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, latencies, failed, time.perf_counter() - start
+
+
+async def sweep(index, grid, queries, truth, k: int, concurrency_levels: List[int], warmup: int):
+    rows = []
+    for entry in grid:
+        index_type, build = entry["index_type"], entry.get("build", {})
+        start = time.perf_counter()
+        try:
+            await index.build(index_type, build)
+            build_seconds = round(time.perf_counter() - start, 2)
+
+            for params in entry.get("search", [{}]):
+                await replay(index, queries[:warmup], k, params, 1)
+                for concurrency in concurrency_levels:
+                    results, latencies, failed, elapsed = await replay(index, queries, k, params, concurrency)
+                    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000 if latencies else (None,) * 3
+                    rows.append({
+                        "index_type": index_type,
+                        "build": build,
+                        "search": params,
+                        "build_seconds": build_seconds,
+                        "concurrency": concurrency,
+                        f"recall_at_{k}": round(recall(results, truth, k), 4),
+                        "p50_ms": None if p50 is None else round(float(p50), 3),
+                        "p95_ms": None if p95 is None else round(float(p95), 3),
+                        "p99_ms": None if p99 is None else round(float(p99), 3),
+                        "qps": round(len(latencies) / elapsed, 1),
+                        "failed": failed,
+                    })
+        except Exception as e:
+            rows.append({"index_type": index_type, "build": build, "error": str(e)})
+        finally:
+            await index.drop()
+    return rows
+
+
+async def run(args) -> Dict[str, Any]:
+    queries, documents = load_corpus(
+        args.vectors, args.count, args.dimensions, args.clusters, args.queries, args.seed
+    )
+    truth = top_k(queries @ documents.T, args.top_k)
+
+    if args.grid:
+        with open(args.grid) as grid_file:
+            grid = json.load(grid_file)
+    else:
+        grid = MILVUS_GRID if args.backend == "milvus" else LOCAL_GRID
+
+    if args.backend == "milvus":
+        from app.core.milvus_client import milvus_manager
+
+        await milvus_manager.initialize()
+        index = MilvusIndex(documents, args.batch_size)
+    else:
+        index = LocalIndex(documents, args.seed)
+
+    try:
+        rows = await sweep(index, grid, queries, truth, args.top_k, args.concurrency, args.warmup)
+    finally:
+        if args.backend == "milvus":
+            await milvus_manager.close()
+
+    return {
+        "backend": args.backend,
+        "documents": len(documents),
+        "queries": len(queries),
+        "dimensions": documents.shape[1],
+        "top_k": args.top_k,
+        "source": args.vectors or "synthetic",
+        "results": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["local", "milvus"], default="local")
+    parser.add_argument("--grid", help="JSON file with the index/search grid (default: built-in per backend)")
+    parser.add_argument("--vectors", help="N x D .npy file of full-precision embeddings (default: synthetic)")
+    parser.add_argument("--count", type=int, default=20000, help="Synthetic corpus size")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Synthetic vector dimension")
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=500, help="Vectors held out as queries")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="In-flight queries")
+    parser.add_argument("--warmup", type=int, default=20, help="Queries run before each measured setting")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Milvus insert batch size")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
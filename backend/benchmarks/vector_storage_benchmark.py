@@ -0,0 +1,123 @@
+"""
+Memory/recall trade-off of the collection vector storage options.
+
+    python -m benchmarks.vector_storage_benchmark
+    python -m benchmarks.vector_storage_benchmark --vectors embeddings.npy --queries 500 --top-k 10
+
+Vectors are encoded and decoded with the same code the pipeline uses for
+Milvus (app.services.vector_storage), then searched exhaustively in numpy, so
+recall differences come from precision/truncation/quantization alone and not
+from ANN index parameters. IVF_SQ8 is modelled as per-dimension 8-bit scalar
+quantization. Recall@k is measured against exact float32 search at full
+dimension; rerank rows re-score a top_k * factor shortlist at full precision
+as the search service does.
+
+Use --vectors with real embeddings (an N x D float .npy file, e.g. exported
+from a collection) for meaningful truncation results: the synthetic data only
+approximates the leading-dimension energy of Matryoshka embeddings.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks import _env  # noqa: F401
+from benchmarks._vectors import load_corpus, recall, top_k
+from app.services.vector_storage import bytes_per_vector, decode, encode, prepare
+
+# (vector type, dimensions as a fraction of full, index type, rerank factor)
+CONFIGURATIONS = [
+    ("float32", 1.0, "IVF_FLAT", None),
+    ("float16", 1.0, "IVF_FLAT", None),
+    ("bfloat16", 1.0, "IVF_FLAT", None),
+    ("float32", 2 / 3, "IVF_FLAT", None),
+    ("float32", 1 / 3, "IVF_FLAT", None),
+    ("float16", 1 / 3, "IVF_FLAT", None),
+    ("float32", 1.0, "IVF_SQ8", None),
+    ("float32", 1.0, "IVF_SQ8", 4),
+    ("binary", 1.0, "BIN_IVF_FLAT", None),
+    ("binary", 1.0, "BIN_IVF_FLAT", 4),
+    ("binary", 1.0, "BIN_IVF_FLAT", 10),
+    ("binary", 1 / 3, "BIN_IVF_FLAT", 10),
+]
+
+
+def sq8(matrix: np.ndarray) -> np.ndarray:
+    low = matrix.min(axis=0)
+    step = (matrix.max(axis=0) - low) / 255
+    step[step == 0] = 1
+    return np.round((matrix - low) / step) * step + low
+
+
+def evaluate(documents, queries, truth, vector_type, dimensions, index_type, rerank_factor, k):
+    vector_format = (vector_type, dimensions)
+    stored = np.stack([decode(encode(vector, vector_format), vector_format) for vector in documents])
+    query_matrix = np.stack([prepare(vector, dimensions) for vector in queries])
+
+    start = time.perf_counter()
+    if vector_type == "binary":
+        # Hamming similarity on sign bits, as BIN_IVF_FLAT ranks them
+        candidates_scores = (np.sign(query_matrix) @ stored.T + dimensions) / 2
+    else:
+        searchable = sq8(stored) if index_type == "IVF_SQ8" else stored
+        candidates_scores = query_matrix @ searchable.T
+    shortlist = top_k(candidates_scores, k * (rerank_factor or 1))
+
+    if rerank_factor:
+        # Full-precision query against the full-precision embeddings of the shortlist
+        rescored = np.einsum("qd,qkd->qk", queries, documents[shortlist])
+        results = np.take_along_axis(shortlist, np.argsort(-rescored, axis=1)[:, :k], axis=1)
+    else:
+        results = shortlist[:, :k]
+    elapsed = time.perf_counter() - start
+
+    size = bytes_per_vector(vector_type, dimensions, index_type)
+    return {
+        "vector_type": vector_type,
+        "dimensions": dimensions,
+        "index_type": index_type,
+        "rerank_factor": rerank_factor,
+        "bytes_per_vector": size,
+        "mb_per_million_vectors": round(size * 1_000_000 / (1024 * 1024), 1),
+        f"recall_at_{k}": round(recall(results, truth, k), 4),
+        "brute_force_ms_per_query": round(1000 * elapsed / len(queries), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", help="N x D .npy file of full-precision embeddings (default: synthetic)")
+    parser.add_argument("--count", type=int, default=20000, help="Synthetic corpus size")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Synthetic vector dimension")
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200, help="Vectors held out as queries")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    queries, documents = load_corpus(
+        args.vectors, args.count, args.dimensions, args.clusters, args.queries, args.seed
+    )
+    full_dimensions = documents.shape[1]
+    truth = top_k(queries @ documents.T, args.top_k)
+
+    baseline = bytes_per_vector("float32", full_dimensions)
+    rows = []
+    for vector_type, fraction, index_type, rerank_factor in CONFIGURATIONS:
+        dimensions = int(full_dimensions * fraction) // 8 * 8
+        row = evaluate(documents, queries, truth, vector_type, dimensions, index_type, rerank_factor, args.top_k)
+        row["compression"] = round(baseline / row["bytes_per_vector"], 1)
+        rows.append(row)
+
+    print(json.dumps({
+        "documents": len(documents),
+        "queries": len(queries),
+        "dimensions": full_dimensions,
+        "source": args.vectors or "synthetic",
+        "results": rows,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+import pytest_asyncio
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# Settings are read once at import, so the test environment is fixed before any app module loads
+DATA_DIR = tempfile.mkdtemp(prefix="rag-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{DATA_DIR}/test.db",
+    UPLOAD_DIR=f"{DATA_DIR}/uploads",
+    EMBEDDING_WORKER_MODE="inline",
+    SECRET_KEY="test-secret-key-not-for-production",
+    OPENAI_API_KEY="test-placeholder-key",
+)
+
+from benchmarks._standins import install  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def client():
+    # Shutdown closes the stand-in clients, so they are installed for every test
+    install()
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://localhost", timeout=30
+        ) as http_client:
+            yield http_client
+    finally:
+        await app.router.shutdown()
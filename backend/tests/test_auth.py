@@ -0,0 +1,146 @@
+from typing import Dict
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import database_manager
+from app.models.api_key import APIKeyRole
+from app.repositories.api_key import APIKeyRepository
+from app.schemas.api_key import APIKeyCreate
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def auth_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "API_KEY_AUTH_ENABLED", True)
+
+
+async def make_key(**fields) -> Dict[str, str]:
+    async for session in database_manager.get_session():
+        _, raw_key = await APIKeyRepository(session).create(APIKeyCreate(name="test", **fields))
+    return {"X-API-Key": raw_key}
+
+
+async def make_collection(client, admin: Dict[str, str], name: str) -> str:
+    response = await client.post("/api/v1/collections/", json={"name": name}, headers=admin)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def upload(client, admin: Dict[str, str], collection_id: str, text: str) -> str:
+    response = await client.post(
+        "/api/v1/documents/",
+        data={"collection_id": collection_id},
+        files={"file": ("notes.txt", text.encode())},
+        headers=admin
+    )
+    assert response.status_code == 201
+    return response.json()["document"]["id"]
+
+
+async def test_missing_and_unknown_keys_are_rejected(client):
+    assert (await client.get("/api/v1/collections/")).status_code == 401
+    assert (await client.get("/api/v1/collections/", headers={"X-API-Key": "x" * 40})).status_code == 401
+
+
+async def test_readonly_key_can_read_but_not_write(client):
+    admin = await make_key(role=APIKeyRole.ADMIN)
+    readonly = await make_key(role=APIKeyRole.READONLY)
+    collection_id = await make_collection(client, admin, "readonly-target")
+
+    assert (await client.get(f"/api/v1/collections/{collection_id}", headers=readonly)).status_code == 200
+    search = {"collection_id": collection_id, "query": "anything"}
+    assert (await client.post("/api/v1/rag/search", json=search, headers=readonly)).status_code == 200
+
+    assert (await client.delete(f"/api/v1/collections/{collection_id}", headers=readonly)).status_code == 403
+    assert (await client.post("/api/v1/collections/", json={"name": "nope"}, headers=readonly)).status_code == 403
+    response = await client.post(
+        "/api/v1/documents/",
+        data={"collection_id": collection_id},
+        files={"file": ("a.txt", b"text")},
+        headers=readonly
+    )
+    assert response.status_code == 403
+
+
+async def test_allowed_operations_are_enforced(client):
+    admin = await make_key(role=APIKeyRole.ADMIN)
+    collection_id = await make_collection(client, admin, "operations-target")
+    reader = await make_key(allowed_operations=["collections:read"])
+
+    assert (await client.get(f"/api/v1/collections/{collection_id}", headers=reader)).status_code == 200
+    assert (await client.get("/api/v1/collections/", headers=reader)).status_code == 403
+    search = {"collection_id": collection_id, "query": "anything"}
+    assert (await client.post("/api/v1/rag/search", json=search, headers=reader)).status_code == 403
+
+
+async def test_key_is_limited_to_its_collections(client):
+    admin = await make_key(role=APIKeyRole.ADMIN)
+    allowed_id = await make_collection(client, admin, "allowed")
+    other_id = await make_collection(client, admin, "other")
+    scoped = await make_key(allowed_collections=[allowed_id])
+    allowed_document = await upload(client, admin, allowed_id, "allowed text " * 20)
+    other_document = await upload(client, admin, other_id, "other text " * 20)
+
+    # Path parameters
+    assert (await client.get(f"/api/v1/collections/{allowed_id}", headers=scoped)).status_code == 200
+    assert (await client.get(f"/api/v1/collections/{other_id}", headers=scoped)).status_code == 403
+    assert (await client.get(f"/api/v1/collections/{other_id}/stats", headers=scoped)).status_code == 403
+
+    # Documents resolve to their collection
+    assert (await client.get(f"/api/v1/documents/{allowed_document}", headers=scoped)).status_code == 200
+    assert (await client.get(f"/api/v1/documents/{other_document}", headers=scoped)).status_code == 403
+    assert (await client.delete(f"/api/v1/documents/{other_document}", headers=scoped)).status_code == 403
+    assert (await client.get(f"/api/v1/documents/{other_document}", headers=admin)).status_code == 200
+
+    # Query, form and body parameters
+    response = await client.get("/api/v1/documents/", params={"collection_id": other_id}, headers=scoped)
+    assert response.status_code == 403
+    response = await client.post(
+        "/api/v1/documents/",
+        data={"collection_id": other_id},
+        files={"file": ("b.txt", b"more text")},
+        headers=scoped
+    )
+    assert response.status_code == 403
+    response = await client.post("/api/v1/rag/search", json={"collection_id": other_id, "query": "text"}, headers=scoped)
+    assert response.status_code == 403
+    response = await client.post(
+        "/api/v1/rag/search/federated", json={"collection_ids": [allowed_id, other_id], "query": "text"}, headers=scoped
+    )
+    assert response.status_code == 403
+    response = await client.post("/api/v1/rag/search", json={"collection_id": allowed_id, "query": "text"}, headers=scoped)
+    assert response.status_code == 200
+    assert {hit["collection_id"] for hit in response.json()["results"]} == {allowed_id}
+
+    # Listings only show allowed collections
+    response = await client.get("/api/v1/collections/", params={"limit": 100}, headers=scoped)
+    assert [collection["id"] for collection in response.json()["collections"]] == [allowed_id]
+
+
+async def test_operations_follow_their_collections(client):
+    admin = await make_key(role=APIKeyRole.ADMIN)
+    allowed_id = await make_collection(client, admin, "operation-allowed")
+    other_id = await make_collection(client, admin, "operation-other")
+    scoped = await make_key(allowed_collections=[allowed_id])
+
+    response = await client.post(f"/api/v1/collections/{other_id}/sync", json={}, headers=admin)
+    assert response.status_code == 202
+    operation_id = response.json()["operation_id"]
+
+    assert (await client.get(f"/api/v1/operations/{operation_id}", headers=scoped)).status_code == 403
+    assert (await client.post(f"/api/v1/operations/{operation_id}/cancel", headers=scoped)).status_code == 403
+    assert (await client.get(f"/api/v1/operations/{operation_id}", headers=admin)).status_code == 200
+
+    response = await client.post(
+        "/api/v1/collections/bulk-delete", json={"collection_ids": [other_id], "confirm": True}, headers=scoped
+    )
+    assert response.status_code == 403
+
+
+async def test_disabled_auth_allows_everything(client, monkeypatch):
+    monkeypatch.setattr(settings, "API_KEY_AUTH_ENABLED", False)
+    collection_id = await make_collection(client, {}, "open")
+    assert (await client.get(f"/api/v1/collections/{collection_id}")).status_code == 200
+    assert (await client.delete(f"/api/v1/collections/{collection_id}")).status_code == 200
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.core.database import database_manager
+from app.models.chunk import Chunk, ChunkStatus
+from app.repositories.chunk import ChunkRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+async def make_document(client, name: str, chunks: int) -> str:
+    response = await client.post("/api/v1/collections/", json={"name": name, "chunk_size": 200, "chunk_overlap": 0})
+    collection_id = response.json()["id"]
+    text = " ".join(f"{name}-{index}-{word}" for index in range(chunks) for word in range(12))
+    response = await client.post(
+        "/api/v1/documents/", data={"collection_id": collection_id}, files={"file": ("doc.txt", text.encode())}
+    )
+    assert response.status_code == 201
+    return response.json()["document"]["id"]
+
+
+async def test_context_windows_skip_index_gaps(client):
+    document_id = await make_document(client, "gaps", 16)
+    async for session in database_manager.get_session():
+        indexes = list((await session.scalars(
+            select(Chunk.chunk_index).where(Chunk.document_id == document_id).order_by(Chunk.chunk_index)
+        )).all())
+        assert len(indexes) >= 7
+        removed = {indexes[1], indexes[3], indexes[5]}
+        await session.execute(delete(Chunk).where(Chunk.document_id == document_id, Chunk.chunk_index.in_(removed)))
+        await session.commit()
+        remaining = [index for index in indexes if index not in removed]
+
+        repo = ChunkRepository(session)
+        anchor = remaining[2]
+        positions = [(document_id, anchor), (document_id, remaining[0]), (document_id, remaining[-1])]
+        windows = await repo.get_context_windows(positions, context_size=2)
+
+        assert [chunk.chunk_index for chunk in windows[(document_id, anchor)]] == remaining[0:5]
+        assert [chunk.chunk_index for chunk in windows[(document_id, remaining[0])]] == remaining[0:3]
+        assert [chunk.chunk_index for chunk in windows[(document_id, remaining[-1])]] == remaining[-3:]
+        assert (document_id, indexes[1]) not in await repo.get_context_windows([(document_id, indexes[1])])
+
+        alone = await repo.get_context_windows([(document_id, anchor)], context_size=0)
+        assert [chunk.chunk_index for chunk in alone[(document_id, anchor)]] == [anchor]
+
+
+async def test_claim_batch_hands_out_each_chunk_once(client):
+    document_id = await make_document(client, "claims", 6)
+    async for session in database_manager.get_session():
+        await session.execute(
+            update(Chunk).where(Chunk.document_id == document_id)
+            .values(status=ChunkStatus.PENDING, milvus_synced=False)
+        )
+        await session.commit()
+        total = len((await session.scalars(select(Chunk.id).where(Chunk.document_id == document_id))).all())
+        repo = ChunkRepository(session)
+
+        first = await repo.claim_batch("worker-1", 2, lease_seconds=60)
+        rest = await repo.claim_batch("worker-2", 100, lease_seconds=60)
+        assert len(first) == 2 and len(rest) == total - 2
+        assert not {chunk.id for chunk in first} & {chunk.id for chunk in rest}
+        assert all(chunk.status == ChunkStatus.EMBEDDING and chunk.lease_owner == "worker-1" for chunk in first)
+        assert await repo.claim_batch("worker-3", 100, lease_seconds=60) == []
+
+        # An expired lease makes its chunks claimable again
+        await session.execute(
+            update(Chunk).where(Chunk.id.in_([chunk.id for chunk in first]))
+            .values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await session.commit()
+        reclaimed = await repo.claim_batch("worker-3", 100, lease_seconds=60)
+        assert {chunk.id for chunk in reclaimed} == {chunk.id for chunk in first}
+        assert all(chunk.lease_owner == "worker-3" for chunk in reclaimed)
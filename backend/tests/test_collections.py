@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.services.operations import operation_manager
+
+pytestmark = pytest.mark.asyncio
+
+
+async def wait_for_operation(client, operation_id: str) -> dict:
+    for _ in range(200):
+        record = (await client.get(f"/api/v1/operations/{operation_id}")).json()
+        if record["status"] != "running":
+            return record
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"operation {operation_id} did not finish")
+
+
+async def test_conflicting_sync_leaves_status_unchanged(client, monkeypatch):
+    response = await client.post("/api/v1/collections/", json={"name": "sync-target"})
+    collection_id = response.json()["id"]
+
+    release = asyncio.Event()
+
+    async def hold(context):
+        await release.wait()
+
+    holder = await operation_manager.start("test_hold", "Holding", hold, resource_id=collection_id)
+
+    # Another request claims the collection between the idle check and the sync's own claim
+    async def idle(resource_id):
+        return None
+
+    monkeypatch.setattr(operation_manager, "ensure_idle", idle)
+    response = await client.post(f"/api/v1/collections/{collection_id}/sync", json={})
+    assert response.status_code == 409
+    collection = (await client.get(f"/api/v1/collections/{collection_id}")).json()
+    assert collection["status"] == "active" and collection["milvus_synced"]
+
+    release.set()
+    await wait_for_operation(client, holder["operation_id"])
+    response = await client.post(f"/api/v1/collections/{collection_id}/sync", json={})
+    assert response.status_code == 202
+    record = await wait_for_operation(client, response.json()["operation_id"])
+    assert record["status"] == "completed"
+    collection = (await client.get(f"/api/v1/collections/{collection_id}")).json()
+    assert collection["status"] == "active" and collection["milvus_synced"]
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app.services.operations import operation_manager
+
+pytestmark = pytest.mark.asyncio
+
+
+async def make_collection(client, name: str) -> str:
+    response = await client.post("/api/v1/collections/", json={"name": name, "chunk_size": 200, "chunk_overlap": 0})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def upload(client, collection_id: str, name: str, data: bytes):
+    return await client.post("/api/v1/documents/", data={"collection_id": collection_id}, files={"file": (name, data)})
+
+
+async def replace(client, document_id: str, name: str, data: bytes):
+    return await client.put(f"/api/v1/documents/{document_id}", files={"file": (name, data)})
+
+
+async def collection_stats(client, collection_id: str) -> dict:
+    collection = (await client.get(f"/api/v1/collections/{collection_id}")).json()
+    return {key: collection[key] for key in ("document_count", "chunk_count", "total_size_bytes")}
+
+
+def paragraphs(*numbers: int, changed: int = 0) -> bytes:
+    # ~150 characters each, so with chunk_size 200 every paragraph is one chunk
+    text = "\n\n".join(
+        f"Paragraph {number} {'revised ' if number == changed else ''}"
+        + " ".join(f"word{number}x{word}" for word in range(14))
+        for number in numbers
+    )
+    return text.encode()
+
+
+async def test_reingest_only_touches_changed_chunks(client):
+    collection_id = await make_collection(client, "diff")
+    original = paragraphs(1, 2, 3, 4, 5, 6)
+    response = await upload(client, collection_id, "doc.txt", original)
+    assert response.status_code == 201
+    body = response.json()
+    document_id = body["document"]["id"]
+    assert body["chunks_created"] == 6 and body["chunks_kept"] == 0
+    assert await collection_stats(client, collection_id) == {
+        "document_count": 1, "chunk_count": 6, "total_size_bytes": len(original)
+    }
+
+    # Paragraph 3 rewritten, 6 dropped, 7 added
+    revised = paragraphs(1, 2, 3, 4, 5, 7, changed=3)
+    response = await replace(client, document_id, "doc.txt", revised)
+    assert response.status_code == 200
+    body = response.json()
+    assert not body["duplicate"]
+    assert (body["chunks_kept"], body["chunks_created"], body["chunks_deleted"]) == (4, 2, 2)
+    assert body["embeddings_generated"] == 2
+    assert body["document"]["chunk_count"] == 6
+    assert await collection_stats(client, collection_id) == {
+        "document_count": 1, "chunk_count": 6, "total_size_bytes": len(revised)
+    }
+
+
+async def test_duplicate_upload_is_skipped(client):
+    collection_id = await make_collection(client, "duplicates")
+    data = paragraphs(1, 2, 3)
+    first = (await upload(client, collection_id, "a.txt", data)).json()
+    stats = await collection_stats(client, collection_id)
+
+    response = await upload(client, collection_id, "copy-of-a.txt", data)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["duplicate"] and body["document"]["id"] == first["document"]["id"]
+    assert body["chunks_created"] == 0 and body["embeddings_generated"] == 0
+    assert await collection_stats(client, collection_id) == stats
+
+
+async def test_deleting_failed_document_keeps_stats(client):
+    collection_id = await make_collection(client, "failed")
+    data = paragraphs(1, 2)
+    counted = (await upload(client, collection_id, "good.txt", data)).json()["document"]["id"]
+    stats = await collection_stats(client, collection_id)
+
+    assert (await upload(client, collection_id, "broken.pdf", b"%PDF-1.4 not really a pdf")).status_code == 422
+    response = await client.get("/api/v1/documents/", params={"collection_id": collection_id, "status": "failed"})
+    failed = response.json()["documents"]
+    assert len(failed) == 1
+    assert (await client.delete(f"/api/v1/documents/{failed[0]['id']}")).status_code == 200
+    assert await collection_stats(client, collection_id) == stats
+
+    assert (await client.delete(f"/api/v1/documents/{counted}")).status_code == 200
+    assert await collection_stats(client, collection_id) == {
+        "document_count": 0, "chunk_count": 0, "total_size_bytes": 0
+    }
+
+
+async def test_uploads_wait_for_collection_operations(client):
+    collection_id = await make_collection(client, "busy")
+    document_id = (await upload(client, collection_id, "a.txt", b"first version " * 30)).json()["document"]["id"]
+
+    release = asyncio.Event()
+
+    async def hold(context):
+        await release.wait()
+
+    await operation_manager.start("test_hold", "Holding", hold, resource_id=collection_id)
+    try:
+        assert (await upload(client, collection_id, "b.txt", b"another document " * 30)).status_code == 409
+        assert (await replace(client, document_id, "a.txt", b"second version " * 30)).status_code == 409
+    finally:
+        release.set()
+
+
+async def test_deleted_document_cannot_be_replaced(client):
+    collection_id = await make_collection(client, "deleted")
+    document_id = (await upload(client, collection_id, "a.txt", b"first version " * 30)).json()["document"]["id"]
+    assert (await client.delete(f"/api/v1/documents/{document_id}")).status_code == 200
+
+    assert (await replace(client, document_id, "a.txt", b"second version " * 30)).status_code == 404
+    collection = (await client.get(f"/api/v1/collections/{collection_id}")).json()
+    assert collection["document_count"] == 0 and collection["chunk_count"] == 0
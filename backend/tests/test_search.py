@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from app.repositories.chunk import ChunkRepository
+
+pytestmark = pytest.mark.asyncio
+
+
+async def make_collection(client, name: str, **vector) -> str:
+    body = {"name": name, "chunk_size": 200, "chunk_overlap": 0}
+    if vector:
+        body["vector"] = vector
+    response = await client.post("/api/v1/collections/", json=body)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def upload(client, collection_id: str, name: str, text: str):
+    response = await client.post(
+        "/api/v1/documents/", data={"collection_id": collection_id}, files={"file": (name, text.encode())}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_federated_search_over_reranked_collections(client, monkeypatch):
+    collection_ids = [
+        await make_collection(client, "binary-a", vector_type="binary"),
+        await make_collection(client, "binary-b", vector_type="binary"),
+    ]
+    for index, collection_id in enumerate(collection_ids):
+        for document in range(3):
+            words = " ".join(f"topic{index}-{document}-{word}" for word in range(60))
+            await upload(client, collection_id, f"doc{document}.txt", words)
+
+    # Rerank loads chunks per collection; hold each load open so concurrent use of one session shows
+    in_use = set()
+    overlaps = []
+    get_by_ids = ChunkRepository.get_by_ids
+
+    async def slow_get_by_ids(self, chunk_ids):
+        if id(self.session) in in_use:
+            overlaps.append(chunk_ids)
+        in_use.add(id(self.session))
+        try:
+            await asyncio.sleep(0.05)
+            return await get_by_ids(self, chunk_ids)
+        finally:
+            in_use.discard(id(self.session))
+
+    monkeypatch.setattr(ChunkRepository, "get_by_ids", slow_get_by_ids)
+    response = await client.post(
+        "/api/v1/rag/search/federated",
+        json={"collection_ids": collection_ids, "query": "topic0-1-5", "top_k": 8}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(body["searched"]) == sorted(collection_ids)
+    assert body["failed"] == [] and body["timed_out"] == []
+    assert overlaps == []
+    scores = [hit["score"] for hit in body["results"]]
+    assert len(scores) == 8 and scores == sorted(scores, reverse=True)
+    assert all(hit["content"] for hit in body["results"])
+
+
+async def test_mmr_skips_near_duplicates(client):
+    collection_id = await make_collection(client, "mmr")
+    documents = {
+        "a1": "alpha bravo charlie delta",
+        "a2": "alpha bravo charlie delta echo",
+        "b": "alpha bravo zulu yankee",
+        "c": "omega sigma tau rho",
+    }
+    names = {}
+    for name, text in documents.items():
+        names[(await upload(client, collection_id, f"{name}.txt", text))["document"]["id"]] = name
+
+    async def ranked(**options):
+        response = await client.post(
+            "/api/v1/rag/search",
+            json={"collection_id": collection_id, "query": "alpha bravo charlie", "top_k": 3, **options}
+        )
+        assert response.status_code == 200
+        return [names[hit["document_id"]] for hit in response.json()["results"]]
+
+    assert await ranked() == ["a1", "a2", "b"]
+    assert await ranked(mmr=True, mmr_lambda=0.5) == ["a1", "b", "a2"]
+    assert (await ranked(mmr=True, mmr_lambda=1.0))[:2] == ["a1", "a2"]
+
+
+async def test_federated_search_rejects_mixed_score_scales(client):
+    full = await make_collection(client, "full")
+    truncated = await make_collection(client, "truncated", dimensions=512)
+    hamming = await make_collection(client, "hamming", vector_type="binary", rerank=False)
+    reranked = await make_collection(client, "reranked", vector_type="binary")
+
+    async def federated(*collection_ids):
+        return await client.post(
+            "/api/v1/rag/search/federated", json={"collection_ids": list(collection_ids), "query": "anything"}
+        )
+
+    assert (await federated(full, truncated)).status_code == 422
+    assert (await federated(full, hamming)).status_code == 422
+    assert (await federated(full, reranked)).status_code == 200
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Mock OpenAI-compatible LLM server for benchmarking without a GPU.
+
+    python mock_llm_server.py --port 8080 --ttft-ms 250 --tokens-per-second 40 --slots 8
+
+Serves GET /health, GET /v1/models, POST /v1/completions and
+POST /v1/chat/completions, streamed (SSE) or not. Generation is simulated:
+the first token arrives after the prefill delay and the rest at the decode
+rate, which is shared by up to --slots concurrent requests (a batch); above
+that every active stream slows down proportionally, like a saturated GPU.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from itertools import cycle, islice
+from typing import Any, AsyncIterator, Dict
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+WORDS = (
+    "Quantization maps model weights and activations from 16-bit floating point to lower precision "
+    "integers such as int8 or int4, which shrinks memory use and speeds up matrix multiplication "
+    "at the cost of a small loss in accuracy that calibration and group-wise scales help recover. "
+).split()
+
+
+class MockLLM:
+    def __init__(self, model: str, ttft: float, tokens_per_second: float, slots: int, max_output_tokens: int):
+        self.model = model
+        self.ttft = ttft
+        self.token_interval = 1 / tokens_per_second
+        self.slots = slots
+        self.max_output_tokens = max_output_tokens
+        self.active = 0
+
+    def output_tokens(self, payload: Dict[str, Any]) -> int:
+        return max(1, min(int(payload.get("max_tokens") or self.max_output_tokens), self.max_output_tokens))
+
+    async def generate(self, count: int) -> AsyncIterator[str]:
+        self.active += 1
+        try:
+            await asyncio.sleep(self.ttft * max(1.0, self.active / self.slots))
+            for index, word in enumerate(islice(cycle(WORDS), count)):
+                if index:
+                    await asyncio.sleep(self.token_interval * max(1.0, self.active / self.slots))
+                yield word if index == 0 else f" {word}"
+        finally:
+            self.active -= 1
+
+    def app(self) -> Starlette:
+        async def health(request: Request):
+            return JSONResponse({"status": "ok", "active_requests": self.active})
+
+        async def models(request: Request):
+            return JSONResponse({"object": "list", "data": [{"id": self.model, "object": "model", "owned_by": "mock"}]})
+
+        async def completions(request: Request):
+            return await self.respond(await request.json(), chat=False)
+
+        async def chat_completions(request: Request):
+            return await self.respond(await request.json(), chat=True)
+
+        return Starlette(routes=[
+            Route("/health", health),
+            Route("/v1/models", models),
+            Route("/v1/completions", completions, methods=["POST"]),
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        ])
+
+    async def respond(self, payload: Dict[str, Any], chat: bool):
+        request_id = f"{'chatcmpl' if chat else 'cmpl'}-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        count = self.output_tokens(payload)
+        prompt = json.dumps(payload.get("messages") or payload.get("prompt") or "", ensure_ascii=False)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": count, "total_tokens": len(prompt) // 4 + count}
+        base = {
+            "id": request_id,
+            "object": "chat.completion.chunk" if chat else "text_completion",
+            "created": created,
+            "model": payload.get("model") or self.model,
+        }
+
+        if not payload.get("stream"):
+            text = "".join([token async for token in self.generate(count)])
+            choice = {"index": 0, "finish_reason": "length"}
+            if chat:
+                choice["message"] = {"role": "assistant", "content": text}
+            else:
+                choice["text"] = text
+            return JSONResponse({**base, "object": "chat.completion" if chat else "text_completion",
+                                 "choices": [choice], "usage": usage})
+
+        include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+
+        async def events() -> AsyncIterator[str]:
+            async for token in self.generate(count):
+                delta = {"delta": {"content": token}} if chat else {"text": token}
+                yield f"data: {json.dumps({**base, 'choices': [{'index': 0, **delta, 'finish_reason': None}]})}\n\n"
+            last = {"delta": {}} if chat else {"text": ""}
+            yield f"data: {json.dumps({**base, 'choices': [{'index': 0, **last, 'finish_reason': 'length'}]})}\n\n"
+            if include_usage:
+                yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--mock-model", default="mock-llm", help="Model id the mock reports")
+    parser.add_argument("--ttft-ms", type=float, default=200.0, help="Mock prefill delay before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Mock decode rate per stream")
+    parser.add_argument("--slots", type=int, default=8, help="Mock concurrent streams before decode slows down")
+    parser.add_argument("--max-output-tokens", type=int, default=256, help="Mock cap on generated tokens")
+
+
+def from_arguments(args: argparse.Namespace) -> MockLLM:
+    return MockLLM(args.mock_model, args.ttft_ms / 1000, args.tokens_per_second, args.slots, args.max_output_tokens)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    uvicorn.run(from_arguments(args).app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
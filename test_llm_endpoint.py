@@ -1,217 +1,269 @@
 #!/usr/bin/env python3
 """
-LLM Endpoint Test Script
-Tests the LLM endpoint at http://112.173.179.199:8080
+LLM Endpoint Benchmark
+Fires concurrent completion and chat requests at an OpenAI-compatible
+endpoint and measures time-to-first-token, tokens/sec and latency percentiles
+from the streamed (SSE) responses.
+
+    python test_llm_endpoint.py --mock
+    python test_llm_endpoint.py --mock --concurrency 1 8 32 --requests 64 --slots 8
+    python test_llm_endpoint.py --url http://112.173.179.199:8080 --concurrency 4 16 --max-tokens 512
+
+--mock starts the bundled mock server (mock_llm_server.py) in process on a
+free localhost port; its --ttft-ms/--tokens-per-second/--slots options model
+the generation tier. Without streaming (--no-stream) only total latency is
+measured.
+
+Per request, TTFT is the time until the first chunk carrying text, and
+tokens/sec is the decode rate after it ((tokens - 1) / (total - TTFT)).
+Tokens are counted from the usage the server reports at the end of the
+stream (stream_options.include_usage), or as the number of text chunks when
+it does not. Aggregate output tokens/sec is what the endpoint sustains at
+each concurrency level.
 """
 
-import requests
+import argparse
+import asyncio
 import json
+import math
+import socket
 import time
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+DEFAULT_PROMPT = "LLM 모델 양자화에 대해 설명해줘"
+
+
+@dataclass
+class RequestResult:
+    success: bool
+    status_code: Optional[int] = None
+    latency: Optional[float] = None
+    ttft: Optional[float] = None
+    output_tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if self.ttft is None or self.output_tokens < 2 or self.latency <= self.ttft:
+            return None
+        return (self.output_tokens - 1) / (self.latency - self.ttft)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    # Linear interpolation between closest ranks, like numpy's default
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def distribution(values: List[float], scale: float = 1.0, digits: int = 1) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    return {
+        f"p{q}": round(percentile(values, q) * scale, digits)
+        for q in (50, 90, 95, 99)
+    } | {"max": round(max(values) * scale, digits)}
+
 
 class LLMEndpointTester:
-    def __init__(self, base_url: str = "http://112.173.179.199:8080"):
+    def __init__(self, base_url: str, model: Optional[str] = None, timeout: float = 120.0):
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "User-Agent": "LLM-Endpoint-Tester/1.0"
-        })
+        self.model = model
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Content-Type": "application/json", "User-Agent": "LLM-Endpoint-Tester/2.0"},
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+        )
+
+    async def close(self):
+        await self.client.aclose()
 
-    def test_health(self) -> bool:
+    async def test_health(self) -> bool:
         """Test if the endpoint is reachable"""
         try:
-            response = self.session.get(f"{self.base_url}/health", timeout=10)
-            print(f"Health check: {response.status_code}")
+            response = await self.client.get("/health", timeout=10)
             return response.status_code == 200
-        except requests.exceptions.RequestException as e:
-            print(f"Health check failed: {e}")
+        except httpx.HTTPError:
             return False
 
-    def test_completion(self, prompt: str, model: Optional[str] = None, max_tokens: int = 500) -> Dict[str, Any]:
-        """Test completion endpoint"""
-        payload = {
-            "prompt": prompt,
-            "max_tokens": max_tokens,
-            "temperature": 0.7
-        }
+    async def test_models(self) -> List[str]:
+        """Model ids served by the endpoint"""
+        try:
+            response = await self.client.get("/v1/models", timeout=10)
+            response.raise_for_status()
+            return [model.get("id") for model in response.json().get("data", [])]
+        except (httpx.HTTPError, ValueError):
+            return []
 
-        if model:
-            payload["model"] = model
+    def payload(self, kind: str, prompt: str, max_tokens: int, stream: bool) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"max_tokens": max_tokens, "temperature": 0.7, "stream": stream}
+        if kind == "chat":
+            payload["messages"] = [{"role": "user", "content": prompt}]
+        else:
+            payload["prompt"] = prompt
+        if stream:
+            payload["stream_options"] = {"include_usage": True}
+        if self.model:
+            payload["model"] = self.model
+        return payload
 
+    async def request(self, kind: str, prompt: str, max_tokens: int, stream: bool = True) -> RequestResult:
+        """One completion ("completion") or chat completion ("chat") request"""
+        path = "/v1/chat/completions" if kind == "chat" else "/v1/completions"
+        payload = self.payload(kind, prompt, max_tokens, stream)
+        start = time.perf_counter()
         try:
-            start_time = time.time()
-            response = self.session.post(
-                f"{self.base_url}/v1/completions",
-                json=payload,
-                timeout=60
-            )
-            end_time = time.time()
-
-            result = {
-                "status_code": response.status_code,
-                "response_time": end_time - start_time,
-                "success": response.status_code == 200
-            }
-
-            if response.status_code == 200:
-                result["response"] = response.json()
-            else:
-                result["error"] = response.text
-
-            return result
-
-        except requests.exceptions.RequestException as e:
-            return {
-                "status_code": None,
-                "response_time": None,
-                "success": False,
-                "error": str(e)
-            }
-
-    def test_chat_completion(self, messages: list, model: Optional[str] = None, max_tokens: int = 500) -> Dict[str, Any]:
-        """Test chat completion endpoint"""
-        payload = {
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": 0.7
+            if not stream:
+                response = await self.client.post(path, json=payload)
+                latency = time.perf_counter() - start
+                if response.status_code != 200:
+                    return RequestResult(False, response.status_code, latency, error=response.text[:200])
+                usage = response.json().get("usage") or {}
+                return RequestResult(True, 200, latency, output_tokens=usage.get("completion_tokens", 0))
+
+            async with self.client.stream("POST", path, json=payload) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    return RequestResult(False, response.status_code, time.perf_counter() - start,
+                                         error=body.decode("utf-8", "replace")[:200])
+                return await self.read_stream(response, kind, start)
+
+        except httpx.HTTPError as e:
+            return RequestResult(False, latency=time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+
+    @staticmethod
+    async def read_stream(response: httpx.Response, kind: str, start: float) -> RequestResult:
+        ttft = None
+        chunks = 0
+        usage_tokens = None
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            if event.get("usage"):
+                usage_tokens = event["usage"].get("completion_tokens")
+            for choice in event.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content") if kind == "chat" else choice.get("text")
+                if text:
+                    chunks += 1
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+
+        latency = time.perf_counter() - start
+        if ttft is None:
+            return RequestResult(False, 200, latency, error="Stream ended without any tokens")
+        return RequestResult(True, 200, latency, ttft, usage_tokens or chunks)
+
+    async def run_level(self, kind: str, concurrency: int, requests: int, prompt: str, max_tokens: int,
+                        stream: bool) -> Dict[str, Any]:
+        """`requests` requests with at most `concurrency` in flight"""
+        remaining = iter(range(requests))
+        results: List[RequestResult] = []
+
+        async def worker():
+            for _ in remaining:
+                results.append(await self.request(kind, prompt, max_tokens, stream))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        succeeded = [result for result in results if result.success]
+        errors: Dict[str, int] = {}
+        for result in results:
+            if not result.success:
+                key = str(result.status_code or result.error)
+                errors[key] = errors.get(key, 0) + 1
+        output_tokens = sum(result.output_tokens for result in succeeded)
+
+        return {
+            "endpoint": kind,
+            "concurrency": concurrency,
+            "requests": len(results),
+            "succeeded": len(succeeded),
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 2),
+            "requests_per_second": round(len(succeeded) / elapsed, 2),
+            "output_tokens_per_second": round(output_tokens / elapsed, 1),
+            "ttft_ms": distribution([r.ttft for r in succeeded if r.ttft is not None], 1000),
+            "latency_ms": distribution([r.latency for r in succeeded], 1000),
+            "tokens_per_second_per_request": distribution(
+                [r.tokens_per_second for r in succeeded if r.tokens_per_second is not None]
+            ),
+            "mean_output_tokens": round(output_tokens / len(succeeded), 1) if succeeded else None,
         }
 
-        if model:
-            payload["model"] = model
 
-        try:
-            start_time = time.time()
-            response = self.session.post(
-                f"{self.base_url}/v1/chat/completions",
-                json=payload,
-                timeout=60
-            )
-            end_time = time.time()
-
-            result = {
-                "status_code": response.status_code,
-                "response_time": end_time - start_time,
-                "success": response.status_code == 200
-            }
-
-            if response.status_code == 200:
-                result["response"] = response.json()
-            else:
-                result["error"] = response.text
-
-            return result
-
-        except requests.exceptions.RequestException as e:
-            return {
-                "status_code": None,
-                "response_time": None,
-                "success": False,
-                "error": str(e)
-            }
-
-    def test_models(self) -> Dict[str, Any]:
-        """Test models endpoint"""
-        try:
-            response = self.session.get(f"{self.base_url}/v1/models", timeout=10)
-            result = {
-                "status_code": response.status_code,
-                "success": response.status_code == 200
-            }
-
-            if response.status_code == 200:
-                result["models"] = response.json()
-            else:
-                result["error"] = response.text
-
-            return result
-
-        except requests.exceptions.RequestException as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
-    def run_all_tests(self):
-        """Run all tests and print results"""
-        print("=" * 60)
-        print("LLM Endpoint Test Results")
-        print("=" * 60)
-        print(f"Testing endpoint: {self.base_url}")
-        print()
-
-        # Test 1: Health check
-        print("1. Health Check")
-        print("-" * 30)
-        health_ok = self.test_health()
-        print(f"Status: {'PASS' if health_ok else 'FAIL'}")
-        print()
-
-        # Test 2: Models endpoint
-        print("2. Models Endpoint")
-        print("-" * 30)
-        models_result = self.test_models()
-        print(f"Status: {'PASS' if models_result['success'] else 'FAIL'}")
-        if models_result['success']:
-            models = models_result.get('models', {}).get('data', [])
-            print(f"Available models: {len(models)}")
-            for model in models[:3]:  # Show first 3 models
-                print(f"  - {model.get('id', 'Unknown')}")
-        else:
-            print(f"Error: {models_result.get('error', 'Unknown error')}")
-        print()
-
-        # Test 3: LLM Quantization Completion Test
-        print("3. LLM Quantization Completion Test")
-        print("-" * 50)
-        quantization_prompt = "LLM 모델 양자화에 대해 설명해줘"
-        completion_result = self.test_completion(quantization_prompt, max_tokens=1000)
-        print(f"Status: {'PASS' if completion_result['success'] else 'FAIL'}")
-        if completion_result['success']:
-            print(f"Response time: {completion_result['response_time']:.2f}s")
-            response_text = completion_result['response'].get('choices', [{}])[0].get('text', 'No text')
-            print(f"Full Response:")
-            print("=" * 80)
-            print(response_text)
-            print("=" * 80)
-        else:
-            print(f"Error: {completion_result.get('error', 'Unknown error')}")
-        print()
-
-        # Test 4: LLM Quantization Chat Completion Test
-        print("4. LLM Quantization Chat Completion Test")
-        print("-" * 50)
-        chat_messages = [
-            {"role": "user", "content": "LLM 모델 양자화에 대해 설명해줘"}
-        ]
-        chat_result = self.test_chat_completion(chat_messages, max_tokens=1000)
-        print(f"Status: {'PASS' if chat_result['success'] else 'FAIL'}")
-        if chat_result['success']:
-            print(f"Response time: {chat_result['response_time']:.2f}s")
-            message_content = chat_result['response'].get('choices', [{}])[0].get('message', {}).get('content', 'No content')
-            print(f"Full Response:")
-            print("=" * 80)
-            print(message_content)
-            print("=" * 80)
-        else:
-            print(f"Error: {chat_result.get('error', 'Unknown error')}")
-        print()
-
-        print("=" * 60)
-        print("Test Summary")
-        print("=" * 60)
-        total_tests = 4
-        passed_tests = sum([
-            health_ok,
-            models_result['success'],
-            completion_result['success'],
-            chat_result['success']
-        ])
-        print(f"Tests passed: {passed_tests}/{total_tests}")
-        print(f"Overall status: {'PASS' if passed_tests == total_tests else 'FAIL'}")
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args) -> Dict[str, Any]:
+    server = server_task = None
+    base_url = args.url
+    if args.mock:
+        import uvicorn
+        import mock_llm_server
+
+        port = free_port()
+        mock = mock_llm_server.from_arguments(args)
+        server = uvicorn.Server(uvicorn.Config(mock.app(), host="127.0.0.1", port=port, log_level="warning"))
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            if server_task.done():
+                server_task.result()
+            await asyncio.sleep(0.05)
+        base_url = f"http://127.0.0.1:{port}"
+
+    tester = LLMEndpointTester(base_url, args.model, args.timeout)
+    try:
+        healthy = await tester.test_health()
+        models = await tester.test_models()
+        if not tester.model and models:
+            tester.model = models[0]
+
+        # One request per endpoint first so connection setup and model warmup stay out of the numbers
+        for kind in args.endpoints:
+            await tester.request(kind, args.prompt, min(args.max_tokens, 16), not args.no_stream)
+
+        levels = []
+        for kind in args.endpoints:
+            for concurrency in args.concurrency:
+                requests = args.requests or concurrency * args.requests_per_client
+                levels.append(await tester.run_level(
+                    kind, concurrency, requests, args.prompt, args.max_tokens, not args.no_stream
+                ))
+    finally:
+        await tester.close()
+        if server:
+            server.should_exit = True
+            await server_task
+
+    return {
+        "endpoint": "mock" if args.mock else base_url,
+        "health": healthy,
+        "model": tester.model,
+        "models": models,
+        "streaming": not args.no_stream,
+        "max_tokens": args.max_tokens,
+        "results": levels,
+    }
+
 
 def main():
-    """Main function to run the tests"""
+    """Main function to run the benchmark"""
     import sys
     import io
 
@@ -220,8 +272,28 @@ def main():
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-    tester = LLMEndpointTester()
-    tester.run_all_tests()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of an OpenAI-compatible server")
+    target.add_argument("--mock", action="store_true", help="Benchmark the bundled mock server")
+    parser.add_argument("--model", help="Model id (default: first one listed by /v1/models)")
+    parser.add_argument("--endpoints", nargs="+", choices=["completion", "chat"], default=["completion", "chat"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="In-flight requests")
+    parser.add_argument("--requests", type=int, help="Requests per concurrency level")
+    parser.add_argument("--requests-per-client", type=int, default=4,
+                        help="Requests per level as a multiple of the concurrency (without --requests)")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--no-stream", action="store_true", help="Plain JSON responses; latency only")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+
+    import mock_llm_server
+    mock_options = parser.add_argument_group("mock server (with --mock)")
+    mock_llm_server.add_arguments(mock_options)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False))
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()